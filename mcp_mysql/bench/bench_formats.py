@@ -0,0 +1,74 @@
+"""execute_sql 结果格式基准：text（逐格 str 拼接）与 csv / json / arrow 编码
+
+用法（在 mcp_mysql 目录下）:
+    python bench/bench_formats.py --rows 1000000
+
+生成与 MySQL 游标返回值类型一致的行（整数、含逗号/换行的字符串、DECIMAL、
+DATETIME、NULL），分别测量编码耗时和输出大小。arrow 需要安装 pyarrow。
+"""
+import argparse
+import datetime
+import decimal
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from db.cursors import format_row  # noqa: E402
+from db.formats import encode_arrow, encode_csv, encode_json, pa  # noqa: E402
+
+COLUMNS = ["id", "name", "amount", "created_at", "note"]
+TYPES = ["LONGLONG", "VAR_STRING", "NEWDECIMAL", "DATETIME", "VAR_STRING"]
+
+
+def make_rows(count):
+    base = datetime.datetime(2024, 1, 1)
+    notes = [None, "plain", "a,b", 'say "hi"', "line\nbreak"]
+    return [
+        (
+            i,
+            f"user_{i}",
+            decimal.Decimal(i % 100000) / 100,
+            base + datetime.timedelta(seconds=i),
+            notes[i % len(notes)],
+        )
+        for i in range(count)
+    ]
+
+
+def encode_text(columns, types, rows):
+    """execute_sql 原有的 text 输出"""
+    return "\n".join([",".join(columns)] + [format_row(row) for row in rows])
+
+
+def measure(name, encode, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = encode(COLUMNS, TYPES, rows)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    size = len(output.encode("utf-8")) if isinstance(output, str) else len(output)
+    print(f"{name:<6} {best:8.3f} s  {len(rows) / best / 1e6:6.2f} M rows/s  {size / 1e6:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows} rows x {len(COLUMNS)} columns, best of {args.repeat}")
+    measure("text", encode_text, rows, args.repeat)
+    measure("csv", lambda columns, types, rows: encode_csv(columns, rows), rows, args.repeat)
+    measure("json", encode_json, rows, args.repeat)
+    if pa is not None:
+        measure("arrow", encode_arrow, rows, args.repeat)
+    else:
+        print("arrow  skipped (pyarrow not installed)")
+
+
+if __name__ == "__main__":
+    main()
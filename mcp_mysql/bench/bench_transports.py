@@ -0,0 +1,121 @@
+"""SSE 与 Streamable HTTP（/mcp）传输对比：N 次短 execute_sql 调用
+
+用法（先按 README 启动 SSE 服务）:
+    python bench/bench_transports.py --url http://127.0.0.1:9000 --calls 1000 --concurrency 20
+
+对比以下方式完成 --calls 次调用的耗时：
+    sse-per-call  每次调用新建 SSE 会话（短时 agent 调用目前的做法）
+    sse-shared    所有调用共用一个 SSE 会话
+    http          每次调用一个 POST /mcp，keep-alive 复用连接
+    http-batch    每个 POST /mcp 携带 --batch 条请求
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from common import call_error, summary
+
+
+def call_request(request_id, sql):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {"name": "execute_sql", "arguments": {"query": sql}},
+    }
+
+
+async def run_concurrently(count, concurrency, call):
+    """以 concurrency 个并发任务执行 count 次 call，返回 (各次耗时, 失败信息)"""
+    latencies, errors = [], []
+    queue = iter(range(count))
+
+    async def worker():
+        for index in queue:
+            begin = time.perf_counter()
+            try:
+                failures = await call(index)
+            except Exception as e:
+                failures = [repr(e)]
+            latencies.append(time.perf_counter() - begin)
+            errors.extend(failures)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+async def sse_per_call(args):
+    async def call(index):
+        async with sse_client(f"{args.url}/sse") as streams:
+            async with ClientSession(*streams) as session:
+                await session.initialize()
+                error = call_error(await session.call_tool("execute_sql", {"query": args.sql}))
+                return [error] if error else []
+
+    return await run_concurrently(args.calls, args.concurrency, call)
+
+
+async def sse_shared(args):
+    async with sse_client(f"{args.url}/sse") as streams:
+        async with ClientSession(*streams) as session:
+            await session.initialize()
+
+            async def call(index):
+                error = call_error(await session.call_tool("execute_sql", {"query": args.sql}))
+                return [error] if error else []
+
+            return await run_concurrently(args.calls, args.concurrency, call)
+
+
+async def http(args, batch=1):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        async def call(index):
+            requests = [call_request(index * batch + offset, args.sql) for offset in range(batch)]
+            response = await client.post("/mcp", json=requests if batch > 1 else requests[0])
+            response.raise_for_status()
+            replies = response.json()
+            replies = replies if batch > 1 else [replies]
+            return [
+                reply["error"]["message"] if "error" in reply else call_error(reply["result"])
+                for reply in replies
+                if "error" in reply or call_error(reply["result"])
+            ]
+
+        return await run_concurrently(args.calls // batch, args.concurrency, call)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:9000")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--sql", default="SELECT 1")
+    parser.add_argument("--modes", default="sse-per-call,sse-shared,http,http-batch")
+    args = parser.parse_args()
+
+    modes = {
+        "sse-per-call": sse_per_call,
+        "sse-shared": sse_shared,
+        "http": http,
+        "http-batch": lambda args: http(args, args.batch),
+    }
+    print(f"{args.calls} calls, concurrency {args.concurrency}, batch {args.batch}")
+    for name in args.modes.split(","):
+        begin = time.perf_counter()
+        latencies, errors = await modes[name](args)
+        elapsed = time.perf_counter() - begin
+        # http-batch 的延迟按请求（每个请求 --batch 次调用）统计
+        print(summary(name, latencies))
+        print(f"{'':<12} {elapsed:6.2f} s  {args.calls / elapsed:8.1f} calls/s  errors={len(errors)}")
+        for error in errors[:3]:
+            print(f"{'':<12} {error[:200]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
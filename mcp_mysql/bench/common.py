@@ -0,0 +1,39 @@
+"""基准脚本共用的统计与结果判断"""
+import statistics
+
+# execute_sql 以文本返回的失败信息前缀（工具调用本身仍然成功）
+ERROR_PREFIXES = ("执行超时", "数据库连接失败", "未知错误", "权限不足", "执行语句", "执行查询时出错")
+
+
+def call_error(result):
+    """返回工具调用的失败信息，成功时为 None
+
+    Args:
+        result: mcp CallToolResult，或 JSON-RPC 响应中的 result 字典
+    """
+    if isinstance(result, dict):
+        is_error = result.get("isError")
+        contents = result.get("content") or []
+        text = contents[0].get("text", "") if contents else ""
+    else:
+        is_error = result.isError
+        text = getattr(result.content[0], "text", "") if result.content else ""
+    if is_error or text.startswith(ERROR_PREFIXES):
+        return text or "error"
+    return None
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summary(name, values):
+    """一行延迟统计：p50 / p95 / p99 / 平均值（毫秒）"""
+    if not values:
+        return f"{name:<12} n=0"
+    return (
+        f"{name:<12} n={len(values):<6} p50={percentile(values, 0.5) * 1000:7.1f} ms  "
+        f"p95={percentile(values, 0.95) * 1000:7.1f} ms  p99={percentile(values, 0.99) * 1000:7.1f} ms  "
+        f"mean={statistics.fmean(values) * 1000:7.1f} ms"
+    )
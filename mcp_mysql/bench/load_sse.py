@@ -0,0 +1,78 @@
+"""SSE 传输负载测试：大量并发客户端各自建立 SSE 会话并调用 execute_sql
+
+用法（先按 README 启动 SSE 服务，例如 MYSQL_SSE_WORKERS=4）:
+    python bench/load_sse.py --url http://127.0.0.1:9000 --clients 500 --calls 10
+
+每个客户端建立 /sse 长连接、完成 initialize，然后依次发起 --calls 次 execute_sql。
+所有客户端同时在线，用于验证多 worker 下会话消息能路由到持有 SSE 流的 worker。
+输出会话建立耗时、单次调用延迟分位数、吞吐量和失败数。
+"""
+import argparse
+import asyncio
+import time
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from common import call_error, summary
+
+
+async def run_client(args, connected, start, setup_times, call_times, errors):
+    released = False
+    try:
+        begin = time.perf_counter()
+        async with sse_client(f"{args.url}/sse", timeout=args.timeout, sse_read_timeout=args.timeout * 10) as streams:
+            async with ClientSession(*streams) as session:
+                await session.initialize()
+                setup_times.append(time.perf_counter() - begin)
+                # 等待所有客户端都建立会话后再开始调用，保证并发在线数达到 --clients
+                connected.release()
+                released = True
+                await start.wait()
+                for _ in range(args.calls):
+                    call_begin = time.perf_counter()
+                    result = await session.call_tool("execute_sql", {"query": args.sql})
+                    call_times.append(time.perf_counter() - call_begin)
+                    error = call_error(result)
+                    if error:
+                        errors.append(error)
+    except Exception as e:
+        errors.append(repr(e))
+        if not released:
+            connected.release()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:9000")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--sql", default="SELECT 1")
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    connected = asyncio.Semaphore(0)
+    start = asyncio.Event()
+    setup_times, call_times, errors = [], [], []
+    tasks = [
+        asyncio.create_task(run_client(args, connected, start, setup_times, call_times, errors))
+        for _ in range(args.clients)
+    ]
+    for _ in range(args.clients):
+        await connected.acquire()
+    print(f"{len(setup_times)}/{args.clients} SSE sessions open")
+
+    begin = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - begin
+
+    print(summary("setup", setup_times))
+    print(summary("call", call_times))
+    print(f"throughput {len(call_times) / elapsed:8.1f} calls/s over {elapsed:.2f} s, errors={len(errors)}")
+    for error in errors[:5]:
+        print(f"  {error[:200]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
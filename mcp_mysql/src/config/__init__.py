@@ -1,6 +1,16 @@
-from .dbconfig import get_db_config,get_role_permissions
+from .dbconfig import get_db_config,get_role_permissions,get_pool_config,get_executor_config,get_result_config,get_health_config,get_schema_cache_config,get_batch_config,get_result_cache_config,get_cost_guard_config,get_metrics_config,get_sse_config
 
 __all__ = [
     "get_db_config",
     "get_role_permissions",
+    "get_pool_config",
+    "get_executor_config",
+    "get_result_config",
+    "get_health_config",
+    "get_schema_cache_config",
+    "get_batch_config",
+    "get_result_cache_config",
+    "get_cost_guard_config",
+    "get_metrics_config",
+    "get_sse_config",
 ]
\ No newline at end of file
@@ -1,9 +1,17 @@
 import os
 import logging
+import tempfile
+from functools import lru_cache
 from dotenv import load_dotenv
 
-# 配置日志
-logging.basicConfig(level=logging.DEBUG)
+@lru_cache(maxsize=None)
+def _load_env() -> bool:
+    """加载.env文件，结果缓存，避免每次调用都重新读取文件"""
+    return load_dotenv()
+
+# 配置日志，级别由 MYSQL_LOG_LEVEL 指定（默认 INFO）
+_load_env()
+logging.basicConfig(level=os.getenv("MYSQL_LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 def get_db_config():
@@ -21,8 +29,8 @@ def get_db_config():
     异常:
         ValueError: 当必需的配置信息缺失时抛出
     """
-    # 加载.env文件（如果存在）
-    load_dotenv()
+    # 加载.env文件（如果存在），整个进程只加载一次
+    _load_env()
 
     # 默认配置
     default_config = {
@@ -43,8 +51,7 @@ def get_db_config():
         "database": os.getenv("MYSQL_DATABASE", default_config["database"]),
         "role": os.getenv("MYSQL_ROLE", default_config["role"])
     }
-    
-    logger.debug(f"数据库配置: {config}")
+
     return config
 
 # 定义角色权限
@@ -64,6 +71,188 @@ def get_role_permissions(role: str) -> list:
     返回:
         list: 该角色允许执行的SQL操作列表
     """
-    permissions = ROLE_PERMISSIONS.get(role, ROLE_PERMISSIONS["readonly"])  # 默认返回只读权限
-    logger.debug(f"角色 {role} 的权限: {permissions}")
-    return permissions
\ No newline at end of file
+    return ROLE_PERMISSIONS.get(role, ROLE_PERMISSIONS["readonly"])  # 默认返回只读权限
+
+def get_pool_config(role: str = None) -> dict:
+    """获取连接池配置信息
+
+    参数:
+        role (str): 角色名称，为空时使用 MYSQL_ROLE
+
+    返回:
+        dict: 连接池配置
+        - size: 连接池最大连接数 (MYSQL_POOL_SIZE)
+        - timeout: 借用连接的最长等待时间，秒 (MYSQL_POOL_TIMEOUT)
+        - max_idle_time: 空闲连接回收时间，秒 (MYSQL_POOL_MAX_IDLE)
+        - validate_on_borrow: 借用时是否校验连接有效性 (MYSQL_POOL_VALIDATE)
+        - statement_cache_size: 每个连接保留的预处理语句数 (MYSQL_STATEMENT_CACHE_SIZE)
+        - connect_params: 建立连接所需参数，可通过 MYSQL_<ROLE>_USER /
+          MYSQL_<ROLE>_PASSWORD 为不同角色指定独立账号
+    """
+    _load_env()
+    config = get_db_config()
+    role = role or config["role"]
+
+    connect_params = {k: v for k, v in config.items() if k != "role"}
+    prefix = f"MYSQL_{role.upper()}_"
+    connect_params["user"] = os.getenv(prefix + "USER", connect_params["user"])
+    connect_params["password"] = os.getenv(prefix + "PASSWORD", connect_params["password"])
+
+    return {
+        "size": int(os.getenv("MYSQL_POOL_SIZE", 5)),
+        "timeout": float(os.getenv("MYSQL_POOL_TIMEOUT", 10)),
+        "max_idle_time": float(os.getenv("MYSQL_POOL_MAX_IDLE", 300)),
+        "validate_on_borrow": os.getenv("MYSQL_POOL_VALIDATE", "true").lower() in ("1", "true", "yes"),
+        "statement_cache_size": int(os.getenv("MYSQL_STATEMENT_CACHE_SIZE", 32)),
+        "connect_params": connect_params,
+    }
+
+def get_executor_config() -> dict:
+    """获取查询执行器配置信息
+
+    返回:
+        dict: 执行器配置
+        - max_workers: 执行查询的线程数上限 (MYSQL_EXECUTOR_WORKERS，默认与连接池大小一致)
+        - query_timeout: 单次工具调用的默认超时时间，秒，0 表示不限制 (MYSQL_QUERY_TIMEOUT)
+    """
+    _load_env()
+    return {
+        "max_workers": int(os.getenv("MYSQL_EXECUTOR_WORKERS", os.getenv("MYSQL_POOL_SIZE", 5))),
+        "query_timeout": float(os.getenv("MYSQL_QUERY_TIMEOUT", 300)),
+    }
+
+def get_result_config() -> dict:
+    """获取查询结果集限制配置
+
+    返回:
+        dict: 结果集配置
+        - max_rows: 单次返回的最大行数 (MYSQL_MAX_ROWS)
+        - max_bytes: 单次返回的最大字节数 (MYSQL_MAX_RESULT_BYTES)
+        - cursor_ttl: 未读完结果集的保留时间，秒 (MYSQL_CURSOR_TTL)
+        - max_open_cursors: 同时保留的未读完结果集数量上限 (MYSQL_MAX_OPEN_CURSORS)
+    """
+    _load_env()
+    return {
+        "max_rows": int(os.getenv("MYSQL_MAX_ROWS", 1000)),
+        "max_bytes": int(os.getenv("MYSQL_MAX_RESULT_BYTES", 1024 * 1024)),
+        "cursor_ttl": float(os.getenv("MYSQL_CURSOR_TTL", 300)),
+        "max_open_cursors": int(os.getenv("MYSQL_MAX_OPEN_CURSORS", 2)),
+    }
+
+def get_health_config() -> dict:
+    """获取健康检查配置
+
+    返回:
+        dict: 健康检查配置
+        - probe_timeout: 每组检查项的超时时间，秒 (MYSQL_HEALTH_PROBE_TIMEOUT)
+        - max_age: 默认允许返回的快照最大时长，秒，0 表示总是实时检查 (MYSQL_HEALTH_MAX_AGE)
+    """
+    _load_env()
+    return {
+        "probe_timeout": float(os.getenv("MYSQL_HEALTH_PROBE_TIMEOUT", 10)),
+        "max_age": float(os.getenv("MYSQL_HEALTH_MAX_AGE", 0)),
+    }
+
+def get_schema_cache_config() -> dict:
+    """获取表结构元数据缓存配置
+
+    返回:
+        dict: 缓存配置
+        - ttl: 缓存有效期，秒，0 表示禁用缓存 (MYSQL_SCHEMA_CACHE_TTL)
+    """
+    _load_env()
+    return {
+        "ttl": float(os.getenv("MYSQL_SCHEMA_CACHE_TTL", 300)),
+    }
+
+def get_batch_config() -> dict:
+    """获取事务模式下批量插入的配置
+
+    返回:
+        dict: 批量插入配置
+        - max_rows: 合并为一条多行 INSERT 的最大行数 (MYSQL_INSERT_BATCH_ROWS)
+        - max_bytes: 合并后单条SQL的最大字节数，需小于 max_allowed_packet (MYSQL_INSERT_BATCH_BYTES)
+    """
+    _load_env()
+    return {
+        "max_rows": int(os.getenv("MYSQL_INSERT_BATCH_ROWS", 1000)),
+        "max_bytes": int(os.getenv("MYSQL_INSERT_BATCH_BYTES", 1024 * 1024)),
+    }
+
+def get_result_cache_config() -> dict:
+    """获取查询结果缓存配置，max_bytes 为 0 时不启用
+
+    返回:
+        dict: 结果缓存配置
+        - max_bytes: 缓存总大小上限，字节 (MYSQL_RESULT_CACHE_BYTES，默认 0 即关闭)
+        - ttl: 缓存有效期，秒 (MYSQL_RESULT_CACHE_TTL)
+    """
+    _load_env()
+    return {
+        "max_bytes": int(os.getenv("MYSQL_RESULT_CACHE_BYTES", 0)),
+        "ttl": float(os.getenv("MYSQL_RESULT_CACHE_TTL", 60)),
+    }
+
+def get_cost_guard_config() -> dict:
+    """获取 execute_sql 的 SELECT 成本检查配置
+
+    返回:
+        dict: 成本检查配置
+        - mode: off 不检查 / reject 超出预算时拒绝 / limit 超出预算时追加 LIMIT (MYSQL_COST_GUARD)
+        - max_rows_examined: 预估扫描行数上限，0 表示不限制 (MYSQL_COST_MAX_ROWS_EXAMINED)
+        - max_cost: 优化器预估成本上限，0 表示不限制 (MYSQL_COST_MAX_COST)
+        - limit_rows: limit 模式下追加的 LIMIT 行数 (MYSQL_COST_LIMIT_ROWS，默认与 MYSQL_MAX_ROWS 一致)
+        - max_execution_time: SELECT 的 MAX_EXECUTION_TIME 提示，毫秒，0 表示不添加 (MYSQL_MAX_EXECUTION_TIME)
+        - plan_ttl: 执行计划缓存时间，秒 (MYSQL_COST_PLAN_TTL)
+        - plan_cache_size: 缓存的执行计划数量上限 (MYSQL_COST_PLAN_CACHE_SIZE)
+    """
+    _load_env()
+    return {
+        "mode": os.getenv("MYSQL_COST_GUARD", "off").lower(),
+        "max_rows_examined": float(os.getenv("MYSQL_COST_MAX_ROWS_EXAMINED", 1000000)),
+        "max_cost": float(os.getenv("MYSQL_COST_MAX_COST", 0)),
+        "limit_rows": int(os.getenv("MYSQL_COST_LIMIT_ROWS", os.getenv("MYSQL_MAX_ROWS", 1000))),
+        "max_execution_time": int(os.getenv("MYSQL_MAX_EXECUTION_TIME", 0)),
+        "plan_ttl": float(os.getenv("MYSQL_COST_PLAN_TTL", 300)),
+        "plan_cache_size": int(os.getenv("MYSQL_COST_PLAN_CACHE_SIZE", 512)),
+    }
+
+def get_metrics_config() -> dict:
+    """获取工具调用指标与日志配置
+
+    返回:
+        dict: 指标配置
+        - enabled: 是否统计工具调用指标并提供 /metrics 接口 (MYSQL_METRICS)
+        - log_sample_rate: 正常调用输出调用日志的抽样比例，0-1 (MYSQL_LOG_SAMPLE_RATE)
+        - slow_call_seconds: 耗时超过该值的调用总是输出日志，秒 (MYSQL_SLOW_CALL_SECONDS)
+    """
+    _load_env()
+    return {
+        "enabled": os.getenv("MYSQL_METRICS", "true").lower() in ("1", "true", "yes"),
+        "log_sample_rate": float(os.getenv("MYSQL_LOG_SAMPLE_RATE", 0.01)),
+        "slow_call_seconds": float(os.getenv("MYSQL_SLOW_CALL_SECONDS", 1)),
+    }
+
+def get_sse_config() -> dict:
+    """获取SSE模式的部署配置
+
+    返回:
+        dict: SSE 服务配置
+        - host: 监听地址 (MYSQL_SSE_HOST)
+        - port: 监听端口 (MYSQL_SSE_PORT)
+        - workers: worker 进程数，大于 1 时以多进程方式运行 (MYSQL_SSE_WORKERS)
+        - drain_timeout: 关闭时等待进行中的工具调用完成的最长时间，秒 (MYSQL_DRAIN_TIMEOUT)
+        - socket_dir: worker 之间转发会话消息的 Unix socket 目录 (MYSQL_SSE_SOCKET_DIR，
+          默认为临时目录下按端口区分的子目录)
+        - keep_alive: HTTP keep-alive 空闲连接的保持时间，秒 (MYSQL_HTTP_KEEP_ALIVE)
+    """
+    _load_env()
+    port = int(os.getenv("MYSQL_SSE_PORT", 9000))
+    return {
+        "host": os.getenv("MYSQL_SSE_HOST", "0.0.0.0"),
+        "port": port,
+        "workers": max(1, int(os.getenv("MYSQL_SSE_WORKERS", 1))),
+        "drain_timeout": float(os.getenv("MYSQL_DRAIN_TIMEOUT", 30)),
+        "socket_dir": os.getenv("MYSQL_SSE_SOCKET_DIR") or os.path.join(tempfile.gettempdir(), f"mcp_mysql-{port}"),
+        "keep_alive": int(os.getenv("MYSQL_HTTP_KEEP_ALIVE", 30)),
+    }
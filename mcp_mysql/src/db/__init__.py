@@ -0,0 +1,18 @@
+from .pool import ConnectionPool, get_pool, init_pools, close_pools
+from .executor import QueryHandle, QueryCancelledError, run_query, run_blocking, get_executor, shutdown_executor
+from .prepared import execute_prepared, in_placeholders
+
+__all__ = [
+    "ConnectionPool",
+    "get_pool",
+    "init_pools",
+    "close_pools",
+    "QueryHandle",
+    "QueryCancelledError",
+    "run_query",
+    "run_blocking",
+    "get_executor",
+    "shutdown_executor",
+    "execute_prepared",
+    "in_placeholders",
+]
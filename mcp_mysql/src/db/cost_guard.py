@@ -0,0 +1,246 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from .statements import Statement, fingerprint, top_level_limit, top_level_words
+
+logger = logging.getLogger(__name__)
+
+# 语句开头的 SELECT（允许前面有括号），优化器提示需紧跟其后
+_LEADING_SELECT = re.compile(r"^\(*\s*SELECT\b", re.IGNORECASE)
+# 这些子句必须位于 LIMIT 之后或与 LIMIT 不兼容，出现时无法直接追加 LIMIT
+_NO_LIMIT_REWRITE = frozenset({"LIMIT", "FOR", "LOCK", "INTO"})
+# 最外层出现排序、分组、去重、聚合或窗口函数时，需要先读完全部行才能返回前几行，
+# LIMIT 不会减少扫描行数
+_LIMIT_UNBOUNDED = frozenset({
+    "ORDER", "GROUP", "HAVING", "DISTINCT", "DISTINCTROW", "UNION", "OVER",
+    "COUNT", "SUM", "AVG", "MIN", "MAX", "GROUP_CONCAT", "JSON_ARRAYAGG", "JSON_OBJECTAGG",
+    "BIT_AND", "BIT_OR", "BIT_XOR", "STD", "STDDEV", "STDDEV_POP", "STDDEV_SAMP",
+    "VARIANCE", "VAR_POP", "VAR_SAMP",
+})
+
+GUARD_MODES = ("off", "reject", "limit")
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _children_rows(node: dict) -> float:
+    return sum(estimate_rows_examined(value) for value in node.values() if isinstance(value, (dict, list)))
+
+
+def estimate_rows_examined(node: Any) -> float:
+    """根据 EXPLAIN FORMAT=JSON 的执行计划估算扫描的行数
+
+    嵌套循环连接中，每张表的扫描行数乘以之前各表连接产生的行数；
+    子查询、派生表、UNION 的各部分累加。
+    """
+    if isinstance(node, list):
+        return sum(estimate_rows_examined(item) for item in node)
+    if not isinstance(node, dict):
+        return 0.0
+
+    total = 0.0
+    for key, value in node.items():
+        if key == "nested_loop" and isinstance(value, list):
+            prefix = 1.0
+            for item in value:
+                table = item.get("table", {}) if isinstance(item, dict) else {}
+                scan = _number(table.get("rows_examined_per_scan"))
+                total += prefix * scan + _children_rows(table)
+                prefix = _number(table.get("rows_produced_per_join")) or scan or prefix
+        elif key == "table" and isinstance(value, dict):
+            total += _number(value.get("rows_examined_per_scan")) + _children_rows(value)
+        elif isinstance(value, (dict, list)):
+            total += estimate_rows_examined(value)
+    return total
+
+
+def query_cost(plan: dict) -> float:
+    """执行计划中优化器估算的总成本"""
+    block = plan.get("query_block") or {}
+    cost = (block.get("cost_info") or {}).get("query_cost")
+    if cost is None:
+        # explain_json_format_version=2
+        cost = plan.get("estimated_total_cost")
+    return _number(cost)
+
+
+class PlanEstimate:
+    """执行计划的估算结果"""
+
+    __slots__ = ("rows_examined", "cost")
+
+    def __init__(self, rows_examined: float, cost: float):
+        self.rows_examined = rows_examined
+        self.cost = cost
+
+
+class GuardResult:
+    """成本检查结果"""
+
+    __slots__ = ("statement", "rejected", "note")
+
+    def __init__(self, statement: str, rejected: bool = False, note: Optional[str] = None):
+        self.statement = statement  # 实际执行的SQL（可能追加了 LIMIT 或优化器提示）
+        self.rejected = rejected
+        self.note = note
+
+
+class CostGuard:
+    """基于 EXPLAIN 的 SELECT 成本检查
+
+    - 执行前用 EXPLAIN FORMAT=JSON 估算扫描行数和成本，超出预算时拒绝（reject）
+      或追加 LIMIT 后执行（limit）
+    - 执行计划按 (库名, 语句指纹) 缓存，字面量不同的同类查询不会重复 EXPLAIN
+    - 配置了 max_execution_time 时为 SELECT 加上 MAX_EXECUTION_TIME 优化器提示
+    """
+
+    def __init__(
+        self,
+        mode: str = "off",
+        max_rows_examined: float = 1_000_000,
+        max_cost: float = 0,
+        limit_rows: int = 1000,
+        max_execution_time: int = 0,
+        plan_ttl: float = 300,
+        plan_cache_size: int = 512,
+    ):
+        if mode not in GUARD_MODES:
+            raise ValueError(f"不支持的成本检查模式: {mode}，可选: {', '.join(GUARD_MODES)}")
+        self.mode = mode
+        self.max_rows_examined = max_rows_examined
+        self.max_cost = max_cost
+        self.limit_rows = limit_rows
+        self.max_execution_time = max_execution_time
+        self.plan_ttl = plan_ttl
+        self.plan_cache_size = plan_cache_size
+        self._plans: "OrderedDict[Tuple[str, str], Tuple[float, PlanEstimate]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off" or self.max_execution_time > 0
+
+    def _cached_plan(self, key: Tuple[str, str]) -> Optional[PlanEstimate]:
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() > entry[0]:
+                del self._plans[key]
+                return None
+            self._plans.move_to_end(key)
+            return entry[1]
+
+    def _store_plan(self, key: Tuple[str, str], estimate: PlanEstimate) -> None:
+        with self._lock:
+            self._plans[key] = (time.monotonic() + self.plan_ttl, estimate)
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.plan_cache_size:
+                self._plans.popitem(last=False)
+
+    def estimate(self, conn, statement: Statement, database: str) -> PlanEstimate:
+        """估算语句的扫描行数和成本，优先使用缓存的执行计划
+
+        Args:
+            conn: 数据库连接（当前没有未读完的结果集）
+            statement: SELECT 语句
+            database: 当前库名
+
+        Returns:
+            PlanEstimate: 估算结果
+        """
+        key = (database, fingerprint(statement))
+        estimate = self._cached_plan(key)
+        if estimate is not None:
+            return estimate
+
+        with conn.cursor() as cursor:
+            cursor.execute(f"EXPLAIN FORMAT=JSON {statement.text}")
+            row = cursor.fetchone()
+            cursor.fetchall()
+        plan = json.loads(row[0])
+        estimate = PlanEstimate(estimate_rows_examined(plan), query_cost(plan))
+        self._store_plan(key, estimate)
+        return estimate
+
+    def add_hint(self, text: str) -> str:
+        """为 SELECT 加上 MAX_EXECUTION_TIME 优化器提示（已有时不重复添加）"""
+        if not self.max_execution_time or "MAX_EXECUTION_TIME" in text.upper():
+            return text
+        match = _LEADING_SELECT.match(text)
+        if not match:
+            return text
+        return f"{text[:match.end()]} /*+ MAX_EXECUTION_TIME({int(self.max_execution_time)}) */{text[match.end():]}"
+
+    def review(self, conn, statement: Statement, database: str) -> GuardResult:
+        """执行前检查 SELECT 的成本
+
+        Args:
+            conn: 数据库连接
+            statement: 语句
+            database: 当前库名
+
+        Returns:
+            GuardResult: 实际执行的SQL，或拒绝执行的原因
+        """
+        if statement.keywords[:1] != ("SELECT",):
+            return GuardResult(statement.text)
+
+        text = statement.text
+        note = None
+        if self.mode != "off":
+            try:
+                estimate = self.estimate(conn, statement, database)
+            except Exception as e:
+                # EXPLAIN 失败时不拦截，由实际执行返回错误
+                logger.debug(f"EXPLAIN 失败: {e}")
+                estimate = None
+
+            words = top_level_words(statement)
+            limit_bounded = not (words & _LIMIT_UNBOUNDED)
+            over_rows = estimate is not None and self.max_rows_examined and estimate.rows_examined > self.max_rows_examined
+            over_cost = estimate is not None and self.max_cost and estimate.cost > self.max_cost
+            if (over_rows or over_cost) and limit_bounded:
+                # EXPLAIN 的扫描行数和成本都不考虑 LIMIT，LIMIT 能提前结束扫描的查询按 LIMIT 重新判断
+                limit = top_level_limit(statement)
+                if limit is not None:
+                    over_rows = self.max_rows_examined and limit > self.max_rows_examined
+                    over_cost = False
+            if over_rows or over_cost:
+                summary = (
+                    f"预估扫描 {int(estimate.rows_examined)} 行（上限 {int(self.max_rows_examined)}），"
+                    f"预估成本 {estimate.cost:.1f}" + (f"（上限 {self.max_cost:.1f}）" if self.max_cost else "")
+                )
+                if self.mode == "limit" and limit_bounded and not (words & _NO_LIMIT_REWRITE):
+                    # 另起一行，避免追加到语句末尾的 -- 注释中
+                    text = f"{text}\nLIMIT {int(self.limit_rows)}"
+                    note = f"-- {summary}，已追加 LIMIT {int(self.limit_rows)}"
+                else:
+                    return GuardResult(text, rejected=True, note=f"查询成本超出预算，已拒绝执行: {summary}。请添加过滤条件、索引或 LIMIT 后重试")
+
+        return GuardResult(self.add_hint(text), note=note)
+
+
+_cost_guard: Optional[CostGuard] = None
+_cost_guard_lock = threading.Lock()
+
+
+def get_cost_guard() -> CostGuard:
+    """获取进程级成本检查器"""
+    global _cost_guard
+    if _cost_guard is None:
+        from config import get_cost_guard_config
+        with _cost_guard_lock:
+            if _cost_guard is None:
+                _cost_guard = CostGuard(**get_cost_guard_config())
+    return _cost_guard
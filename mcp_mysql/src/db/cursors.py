@@ -0,0 +1,184 @@
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import List, Optional, Tuple
+
+from .pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+def format_row(row) -> str:
+    """将一行数据转换为CSV文本，特殊处理None值"""
+    return ",".join("NULL" if value is None else str(value) for value in row)
+
+
+class ResultPage:
+    """一页结果数据"""
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self.rows: List[Tuple] = []  # 本页的原始行，用于 csv/json/arrow 等格式
+        self.lines: List[str] = []  # 本页的文本行（与 rows 一一对应）
+        self.exhausted = False  # 结果集是否已读完
+        self.pending_rows: List[Tuple] = []  # 已从服务端读出、留给下一页的行
+
+    def to_text(self) -> str:
+        return "\n".join([",".join(self.columns)] + self.lines)
+
+
+def fetch_page(
+    cursor,
+    columns: List[str],
+    max_rows: int,
+    max_bytes: int,
+    carry: Optional[List[Tuple]] = None,
+) -> ResultPage:
+    """使用 fetchmany 从非缓冲游标中流式读取一页数据
+
+    达到行数或字节数预算时停止；行数预算用完时再多读一行，用于判断是否还有剩余数据。
+
+    Args:
+        cursor: 非缓冲游标
+        columns: 列名
+        max_rows: 行数预算
+        max_bytes: 字节数预算，按文本格式估算（至少返回一行）
+        carry: 上一页已读出但未返回的行
+
+    Returns:
+        ResultPage: 本页数据
+    """
+    page = ResultPage(columns)
+    size = len(page.to_text().encode("utf-8"))
+    buffer = deque(carry or [])
+
+    while True:
+        if not buffer:
+            want = max(max_rows - len(page.lines), 1)
+            buffer.extend(cursor.fetchmany(min(want, 500)))
+            if not buffer:
+                page.exhausted = True
+                return page
+        row = buffer.popleft()
+
+        line = format_row(row)
+        line_size = len(line.encode("utf-8")) + 1
+        if len(page.lines) >= max_rows or (page.lines and size + line_size > max_bytes):
+            # 预算已用完，剩余的行留给下一页
+            page.pending_rows = [row, *buffer]
+            return page
+        page.rows.append(row)
+        page.lines.append(line)
+        size += line_size
+
+
+def drain(cursor) -> int:
+    """读完并丢弃游标剩余数据，返回丢弃的行数"""
+    count = 0
+    while True:
+        rows = cursor.fetchmany(1000)
+        if not rows:
+            return count
+        count += len(rows)
+
+
+class ParkedCursor:
+    """保留在服务端、尚未读完的结果集"""
+
+    def __init__(self, pool: ConnectionPool, conn, cursor, columns: List[str],
+                 rows_sent: int, pending_rows: List[Tuple], estimated_total: Optional[int],
+                 types: Optional[List[str]] = None, result_format: str = "text"):
+        self.pool = pool
+        self.conn = conn
+        self.cursor = cursor
+        self.columns = columns
+        self.types = types or []
+        self.result_format = result_format
+        self.rows_sent = rows_sent
+        self.pending_rows = pending_rows
+        self.estimated_total = estimated_total
+        self.touched_at = time.monotonic()
+
+    def close(self) -> None:
+        """丢弃结果集并释放其占用的连接"""
+        self.pool.discard(self.conn)
+
+
+class CursorRegistry:
+    """未读完结果集的登记表，通过续取令牌取回下一页
+
+    每个保留的结果集会占用一个连接，因此数量有上限，超出时关闭最早的结果集；
+    超过 ttl 未被续取的结果集同样会被关闭。
+    """
+
+    def __init__(self, ttl: float, max_open: int):
+        self.ttl = ttl
+        self.max_open = max_open
+        self._cursors: "OrderedDict[str, ParkedCursor]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self) -> List[ParkedCursor]:
+        """移出过期及超出数量上限的结果集（需持有锁）"""
+        now = time.monotonic()
+        evicted = [token for token, parked in self._cursors.items() if now - parked.touched_at > self.ttl]
+        result = [self._cursors.pop(token) for token in evicted]
+        while len(self._cursors) > self.max_open:
+            _, parked = self._cursors.popitem(last=False)
+            result.append(parked)
+        return result
+
+    def park(self, parked: ParkedCursor) -> str:
+        """登记未读完的结果集
+
+        Returns:
+            str: 续取令牌
+        """
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._cursors[token] = parked
+            evicted = self._evict()
+        for item in evicted:
+            item.close()
+        return token
+
+    def take(self, token: str) -> Optional[ParkedCursor]:
+        """取出结果集（取出后不再登记，仍有剩余数据时需重新 park）"""
+        with self._lock:
+            evicted = self._evict()
+            parked = self._cursors.pop(token, None)
+        for item in evicted:
+            item.close()
+        return parked
+
+    def close(self, token: str) -> bool:
+        """主动关闭结果集"""
+        parked = self.take(token)
+        if parked is None:
+            return False
+        parked.close()
+        return True
+
+    def close_all(self) -> None:
+        with self._lock:
+            items = list(self._cursors.values())
+            self._cursors.clear()
+        for item in items:
+            item.close()
+
+
+_registry: Optional[CursorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_cursor_registry() -> CursorRegistry:
+    """获取进程级结果集登记表"""
+    global _registry
+    if _registry is None:
+        from config import get_result_config
+        with _registry_lock:
+            if _registry is None:
+                config = get_result_config()
+                _registry = CursorRegistry(config["cursor_ttl"], config["max_open_cursors"])
+    return _registry
@@ -0,0 +1,166 @@
+import asyncio
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from mysql.connector import connect, Error
+
+from config import get_executor_config
+from .pool import get_pool, ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 执行阻塞查询的有界线程池，避免 mysql.connector 阻塞事件循环
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """获取查询线程池，不存在时按配置创建"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_executor_config()["max_workers"],
+                    thread_name_prefix="mysql-query",
+                )
+    return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """关闭查询线程池
+
+    Args:
+        wait: 是否等待正在执行的查询结束
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+
+
+class QueryCancelledError(Exception):
+    """查询在开始执行前已被取消"""
+
+
+class QueryHandle:
+    """正在执行的查询，用于超时或取消时终止服务端查询
+
+    bind、unbind 和 kill 由同一把锁保护：连接解除绑定（归还连接池）之后不会再发送
+    KILL QUERY，避免终止之后借用该连接的其他调用方的语句。
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self.connection_id: Optional[int] = None
+        self.cancelled = False
+        self.detached = False
+        self._lock = threading.Lock()
+
+    def bind(self, conn) -> bool:
+        """记录执行查询的连接ID
+
+        Returns:
+            bool: 查询已被取消时返回 False，不应再执行
+        """
+        with self._lock:
+            if self.cancelled:
+                return False
+            self.connection_id = conn.connection_id
+            return True
+
+    def unbind(self) -> None:
+        """查询结束，归还连接前清除连接ID（等待进行中的 KILL 完成）"""
+        with self._lock:
+            self.connection_id = None
+
+    def detach(self) -> None:
+        """查询结束后不归还连接，由调用方接管（例如保留未读完的结果集）"""
+        self.detached = True
+
+    def kill(self) -> None:
+        """通过独立连接发送 KILL QUERY 终止正在执行的语句
+
+        使用新建连接而非连接池，避免连接池已满时取消操作本身被阻塞。
+        发送期间持有锁，查询线程要等 KILL 完成后才能归还连接。
+        """
+        with self._lock:
+            self.cancelled = True
+            connection_id = self.connection_id
+            if connection_id is None:
+                return
+            try:
+                with connect(**self.pool.connect_params) as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"KILL QUERY {int(connection_id)}")
+                logger.info(f"已终止查询: connection_id={connection_id}")
+            except Error as e:
+                logger.warning(f"终止查询失败: connection_id={connection_id}, {e}")
+
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    """在查询线程池中执行不需要借用连接的阻塞操作"""
+    loop = asyncio.get_running_loop()
+    # 复制上下文，使线程中记录的指标归属到当前工具调用
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), context.run, func, *args)
+
+
+async def run_query(
+    func: Callable[[Any, QueryHandle], T],
+    role: Optional[str] = None,
+    timeout: Optional[float] = None,
+    reset_session: bool = True,
+) -> T:
+    """在线程池中借用连接执行阻塞的数据库操作
+
+    Args:
+        func: 接收已借出连接及其 QueryHandle 的同步函数，返回值作为结果；
+            调用 handle.detach() 后连接不会自动归还
+        role: 使用哪个角色的连接池
+        timeout: 超时时间(秒)，为空时使用 MYSQL_QUERY_TIMEOUT，0 表示不限制
+        reset_session: 归还连接时是否重置会话状态；func 只执行不改变会话状态的
+            固定查询时传 False，连接上的预处理语句可以跨调用复用
+
+    Returns:
+        func 的返回值
+
+    Raises:
+        TimeoutError: 超时，服务端查询会被 KILL QUERY 终止
+        asyncio.CancelledError: 调用方取消，服务端查询同样会被终止
+    """
+    if timeout is None:
+        timeout = get_executor_config()["query_timeout"]
+
+    pool = get_pool(role)
+    handle = QueryHandle(pool)
+
+    def task() -> T:
+        conn = pool.acquire()
+        try:
+            if not handle.bind(conn):
+                raise QueryCancelledError("查询已取消")
+            return func(conn, handle)
+        finally:
+            handle.unbind()
+            if not handle.detached:
+                pool.release(conn, reset_session)
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    future = loop.run_in_executor(get_executor(), context.run, task)
+    try:
+        return await asyncio.wait_for(future, timeout or None)
+    except asyncio.TimeoutError:
+        # 终止操作放到默认线程池，不占用查询线程池
+        loop.run_in_executor(None, handle.kill)
+        raise TimeoutError(f"查询执行超时({timeout}s)")
+    except asyncio.CancelledError:
+        loop.run_in_executor(None, handle.kill)
+        raise
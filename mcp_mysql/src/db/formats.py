@@ -0,0 +1,108 @@
+import base64
+import csv
+import datetime
+import decimal
+import io
+import json
+from typing import Any, List, Optional, Sequence
+
+from mysql.connector import FieldType
+
+try:
+    import pyarrow as pa
+except ImportError:  # 可选依赖，仅 arrow 格式需要
+    pa = None
+
+# execute_sql 支持的结果格式
+RESULT_FORMATS = ("text", "csv", "json", "arrow")
+
+ARROW_MIME_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def column_types(description: Sequence[tuple]) -> List[str]:
+    """从游标 description 取出各列的MySQL类型名，如 LONGLONG、VAR_STRING"""
+    return [FieldType.get_info(desc[1]) or "UNKNOWN" for desc in description]
+
+
+def encode_csv(columns: List[str], rows: List[tuple]) -> str:
+    """按 RFC 4180 转义输出CSV，包含逗号、引号、换行的值会加引号，NULL 输出为空字段"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return buffer.getvalue().rstrip("\n")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, decimal.Decimal):
+        # 以字符串保留精度
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    if isinstance(value, set):
+        return sorted(value)
+    return str(value)
+
+
+def encode_json(columns: List[str], types: List[str], rows: List[tuple]) -> str:
+    """按列输出JSON：{"row_count": n, "columns": [{"name", "type", "values"}]}
+
+    DECIMAL 以字符串表示，日期时间为 ISO 8601，二进制为 base64。
+    """
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    payload = {
+        "row_count": len(rows),
+        "columns": [
+            {"name": name, "type": type_name, "values": list(column)}
+            for name, type_name, column in zip(columns, types, values)
+        ],
+    }
+    return json.dumps(payload, ensure_ascii=False, default=_json_default)
+
+
+def _arrow_column(values: tuple) -> "pa.Array":
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        # 类型混杂或无法推断时退化为字符串列
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def encode_arrow(columns: List[str], types: List[str], rows: List[tuple]) -> bytes:
+    """编码为 Arrow IPC stream，列的MySQL类型名写入字段元数据
+
+    Raises:
+        RuntimeError: 未安装 pyarrow
+    """
+    if pa is None:
+        raise RuntimeError("arrow 格式需要安装 pyarrow (pip install pyarrow)")
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    arrays = [_arrow_column(column) for column in values]
+    fields = [
+        pa.field(name, array.type, metadata={"mysql_type": type_name})
+        for name, type_name, array in zip(columns, types, arrays)
+    ]
+    table = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def check_format(result_format: Optional[str]) -> str:
+    """校验结果格式参数，为空时返回默认的 text
+
+    Raises:
+        ValueError: 不支持的格式，或 arrow 格式缺少 pyarrow
+    """
+    result_format = (result_format or "text").lower()
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"不支持的结果格式: {result_format}，可选: {', '.join(RESULT_FORMATS)}")
+    if result_format == "arrow" and pa is None:
+        raise ValueError("arrow 格式需要安装 pyarrow (pip install pyarrow)")
+    return result_format
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+from typing import Dict, Any, Optional, Iterator
+
+from mysql.connector import connect, Error
+from mysql.connector.errors import PoolError
+
+from config import get_db_config, get_pool_config
+from metrics import get_metrics
+from .prepared import close_statement_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """MySQL连接池
+
+    - 最多同时持有 size 个连接，超出时借用方等待，超时抛出 PoolError
+    - 借用时可校验连接有效性（ping），失效连接自动替换
+    - 空闲超过 max_idle_time 的连接在借用时回收并重建
+    - 归还时回滚未提交的事务并重置会话状态，重新选择配置的默认库，失败的连接直接关闭；
+      只执行固定只读查询的借用方可以跳过重置（reset_session=False）
+    - 每个连接最多保留 statement_cache_size 条预处理语句（见 db.prepared），
+      跳过重置的归还会保留这些语句，供之后的借用方复用
+    - 借用连接的等待时间按连接池名称（角色）记录到 mysql_pool_wait_seconds
+    """
+
+    def __init__(
+        self,
+        connect_params: Dict[str, Any],
+        size: int = 5,
+        timeout: float = 10,
+        max_idle_time: float = 300,
+        validate_on_borrow: bool = True,
+        statement_cache_size: int = 32,
+        name: str = "default",
+    ):
+        self.name = name
+        self.connect_params = connect_params
+        self.size = size
+        self.timeout = timeout
+        self.max_idle_time = max_idle_time
+        self.validate_on_borrow = validate_on_borrow
+        self.statement_cache_size = statement_cache_size
+        # 重置会话不会恢复默认库（USE 切换后仍停留在其他库），归还时重新选择
+        self.database = connect_params.get("database")
+
+        # 空闲连接栈（后进先出，优先复用最近使用的连接），元素为 (连接, 归还时间)
+        self._idle: LifoQueue = LifoQueue()
+        # 限制同时借出 + 空闲的连接总数
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def _create_connection(self):
+        """建立新的数据库连接"""
+        return connect(**self.connect_params)
+
+    def _is_usable(self, conn, idle_since: float) -> bool:
+        """判断空闲连接是否可以继续使用"""
+        if self.max_idle_time and time.monotonic() - idle_since > self.max_idle_time:
+            return False
+        if not self.validate_on_borrow:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            close_statement_cache(conn)
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self, timeout: Optional[float] = None):
+        """借用一个连接，用完必须调用 release 归还
+
+        Args:
+            timeout: 等待时间(秒)，为空时使用连接池配置，0 表示不等待
+
+        Returns:
+            MySQLConnection: 可用的数据库连接
+
+        Raises:
+            PoolError: 连接池已关闭或等待超时
+        """
+        if self._closed:
+            raise PoolError("连接池已关闭")
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        acquired = self._slots.acquire(timeout=timeout)
+        get_metrics().record_pool_wait(self.name, time.monotonic() - start)
+        if not acquired:
+            raise PoolError(f"获取数据库连接超时({timeout}s)，连接池已满")
+
+        try:
+            while True:
+                try:
+                    conn, idle_since = self._idle.get_nowait()
+                except Empty:
+                    return self._create_connection()
+                if self._is_usable(conn, idle_since):
+                    return conn
+                self._close_quietly(conn)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn, reset_session: bool = True) -> None:
+        """归还连接
+
+        空闲的连接总是处于干净的会话状态：执行过任意SQL的借用方归还时重置会话；
+        只执行了不改变会话状态的查询（如 information_schema 的预处理查询）时
+        可以跳过重置，连接上的预处理语句得以跨借用复用。
+
+        Args:
+            conn: 通过 acquire 借出的连接
+            reset_session: 是否重置会话状态，借用期间可能改变会话状态时必须为 True
+        """
+        try:
+            if self._closed or not conn.is_connected():
+                self._close_quietly(conn)
+                return
+            # 丢弃未提交的事务，保证下一个借用方拿到干净的会话
+            if conn.in_transaction:
+                conn.rollback()
+            if not reset_session:
+                self._idle.put((conn, time.monotonic()))
+                return
+            # 重置会话状态（表锁、用户变量、临时表、SET SESSION 等），
+            # 重置会释放服务端的预处理语句，先关闭对应的游标
+            close_statement_cache(conn)
+            conn.reset_session()
+            # 查询当前库与直接选择同样需要一次往返，这里直接选择
+            if self.database:
+                conn.cmd_init_db(self.database)
+            self._idle.put((conn, time.monotonic()))
+        except Exception:
+            # 无法重置的连接不能再借给其他调用方
+            self._close_quietly(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None, reset_session: bool = True) -> Iterator[Any]:
+        """以上下文管理器方式借用连接，退出时自动归还（reset_session 见 release）"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn, reset_session)
+
+    def discard(self, conn) -> None:
+        """关闭并丢弃一个借出的连接（例如仍有未读完结果集的连接），释放其占用的名额"""
+        self._close_quietly(conn)
+        self._slots.release()
+
+    def close(self) -> None:
+        """关闭连接池及所有空闲连接"""
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except Empty:
+                break
+            self._close_quietly(conn)
+
+
+# 按角色划分的进程级连接池
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(role: Optional[str] = None) -> ConnectionPool:
+    """获取指定角色的连接池，不存在时创建
+
+    Args:
+        role: 角色名称，为空时使用 MYSQL_ROLE
+
+    Returns:
+        ConnectionPool: 该角色的连接池
+    """
+    role = role or get_db_config()["role"]
+    pool = _pools.get(role)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(role)
+        if pool is None:
+            pool = ConnectionPool(name=role, **get_pool_config(role))
+            _pools[role] = pool
+            logger.info(f"创建连接池: role={role}, size={pool.size}")
+    return pool
+
+
+def init_pools(*roles: str) -> None:
+    """服务启动时创建连接池
+
+    Args:
+        roles: 需要预先创建的角色，为空时只创建默认角色的连接池
+    """
+    for role in roles or (None,):
+        get_pool(role)
+
+
+def close_pools() -> None:
+    """关闭所有连接池"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,127 @@
+import logging
+from collections import OrderedDict
+from typing import Any, List, Sequence, Tuple
+
+from mysql.connector import Error
+
+logger = logging.getLogger(__name__)
+
+
+def in_placeholders(values: Sequence[Any]) -> Tuple[str, List[Any]]:
+    """生成 IN (...) 的占位符
+
+    占位符个数向上取整到 2 的幂，不足部分重复最后一个值补齐，
+    使查询不同数量表名时只会产生少量不同的预处理语句。
+
+    Args:
+        values: 参数值，不能为空
+
+    Returns:
+        (占位符字符串, 补齐后的参数列表)
+    """
+    size = 1
+    while size < len(values):
+        size *= 2
+    padded = list(values) + [values[-1]] * (size - len(values))
+    return ", ".join(["%s"] * size), padded
+
+
+class StatementCache:
+    """单个连接上的服务端预处理语句缓存
+
+    mysql.connector 的预处理游标只在再次执行同一个语句对象时复用已准备的语句，
+    这里按SQL文本为每条语句保留一个预处理游标，超出容量时关闭最久未用的语句。
+    """
+
+    def __init__(self, conn, max_size: int = 32):
+        self.conn = conn
+        self.connection_id = conn.connection_id
+        self.max_size = max_size
+        # SQL -> (SQL对象, 预处理游标)
+        self._statements: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+
+    def _evict(self, sql: str) -> None:
+        _, cursor = self._statements.pop(sql, (None, None))
+        if cursor is None:
+            return
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def clear(self) -> None:
+        """关闭所有预处理语句"""
+        for sql in list(self._statements):
+            self._evict(sql)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        """执行预处理语句并返回全部结果
+
+        Args:
+            sql: 使用 %s 占位符的SQL
+            params: 绑定参数
+
+        Returns:
+            List[tuple]: 查询结果
+        """
+        # 连接重连后服务端的预处理语句已失效
+        if self.conn.connection_id != self.connection_id:
+            self.clear()
+            self.connection_id = self.conn.connection_id
+
+        entry = self._statements.get(sql)
+        if entry is None:
+            entry = (sql, self.conn.cursor(prepared=True))
+            self._statements[sql] = entry
+            while len(self._statements) > self.max_size:
+                self._evict(next(iter(self._statements)))
+        else:
+            self._statements.move_to_end(sql)
+
+        statement, cursor = entry
+        try:
+            # 必须传入同一个字符串对象，游标才会跳过 PREPARE 直接执行
+            cursor.execute(statement, tuple(params))
+            return [tuple(row) for row in cursor.fetchall()]
+        except Error:
+            self._evict(sql)
+            raise
+
+
+# 语句缓存保存在连接对象的该属性上，随连接一起释放
+_CACHE_ATTR = "_mcp_statement_cache"
+
+
+def execute_prepared(conn, sql: str, params: Sequence[Any] = (), max_size: int = 32) -> List[tuple]:
+    """在连接上以服务端预处理语句执行查询，同一连接上的语句跨调用复用
+
+    Args:
+        conn: 从连接池借出的数据库连接
+        sql: 使用 %s 占位符的SQL
+        params: 绑定参数
+        max_size: 每个连接最多保留的预处理语句数
+
+    Returns:
+        List[tuple]: 查询结果
+    """
+    # 连接同一时间只会借给一个调用方，无需加锁
+    cache = getattr(conn, _CACHE_ATTR, None)
+    if cache is None:
+        cache = StatementCache(conn, max_size)
+        setattr(conn, _CACHE_ATTR, cache)
+    return cache.execute(sql, params)
+
+
+def close_statement_cache(conn) -> None:
+    """关闭连接上缓存的预处理语句（连接关闭或会话重置前调用）
+
+    Args:
+        conn: 数据库连接
+    """
+    cache = getattr(conn, _CACHE_ATTR, None)
+    if cache is None:
+        return
+    cache.clear()
+    # 解除连接与缓存之间的循环引用
+    cache.conn = None
+    delattr(conn, _CACHE_ATTR)
@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from .schema_cache import ddl_targets
+from .statements import Statement, SYSTEM_SCHEMAS, analyze_tables
+
+logger = logging.getLogger(__name__)
+
+# 不修改任何表数据的语句
+_NON_WRITING = frozenset({"SELECT", "SHOW", "DESCRIBE", "DESC", "EXPLAIN", "SET", "USE", "HELP"})
+
+
+class ResultCache:
+    """只读查询结果的LRU缓存
+
+    - 以 (角色, 库名, 规范化SQL, 输出参数) 为键，总大小不超过 max_bytes，条目 ttl 秒后过期
+    - 每个条目记录其引用的表，写入这些表的语句执行后相关条目失效
+    - 查询开始前记录 generation，期间发生过失效时不写入缓存，避免缓存旧数据
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # 键 -> (过期时间, 大小, 引用的表, 结果)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, frozenset, Any]]" = OrderedDict()
+        # (库名, 表名) -> 引用该表的键
+        self._by_table: Dict[Tuple[str, str], Set[Hashable]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def cacheable(self, statement: Statement, default_db: str) -> Optional[Tuple[str, frozenset]]:
+        """判断语句结果是否可以缓存
+
+        Returns:
+            Optional[Tuple[str, frozenset]]: 可缓存时返回 (规范化SQL, 引用的表)，否则返回None
+        """
+        if statement.keywords[:1] != ("SELECT",):
+            return None
+        info = analyze_tables(statement)
+        if info.volatile:
+            return None
+        tables = frozenset(
+            ((db or default_db).lower(), table.lower()) for db, table in info.tables
+        )
+        if any(db in SYSTEM_SCHEMAS for db, _ in tables):
+            return None
+        return info.normalized, tables
+
+    def _remove(self, key: Hashable) -> None:
+        """移除条目（需持有锁）"""
+        _, size, tables, _ = self._entries.pop(key)
+        self._size -= size
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取未过期的缓存，不存在返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() > entry[0]:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[3]
+
+    def put(self, key: Hashable, value: Any, size: int, tables: frozenset, generation: int) -> bool:
+        """写入缓存，超出容量时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            value: 结果
+            size: 结果大小（字节）
+            tables: 结果引用的 (库名, 表名)
+            generation: 查询开始前的 generation
+
+        Returns:
+            bool: 是否写入
+        """
+        if not self.enabled or size > self.max_bytes:
+            return False
+        with self._lock:
+            if generation != self.generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, tables, value)
+            self._size += size
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def invalidate_tables(self, tables: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """使引用了指定表的条目失效
+
+        Args:
+            tables: (库名, 表名)，表名为 None 时使该库的全部条目失效
+
+        Returns:
+            int: 移除的条目数
+        """
+        with self._lock:
+            self.generation += 1
+            keys: Set[Hashable] = set()
+            for database, table in tables:
+                database = (database or "").lower()
+                if table is None:
+                    for (db, _), table_keys in self._by_table.items():
+                        if db == database:
+                            keys.update(table_keys)
+                else:
+                    keys.update(self._by_table.get((database, table.lower()), ()))
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> int:
+        """清空缓存"""
+        with self._lock:
+            self.generation += 1
+            count = len(self._entries)
+            self._entries.clear()
+            self._by_table.clear()
+            self._size = 0
+            self.invalidations += count
+            return count
+
+    def invalidate_for_statement(self, statement: Statement, default_db: str) -> None:
+        """写语句执行成功后使其涉及的表的缓存失效，无法判断涉及哪些表时清空缓存"""
+        if not self.enabled or (statement.keywords and statement.keywords[0] in _NON_WRITING):
+            return
+        targets = ddl_targets(statement.text, default_db)
+        if targets is None:
+            targets = [(db or default_db, table) for db, table in analyze_tables(statement).tables]
+        if targets:
+            self.invalidate_tables(targets)
+        else:
+            # 如 CALL 存储过程，可能修改任意表
+            self.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """命中率等统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """获取进程级查询结果缓存"""
+    global _result_cache
+    if _result_cache is None:
+        from config import get_result_cache_config
+        with _result_cache_lock:
+            if _result_cache is None:
+                config = get_result_cache_config()
+                _result_cache = ResultCache(config["max_bytes"], config["ttl"])
+    return _result_cache
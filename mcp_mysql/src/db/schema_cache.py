@@ -0,0 +1,207 @@
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 会修改表结构的语句，执行成功后需要使相关缓存失效
+_DDL_PREFIX = re.compile(r"^\s*(CREATE|ALTER|DROP|TRUNCATE|RENAME)\b", re.IGNORECASE)
+_NAME = r"(`[^`]+`(?:\.`[^`]+`)?|[\w$]+(?:\.[\w$]+)?|`[^`]+`\.[\w$]+|[\w$]+\.`[^`]+`)"
+_TABLE_DDL = re.compile(
+    r"^\s*(?:CREATE|ALTER|DROP|TRUNCATE)\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?(.+)",
+    re.IGNORECASE | re.DOTALL,
+)
+_INDEX_DDL = re.compile(
+    r"^\s*(?:CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?INDEX|DROP\s+INDEX)\s+\S+\s+ON\s+" + _NAME,
+    re.IGNORECASE,
+)
+_LEADING_NAME = re.compile(r"\s*" + _NAME + r"\s*(,)?")
+_RENAME_DDL = re.compile(r"^\s*RENAME\s+TABLE\s+(.+)", re.IGNORECASE | re.DOTALL)
+_DATABASE_DDL = re.compile(r"^\s*(?:CREATE|ALTER|DROP)\s+(?:DATABASE|SCHEMA)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?" + _NAME, re.IGNORECASE)
+
+
+def _split_name(name: str, default_db: str) -> Tuple[str, str]:
+    """将 `db`.`table` / db.table / table 拆分为 (库名, 表名)"""
+    parts = [part.strip().strip("`") for part in re.findall(r"`[^`]+`|[^.]+", name.strip())]
+    if len(parts) >= 2:
+        return parts[0], parts[1]
+    return default_db, parts[0]
+
+
+def _leading_names(text: str) -> List[str]:
+    """取出语句开头以逗号分隔的表名列表，例如 DROP TABLE a, b"""
+    names = []
+    pos = 0
+    while True:
+        match = _LEADING_NAME.match(text, pos)
+        if not match:
+            return names
+        names.append(match.group(1))
+        if not match.group(2):
+            return names
+        pos = match.end()
+
+
+def ddl_targets(statement: str, default_db: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+    """解析DDL语句影响的库表
+
+    Args:
+        statement: SQL语句
+        default_db: 当前数据库
+
+    Returns:
+        None 表示不是DDL；否则返回 [(库名, 表名)]，表名为 None 表示整个库受影响
+    """
+    if not _DDL_PREFIX.match(statement):
+        return None
+
+    match = _DATABASE_DDL.match(statement)
+    if match:
+        return [(match.group(1).strip("`"), None)]
+
+    match = _INDEX_DDL.match(statement)
+    if match:
+        return [_split_name(match.group(1), default_db)]
+
+    match = _TABLE_DDL.match(statement)
+    if match:
+        names = _leading_names(match.group(1))
+        if names:
+            return [_split_name(name, default_db) for name in names]
+
+    match = _RENAME_DDL.match(statement)
+    if match:
+        names = re.findall(_NAME + r"\s+TO\s+" + _NAME, match.group(1), re.IGNORECASE)
+        if names:
+            return [_split_name(name, default_db) for pair in names for name in pair]
+
+    # 无法识别的DDL（视图、存储过程等），保守地使整个库的缓存失效
+    return [(default_db, None)]
+
+
+class SchemaCache:
+    """进程内表结构元数据缓存
+
+    以 (类别, 库名, 表名) 为键，带TTL；执行DDL或显式调用 invalidate 时失效。
+    第三项不是表名字符串的条目（如按注释搜索表名时以元组为键）属于整个库，
+    库内任何DDL都会使其失效。
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str, Any], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, kind: str, database: str, key: Any) -> Optional[Any]:
+        """读取未过期的缓存，不存在返回 None"""
+        entry = self._entries.get((kind, database, key))
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() > expires_at:
+            with self._lock:
+                self._entries.pop((kind, database, key), None)
+            return None
+        return value
+
+    def set(self, kind: str, database: str, key: Any, value: Any) -> None:
+        """写入缓存"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[(kind, database, key)] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, database: Optional[str] = None, table: Optional[str] = None) -> int:
+        """使缓存失效
+
+        Args:
+            database: 库名，为空时清空全部缓存
+            table: 表名，为空时使整个库的缓存失效；否则只使该表及库级条目失效
+
+        Returns:
+            int: 移除的条目数
+        """
+        with self._lock:
+            if database is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            keys = [
+                key for key in self._entries
+                if key[1] == database and (table is None or key[2] is None
+                                           or not isinstance(key[2], str) or key[2] == table)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def invalidate_for_statement(self, statement: str, default_db: str) -> None:
+        """若语句为DDL，则使其影响的库表缓存失效"""
+        targets = ddl_targets(statement, default_db)
+        for database, table in targets or ():
+            self.invalidate(database, table)
+
+    def lookup(
+        self,
+        kind: str,
+        database: str,
+        tables: Iterable[str],
+        refresh: bool = False,
+    ) -> Tuple[Dict[str, List[Any]], List[str]]:
+        """按表读取缓存
+
+        Args:
+            kind: 元数据类别，如 columns / indexes
+            database: 库名
+            tables: 表名列表
+            refresh: 是否忽略缓存
+
+        Returns:
+            (命中的 {表名: 行列表}, 未命中的表名列表)
+        """
+        hits: Dict[str, List[Any]] = {}
+        missing: List[str] = []
+        for table in tables:
+            cached = None if refresh else self.get(kind, database, table)
+            if cached is None:
+                missing.append(table)
+            else:
+                hits[table] = cached
+        return hits, missing
+
+    def store(
+        self,
+        kind: str,
+        database: str,
+        tables: Iterable[str],
+        fetched: Dict[str, List[Any]],
+    ) -> Dict[str, List[Any]]:
+        """写入批量查询的结果，查询不到的表记为空列表（同样缓存）
+
+        Returns:
+            Dict[str, List[Any]]: {表名: 行列表}
+        """
+        result = {}
+        for table in tables:
+            rows = fetched.get(table, [])
+            self.set(kind, database, table, rows)
+            result[table] = rows
+        return result
+
+
+_schema_cache: Optional[SchemaCache] = None
+_schema_cache_lock = threading.Lock()
+
+
+def get_schema_cache() -> SchemaCache:
+    """获取进程级表结构元数据缓存"""
+    global _schema_cache
+    if _schema_cache is None:
+        from config import get_schema_cache_config
+        with _schema_cache_lock:
+            if _schema_cache is None:
+                _schema_cache = SchemaCache(get_schema_cache_config()["ttl"])
+    return _schema_cache
@@ -0,0 +1,457 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 普通状态下的词法单元：空白、注释、字符串/标识符引号、单词、其他单个字符
+# 可执行注释 /*! ... */ 和优化器提示 /*+ ... */ 会被服务端执行，不视为注释
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<comment>(?:--(?=\s|$)|\#)[^\n]*|/\*(?![!+]).*?(?:\*/|\Z))
+    | (?P<quoted>'(?:[^'\\]|\\.|'')*'?|"(?:[^"\\]|\\.|"")*"?|`(?:[^`]|``)*`?)
+    | (?P<word>[A-Za-z_]\w*)
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+# DELIMITER 命令的参数（到行尾为止）
+_DELIMITER_ARG = re.compile(r"[ \t]+(\S+)[^\n]*")
+
+# 语句开头最多记录的关键字个数，足以区分 CREATE OR REPLACE VIEW 之类的操作
+MAX_KEYWORDS = 4
+
+
+class Statement:
+    """拆分出的单条SQL语句"""
+
+    __slots__ = ("text", "keywords")
+
+    def __init__(self, text: str, keywords: Tuple[str, ...]):
+        self.text = text
+        self.keywords = keywords  # 语句开头连续的关键字（大写）
+
+    def __repr__(self) -> str:
+        return f"Statement({self.text!r})"
+
+
+def split_statements(sql: str) -> List[Statement]:
+    """一次扫描将SQL脚本拆分为语句，同时记录每条语句开头的关键字
+
+    - 引号内、注释中的分隔符不会拆分语句
+    - 支持客户端的 DELIMITER 命令（如定义存储过程时使用 DELIMITER $$）
+    - 只包含空白和注释的片段会被忽略
+
+    Args:
+        sql: SQL脚本
+
+    Returns:
+        List[Statement]: 语句列表，text 已去除开头的注释、首尾空白和分隔符
+    """
+    statements: List[Statement] = []
+    delimiter = ";"
+    length = len(sql)
+    start = 0  # 当前语句起始位置（第一个有效词法单元，跳过开头的注释）
+    pos = 0
+    keywords: List[str] = []
+    collecting = True  # 是否仍在记录开头的关键字
+    significant = False  # 当前语句是否出现过注释和空白以外的内容
+
+    def finish(end: int) -> None:
+        if significant:
+            statements.append(Statement(sql[start:end].strip(), tuple(keywords)))
+
+    while pos < length:
+        if sql.startswith(delimiter, pos):
+            finish(pos)
+            pos += len(delimiter)
+            start = pos
+            keywords = []
+            collecting = True
+            significant = False
+            continue
+
+        match = _TOKEN.match(sql, pos)
+        kind = match.lastgroup
+        if kind == "word":
+            word = match.group().upper()
+            if not significant and word == "DELIMITER":
+                arg = _DELIMITER_ARG.match(sql, match.end())
+                if arg:
+                    delimiter = arg.group(1)
+                    pos = start = arg.end()
+                    continue
+            if not significant:
+                start = pos
+            if collecting and len(keywords) < MAX_KEYWORDS:
+                keywords.append(word)
+            significant = True
+        elif kind in ("quoted", "other"):
+            if not significant:
+                start = pos
+            # 允许 (SELECT ...) 这样以括号开头的语句
+            if not (kind == "other" and match.group() == "(" and not keywords):
+                collecting = False
+            significant = True
+        pos = match.end()
+
+    finish(length)
+    return statements
+
+
+class KeywordTrie:
+    """按关键字序列匹配操作类型的前缀树，如 CREATE -> VIEW"""
+
+    __slots__ = ("children", "operation")
+
+    def __init__(self, operations: Iterable[str] = ()):
+        self.children: Dict[str, "KeywordTrie"] = {}
+        self.operation: Optional[str] = None
+        for operation in operations:
+            self.insert(operation)
+
+    def insert(self, operation: str) -> None:
+        node = self
+        for word in operation.upper().split():
+            node = node.children.setdefault(word, KeywordTrie())
+        node.operation = operation.upper()
+
+    def match(self, keywords: Iterable[str]) -> Optional[str]:
+        """返回与关键字序列匹配的最长操作，无匹配时返回None"""
+        node = self
+        matched = None
+        for word in keywords:
+            node = node.children.get(word)
+            if node is None:
+                break
+            if node.operation is not None:
+                matched = node.operation
+        return matched
+
+
+@lru_cache(maxsize=32)
+def _permission_trie(operations: Tuple[str, ...]) -> KeywordTrie:
+    return KeywordTrie(operations)
+
+
+def match_operation(statement: Statement, allowed_operations: Iterable[str]) -> Optional[str]:
+    """返回语句匹配到的已授权操作
+
+    Args:
+        statement: 语句
+        allowed_operations: 允许的操作列表，如 ["SELECT", "CREATE VIEW"]
+
+    Returns:
+        Optional[str]: 匹配到的最长操作，未授权时返回None
+    """
+    return _permission_trie(tuple(allowed_operations)).match(statement.keywords)
+
+
+def insert_values(statement: Statement) -> Optional[Tuple[str, str]]:
+    """拆分单行 INSERT ... VALUES (...) 语句
+
+    Args:
+        statement: 语句
+
+    Returns:
+        Optional[Tuple[str, str]]: (VALUES 之前的部分, 行的括号表达式)；
+        不是单行 VALUES 插入（如 INSERT ... SELECT、多行、ON DUPLICATE KEY UPDATE）时返回None
+    """
+    if statement.keywords[:1] != ("INSERT",):
+        return None
+
+    text = statement.text
+    depth = 0
+    head_end = row_start = row_end = None
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        if kind in ("space", "comment"):
+            continue
+        if row_end is not None:
+            # 行之后还有其他内容
+            return None
+        token = match.group()
+        if row_start is None and head_end is not None:
+            if token != "(":
+                return None
+            row_start = match.start()
+            depth = 1
+            continue
+        if kind == "word":
+            if head_end is None and depth == 0 and token.upper() in ("VALUES", "VALUE"):
+                head_end = match.start()
+        elif token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+            if row_start is not None and depth == 0:
+                row_end = match.end()
+
+    if row_end is None:
+        return None
+    return text[:head_end].rstrip(), text[row_start:row_end]
+
+
+def batch_inserts(statements: List[Statement], max_rows: int, max_bytes: int) -> List[Tuple[Statement, int]]:
+    """将连续的、插入同一张表同样列的单行 INSERT 合并为多行 INSERT
+
+    Args:
+        statements: 语句列表
+        max_rows: 每个批次最多合并的行数
+        max_bytes: 每个批次SQL的最大字节数（需小于服务端 max_allowed_packet）
+
+    Returns:
+        List[Tuple[Statement, int]]: (语句, 合并的原始语句数)，顺序与原语句一致
+    """
+    batches: List[Tuple[Statement, int]] = []
+    group: List[Statement] = []
+    rows: List[str] = []
+    head: Optional[str] = None
+    size = 0
+
+    def flush() -> None:
+        if len(group) == 1:
+            batches.append((group[0], 1))
+        elif group:
+            text = f"{head} VALUES {','.join(rows)}"
+            batches.append((Statement(text, group[0].keywords), len(group)))
+        group.clear()
+        rows.clear()
+
+    for statement in statements:
+        parts = insert_values(statement)
+        if parts is None:
+            flush()
+            batches.append((statement, 1))
+            continue
+        row_bytes = len(parts[1].encode("utf-8")) + 1
+        if parts[0] != head or len(rows) >= max_rows or size + row_bytes > max_bytes:
+            flush()
+            head = parts[0]
+            size = len(head.encode("utf-8")) + len(" VALUES ")
+        group.append(statement)
+        rows.append(parts[1])
+        size += row_bytes
+
+    flush()
+    return batches
+
+
+# 读语句中出现即不可缓存的关键字：结果随时间/会话变化的函数、用户变量赋值、锁定读
+_VOLATILE_WORDS = frozenset({
+    "NOW", "SYSDATE", "CURDATE", "CURTIME", "CURRENT_DATE", "CURRENT_TIME", "CURRENT_TIMESTAMP",
+    "LOCALTIME", "LOCALTIMESTAMP", "UTC_DATE", "UTC_TIME", "UTC_TIMESTAMP", "UNIX_TIMESTAMP",
+    "RAND", "UUID", "UUID_SHORT", "RANDOM_BYTES", "LAST_INSERT_ID", "CONNECTION_ID", "FOUND_ROWS",
+    "ROW_COUNT", "USER", "CURRENT_USER", "SESSION_USER", "SYSTEM_USER", "SLEEP", "GET_LOCK",
+    "RELEASE_LOCK", "IS_FREE_LOCK", "IS_USED_LOCK", "BENCHMARK", "NEXTVAL",
+    "INTO", "FOR", "LOCK",
+})
+# 其后跟表名的关键字
+_TABLE_KEYWORDS = frozenset({"FROM", "JOIN", "STRAIGHT_JOIN", "INTO", "UPDATE", "TABLE", "TABLES"})
+# 其后跟逗号分隔的表名列表的关键字
+_TABLE_LIST_KEYWORDS = frozenset({"FROM", "UPDATE", "TABLE", "TABLES"})
+# 表名之前可能出现的修饰词
+_TABLE_MODIFIERS = frozenset({"LOW_PRIORITY", "DELAYED", "HIGH_PRIORITY", "IGNORE", "INTO", "QUICK", "ONLY"})
+# 表名列表结束的子句关键字
+_CLAUSE_KEYWORDS = frozenset({
+    "WHERE", "GROUP", "ORDER", "LIMIT", "HAVING", "UNION", "EXCEPT", "INTERSECT", "WINDOW", "FOR",
+    "LOCK", "INTO", "ON", "USING", "JOIN", "STRAIGHT_JOIN", "INNER", "LEFT", "RIGHT", "CROSS",
+    "NATURAL", "FULL", "OUTER", "SET", "VALUES", "VALUE", "SELECT", "PARTITION", "READ", "WRITE",
+})
+# 不会被本服务的写操作改变的系统库
+SYSTEM_SCHEMAS = frozenset({"information_schema", "performance_schema", "mysql", "sys"})
+
+
+def _unquote(token: str) -> str:
+    if token.startswith("`"):
+        return token[1:-1].replace("``", "`")
+    return token
+
+
+class StatementTables:
+    """语句的规范化文本和引用的表"""
+
+    __slots__ = ("normalized", "tables", "volatile")
+
+    def __init__(self, normalized: str, tables: List[Tuple[Optional[str], str]], volatile: bool):
+        self.normalized = normalized  # 去除注释、合并空白后的SQL
+        self.tables = tables  # [(库名或None, 表名)]
+        self.volatile = volatile  # 是否包含结果不确定或有副作用的内容
+
+
+def analyze_tables(statement: Statement) -> StatementTables:
+    """一次扫描得到语句的规范化文本和 FROM/JOIN/INTO/UPDATE/TABLE 之后引用的表
+
+    表名的识别是保守的：别名、子查询中的表也会被收集，宁可多报不漏报，
+    用于结果缓存的失效判断。
+
+    Args:
+        statement: 语句
+
+    Returns:
+        StatementTables: 分析结果
+    """
+    parts: List[str] = []
+    tables: List[Tuple[Optional[str], str]] = []
+    volatile = False
+    state = None  # expect: 等待表名；name: 读到表名；dot: 表名中的"."之后；after: 表名之后
+    in_list = False
+    name: List[str] = []
+
+    def add_table() -> None:
+        if len(name) >= 2:
+            tables.append((name[-2], name[-1]))
+        elif name:
+            tables.append((None, name[0]))
+        name.clear()
+
+    for index, match in enumerate(_TOKEN.finditer(statement.text)):
+        kind = match.lastgroup
+        token = match.group()
+        if kind in ("space", "comment"):
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+            continue
+        parts.append(token)
+
+        upper = token.upper() if kind == "word" else token
+        is_name = (kind == "word" and upper not in _CLAUSE_KEYWORDS) or (kind == "quoted" and token[0] == "`")
+        if upper in _VOLATILE_WORDS or token == "@":
+            volatile = True
+
+        if state == "name":
+            if token == ".":
+                state = "dot"
+                continue
+            add_table()
+            state = "after"
+        elif state == "dot":
+            state = None
+            if is_name:
+                name.append(_unquote(token))
+                state = "name"
+                continue
+            name.clear()
+
+        if state == "expect":
+            if kind == "word" and upper in _TABLE_MODIFIERS:
+                continue
+            state = None
+            if is_name:
+                name.append(_unquote(token))
+                state = "name"
+                continue
+        elif state == "after":
+            if token == "," and in_list:
+                state = "expect"
+                continue
+            if token in ("(", ")") or (kind == "word" and upper in _CLAUSE_KEYWORDS):
+                state = None
+                in_list = False
+
+        if kind == "word" and (upper in _TABLE_KEYWORDS or (not parts[:-1] and upper in ("INSERT", "REPLACE"))):
+            state = "expect"
+            in_list = upper in _TABLE_LIST_KEYWORDS
+
+    if state == "name":
+        add_table()
+    return StatementTables("".join(parts).strip(), tables, volatile)
+
+
+def fingerprint(statement: Statement) -> str:
+    """语句指纹：去除注释和多余空白，字符串和数字字面量替换为 ?，关键字统一大写
+
+    字面量不同但结构相同的语句指纹相同，用于缓存执行计划。
+    """
+    parts: List[str] = []
+    number = False
+    space = False
+
+    def append(token: str) -> None:
+        # 只在两个单词之间保留一个空格
+        if space and parts and (parts[-1][-1].isalnum() or parts[-1][-1] in "_?`") \
+                and (token[0].isalnum() or token[0] in "_?`"):
+            parts.append(" ")
+        parts.append(token)
+
+    for match in _TOKEN.finditer(statement.text):
+        kind = match.lastgroup
+        token = match.group()
+        if kind in ("space", "comment"):
+            number = False
+            space = True
+            continue
+        if kind == "quoted" and token[0] != "`":
+            append("?")
+        elif kind == "other" and (token.isdigit() or (number and token == ".")):
+            if not number:
+                append("?")
+            number = True
+            space = False
+            continue
+        elif kind == "word":
+            append(token.upper())
+        else:
+            append(token)
+        number = False
+        space = False
+    return "".join(parts)
+
+
+def top_level_words(statement: Statement) -> frozenset:
+    """语句最外层（不在括号内）出现的单词（大写），用于判断 LIMIT、FOR UPDATE 等子句"""
+    words = set()
+    depth = 0
+    for match in _TOKEN.finditer(statement.text):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == "word" and depth == 0:
+            words.add(token.upper())
+        elif token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+    return frozenset(words)
+
+
+def top_level_limit(statement: Statement) -> Optional[int]:
+    """语句最外层 LIMIT 子句最多读取的行数（偏移量加行数）
+
+    支持 LIMIT n、LIMIT offset, n 和 LIMIT n OFFSET offset
+
+    Returns:
+        Optional[int]: 没有最外层 LIMIT 或参数不是数字（如占位符）时返回None
+    """
+    depth = 0
+    tokens = []
+    in_limit = False
+    for match in _TOKEN.finditer(statement.text):
+        kind = match.lastgroup
+        token = match.group()
+        if kind in ("space", "comment"):
+            continue
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif depth == 0 and kind == "word" and token.upper() == "LIMIT":
+            in_limit = True
+            tokens = []
+        elif in_limit and depth == 0:
+            if token.isdigit() and tokens and tokens[-1][0].isdigit() and tokens[-1][1] == match.start():
+                # 数字按单个字符切分，拼回相邻的数字
+                tokens[-1] = (tokens[-1][0] + token, match.end())
+            else:
+                tokens.append((token.upper(), match.end()))
+
+    if not in_limit:
+        return None
+    parts = [token for token, _ in tokens]
+    try:
+        if len(parts) >= 3 and parts[1] == ",":
+            return int(parts[0]) + int(parts[2])
+        if len(parts) >= 3 and parts[1] == "OFFSET":
+            return int(parts[0]) + int(parts[2])
+        return int(parts[0])
+    except (IndexError, ValueError):
+        return None
+
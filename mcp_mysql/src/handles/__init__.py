@@ -1,10 +1,24 @@
-from .execute_sql import ExecuteSQL
-from .get_chinese_initials import GetChineseInitials
-from .get_table_desc import GetTableDesc
-from .get_table_index import GetTableIndex
-from .get_table_lock import GetTableLock
-from .get_table_name import GetTableName
-from .get_db_health_running import GetDBHealthRunning
+import importlib
+
+# 处理器类按需导入（PEP 562），导入 handles 包不会加载各处理器及其依赖
+_HANDLER_MODULES = {
+    "ExecuteSQL": ".execute_sql",
+    "GetChineseInitials": ".get_chinese_initials",
+    "GetTableDesc": ".get_table_desc",
+    "GetTableIndex": ".get_table_index",
+    "GetTableLock": ".get_table_lock",
+    "GetTableName": ".get_table_name",
+    "GetDBHealthRunning": ".get_db_health_running",
+    "GetResultCacheStats": ".get_result_cache_stats",
+}
+
+
+def __getattr__(name):
+    module = _HANDLER_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
+
 
 __all__ = [
     "ExecuteSQL",
@@ -13,5 +27,6 @@ __all__ = [
     "GetTableIndex",
     "GetTableLock",
     "GetTableName",
-    "GetDBHealthRunning"
-]
\ No newline at end of file
+    "GetDBHealthRunning",
+    "GetResultCacheStats"
+]
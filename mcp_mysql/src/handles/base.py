@@ -1,57 +1,109 @@
-from typing import Dict, Any, Sequence, Type, ClassVar
+import importlib
+import threading
+from typing import Dict, Any, Sequence, Type, ClassVar, Union, Optional
 
-from mcp.types import TextContent, Tool
+from mcp.types import TextContent, EmbeddedResource, Tool
+
+from .manifest import TOOL_MANIFEST
 
 
 class ToolRegistry:
-    """工具注册表，用于管理所有工具实例"""
+    """工具注册表，用于管理所有工具实例
+
+    工具的描述和参数定义来自静态清单（handles/manifest.py），列出工具时不导入处理器模块；
+    处理器模块在首次获取该工具时才导入，实例同样在首次获取时创建并复用。
+    """
+    _manifest: ClassVar[Dict[str, Dict[str, Any]]] = {entry["name"]: entry for entry in TOOL_MANIFEST}
+    _classes: ClassVar[Dict[str, Type['BaseHandler']]] = {}
     _tools: ClassVar[Dict[str, 'BaseHandler']] = {}
+    _tool_list: ClassVar[Optional[list[Tool]]] = None
+    _lock: ClassVar[threading.RLock] = threading.RLock()
 
     @classmethod
     def register(cls, tool_class: Type['BaseHandler']) -> Type['BaseHandler']:
-        """注册工具类
-        
+        """注册工具类（只记录类，不创建实例）
+
         Args:
             tool_class: 要注册的工具类
-            
+
         Returns:
             返回注册的工具类，方便作为装饰器使用
         """
-        tool = tool_class()
-        cls._tools[tool.name] = tool
+        with cls._lock:
+            cls._classes[tool_class.name] = tool_class
+            if tool_class.name not in cls._manifest:
+                # 清单外的工具需要实例化才能取得描述，重新生成工具列表
+                cls._tool_list = None
         return tool_class
 
+    @classmethod
+    def describe(cls, name: str) -> Tool:
+        """根据清单生成工具描述
+
+        Raises:
+            ValueError: 清单中没有该工具时抛出
+        """
+        entry = cls._manifest.get(name)
+        if entry is None:
+            raise ValueError(f"未知的工具: {name}")
+        return Tool(name=name, description=entry["description"], inputSchema=entry["inputSchema"])
+
     @classmethod
     def get_tool(cls, name: str) -> 'BaseHandler':
-        """获取工具实例
-        
+        """获取工具实例，首次获取时导入处理器模块并创建实例
+
         Args:
             name: 工具名称
-            
+
         Returns:
             工具实例
-            
+
         Raises:
             ValueError: 当工具不存在时抛出
         """
-        if name not in cls._tools:
-            raise ValueError(f"未知的工具: {name}")
-        return cls._tools[name]
+        tool = cls._tools.get(name)
+        if tool is not None:
+            return tool
+
+        with cls._lock:
+            tool = cls._tools.get(name)
+            if tool is not None:
+                return tool
+
+            tool_class = cls._classes.get(name)
+            if tool_class is None:
+                entry = cls._manifest.get(name)
+                if entry is None:
+                    raise ValueError(f"未知的工具: {name}")
+                # 导入模块时处理器类通过 __init_subclass__ 完成注册
+                tool_class = getattr(importlib.import_module(entry["module"]), entry["handler"])
+
+            tool = tool_class()
+            cls._tools[name] = tool
+            return tool
 
     @classmethod
     def get_all_tools(cls) -> list[Tool]:
-        """获取所有工具的描述
-        
+        """获取所有工具的描述，结果只生成一次
+
         Returns:
             所有工具的描述列表
         """
-        return [tool.get_tool_description() for tool in cls._tools.values()]
+        tools = cls._tool_list
+        if tools is None:
+            with cls._lock:
+                tools = [cls.describe(name) for name in cls._manifest]
+                tools.extend(
+                    cls.get_tool(name).get_tool_description()
+                    for name in cls._classes if name not in cls._manifest
+                )
+                cls._tool_list = tools
+        return tools
 
 
 class BaseHandler:
     """工具基类"""
     name: str = ""
-    description: str = ""
 
     def __init_subclass__(cls, **kwargs):
         """子类初始化时自动注册到工具注册表"""
@@ -60,8 +112,8 @@ class BaseHandler:
             ToolRegistry.register(cls)
 
     def get_tool_description(self) -> Tool:
-        raise NotImplementedError
+        """工具描述，默认取自工具清单；不在清单中的工具需重写"""
+        return ToolRegistry.describe(self.name)
 
-    async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+    async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[Union[TextContent, EmbeddedResource]]:
         raise NotImplementedError
-
@@ -1,144 +1,544 @@
-from typing import Dict, Any, Sequence
+from typing import Dict, Any, Sequence, List, Union, Callable, Optional
+import base64
 import logging
+import secrets
+import time
 import traceback
 
-from mcp import Tool
-from mcp.types import TextContent
-from mysql.connector import connect, Error
+from mcp.types import TextContent, EmbeddedResource, BlobResourceContents
+from mysql.connector import Error
 
-from config import get_db_config, get_role_permissions
+from config import get_db_config, get_role_permissions, get_result_config, get_batch_config
+from db import run_query, run_blocking
+from db.cursors import ParkedCursor, fetch_page, drain, get_cursor_registry
+from db.formats import (
+    ARROW_MIME_TYPE, check_format, column_types, encode_csv, encode_json, encode_arrow
+)
+from db.schema_cache import get_schema_cache
+from db.result_cache import get_result_cache
+from db.cost_guard import get_cost_guard
+from db.statements import Statement, split_statements, match_operation, batch_inserts
+from metrics import get_metrics
 from .base import BaseHandler
 
-# 配置日志
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class ExecuteSQL(BaseHandler):
     name = "execute_sql"
-    description = (
-        "在MySQL数据库上执行SQL (multiple SQL execution, separated by ';')"
-    )
-
-    def get_tool_description(self) -> Tool:
-        return Tool(
-            name=self.name,
-            description=self.description,
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "要执行的SQL语句"
-                    }
-                },
-                "required": ["query"]
-            }
-        )
-
-    def check_sql_permission(self, sql: str, allowed_operations: list) -> bool:
+
+    def check_sql_permission(self, statement: Statement, allowed_operations: list) -> bool:
         """检查SQL语句是否有执行权限
-        
+
+        按语句开头的关键字在权限前缀树中匹配，支持 CREATE VIEW 这类多个单词的操作。
+
         参数:
-            sql (str): SQL语句
+            statement (Statement): 由 split_statements 拆分出的语句
             allowed_operations (list): 允许的操作列表
-            
+
         返回:
             bool: 是否有权限执行
         """
-        # 提取SQL语句的操作类型
-        operation = sql.strip().split()[0].upper()
-        return operation in allowed_operations
-
-    async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-       """执行SQL查询语句
-
-          参数:
-              query (str): 要执行的SQL语句，支持多条语句以分号分隔
-
-          返回:
-              list[TextContent]: 包含查询结果的TextContent列表
-              - 对于SELECT查询：返回CSV格式的结果，包含列名和数据
-              - 对于SHOW TABLES：返回数据库中的所有表名
-              - 对于其他查询：返回执行状态和影响行数
-              - 多条语句的结果以"---"分隔
-
-          异常:
-              Error: 当数据库连接或查询执行失败时抛出
-          """
-       try:
-           config = get_db_config()
-           logger.debug(f"数据库配置: {config}")
-           
-           if "query" not in arguments:
-               raise ValueError("缺少查询语句")
-
-           query = arguments["query"]
-           logger.debug(f"执行SQL: {query}")
-           
-           # 获取角色权限
-           allowed_operations = get_role_permissions(config["role"])
-           logger.debug(f"允许的操作: {allowed_operations}")
-
-           try:
-               with connect(**{k: v for k, v in config.items() if k != "role"}) as conn:
-                   logger.debug("数据库连接成功")
-                   with conn.cursor() as cursor:
-                       statements = [stmt.strip() for stmt in query.split(';') if stmt.strip()]
-                       results = []
-
-                       for statement in statements:
-                           try:
-                               # 检查权限
-                               if not self.check_sql_permission(statement, allowed_operations):
-                                   error_msg = f"权限不足: 当前角色 '{config['role']}' 无权执行该SQL操作"
-                                   logger.warning(error_msg)
-                                   results.append(error_msg)
-                                   continue
-
-                               cursor.execute(statement)
-                               logger.debug(f"执行成功: {statement}")
-
-                               # 检查语句是否返回了结果集 (SELECT, SHOW, EXPLAIN, etc.)
-                               if cursor.description:
-                                   columns = [desc[0] for desc in cursor.description]
-                                   rows = cursor.fetchall()
-                                   logger.debug(f"查询结果: {len(rows)} 行")
-
-                                   # 将每一行的数据转换为字符串，特殊处理None值
-                                   formatted_rows = []
-                                   for row in rows:
-                                       formatted_row = ["NULL" if value is None else str(value) for value in row]
-                                       formatted_rows.append(",".join(formatted_row))
-
-                                   # 将列名和数据合并为CSV格式
-                                   results.append("\n".join([",".join(columns)] + formatted_rows))
-
-                               # 如果语句没有返回结果集 (INSERT, UPDATE, DELETE, etc.)
-                               else:
-                                   conn.commit()  # 只有在非查询语句时才提交
-                                   success_msg = f"查询执行成功。影响行数: {cursor.rowcount}"
-                                   logger.info(success_msg)
-                                   results.append(success_msg)
-
-                           except Error as stmt_error:
-                               # 单条语句执行出错时，记录错误并继续执行
-                               error_msg = f"执行语句 '{statement}' 出错: {str(stmt_error)}"
-                               logger.error(error_msg)
-                               logger.error(traceback.format_exc())
-                               results.append(error_msg)
-                               # 可以在这里选择是否继续执行后续语句，目前是继续
-
-                   return [TextContent(type="text", text="\n---\n".join(results))]
-
-           except Error as e:
-               error_msg = f"数据库连接失败: {str(e)}"
-               logger.error(error_msg)
-               logger.error(traceback.format_exc())
-               return [TextContent(type="text", text=error_msg)]
-
-       except Exception as e:
-           error_msg = f"未知错误: {str(e)}"
-           logger.error(error_msg)
-           logger.error(traceback.format_exc())
-           return [TextContent(type="text", text=error_msg)]
+        return match_operation(statement, allowed_operations) is not None
+
+    def estimate_total_rows(self, pool, statement: str):
+        """通过 EXPLAIN 估算查询的行数（尽力而为，失败返回None）
+
+        结果集未读完时原连接被占用，这里不等待地另借一个连接。
+        """
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return None
+        try:
+            with pool.connection(timeout=0, reset_session=False) as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN {statement}")
+                    columns = [desc[0].lower() for desc in cursor.description]
+                    rows = cursor.fetchall()
+            if not rows or "rows" not in columns:
+                return None
+            return int(rows[0][columns.index("rows")] or 0)
+        except Exception as e:
+            logger.debug(f"估算行数失败: {e}")
+            return None
+
+    def truncated_note(self, page, start: int, token: str = None, total: int = None, estimated: int = None) -> str:
+        """截断的结果页的说明"""
+        end = start + len(page.lines) - 1
+        note = f"-- 已返回第 {start}-{end} 行"
+        if total is not None:
+            note += f"，共 {total} 行，超出部分已丢弃"
+        elif estimated is not None:
+            note += f"，估算总行数: {estimated}"
+        if token:
+            note += f"。结果未读完，继续获取请调用 execute_sql 并传入 cursor=\"{token}\""
+        return note
+
+    def render_page(self, page, types: List[str], result_format: str, note: str = None) -> list:
+        """按指定格式输出一页结果
+
+        text 格式的说明追加在结果末尾（与之前的输出一致）；CSV/JSON 结果和说明各自作为
+        单独的 TextContent，不与其他文本合并，保证可以直接解析。
+
+        返回:
+            list: 结果项，str（可与相邻文本合并）、TextContent 或 EmbeddedResource
+        """
+        get_metrics().record_rows(len(page.rows))
+        if result_format == "arrow":
+            blob = encode_arrow(page.columns, types, page.rows)
+            resource = EmbeddedResource(
+                type="resource",
+                resource=BlobResourceContents(
+                    uri=f"mysql://result/{secrets.token_urlsafe(8)}.arrow",
+                    mimeType=ARROW_MIME_TYPE,
+                    blob=base64.b64encode(blob).decode("ascii"),
+                ),
+            )
+            summary = f"-- Arrow IPC 结果: {len(page.rows)} 行, {len(blob)} 字节"
+            return [resource, summary + "\n" + note if note else summary]
+
+        if result_format == "text":
+            text = page.to_text()
+            return [text + "\n" + note if note else text]
+
+        if result_format == "csv":
+            text = encode_csv(page.columns, page.rows)
+        else:
+            text = encode_json(page.columns, types, page.rows)
+        items = [TextContent(type="text", text=text)]
+        if note:
+            items.append(TextContent(type="text", text=note))
+        return items
+
+    def to_contents(self, results: list) -> List[Union[TextContent, EmbeddedResource]]:
+        """将结果项转换为工具返回内容
+
+        只有相邻的纯文本（str）以"---"分隔合并，TextContent 和 EmbeddedResource 原样保留。
+        """
+        contents = []
+        texts = []
+        for item in results:
+            if isinstance(item, str):
+                texts.append(item)
+                continue
+            if texts:
+                contents.append(TextContent(type="text", text="\n---\n".join(texts)))
+                texts = []
+            contents.append(item)
+        if texts or not contents:
+            contents.append(TextContent(type="text", text="\n---\n".join(texts)))
+        return contents
+
+    @staticmethod
+    def current_database(conn, default: str = None) -> str:
+        """连接当前所在的库（执行 SELECT DATABASE()），未选择库或查询失败时返回 default
+
+        语句中的 USE 会切换当前库，缓存的键和失效都以执行时连接实际所在的库为准。
+        """
+        try:
+            return conn.database or default
+        except Error:
+            return default
+
+    @staticmethod
+    def item_size(item) -> int:
+        """结果项的大小，用于结果缓存的容量统计"""
+        if isinstance(item, str):
+            return len(item)
+        if isinstance(item, TextContent):
+            return len(item.text)
+        return len(item.resource.blob)
+
+    def execute_statements(self, conn, handle, statements: list, role: str, allowed_operations: list,
+                           max_rows: int, max_bytes: int, database: str = None,
+                           result_format: str = "text",
+                           on_result: Optional[Callable[[int, list], None]] = None) -> list:
+        """在给定连接上依次执行SQL语句（同步，在查询线程池中运行）
+
+        结果集使用非缓冲游标 fetchmany 流式读取，超出行数/字节数预算时截断：
+        最后一条语句的结果集保留在服务端并返回续取令牌，其余语句的剩余数据读完丢弃。
+
+        参数:
+            conn: 从连接池借出的数据库连接
+            handle: 查询句柄，保留结果集时通过它接管连接
+            statements (list[Statement]): 待执行的SQL语句列表
+            role (str): 当前角色
+            allowed_operations (list): 允许的操作列表
+            max_rows (int): 每个结果集返回的最大行数
+            max_bytes (int): 每个结果集返回的最大字节数
+            database (str): 默认库名，无法查询连接当前所在的库时使用
+            result_format (str): 结果集的输出格式
+            on_result (Callable): 可选，结果集完整读取后以 (语句序号, 结果项, 连接当前所在的库) 回调，
+                用于写入结果缓存
+
+        返回:
+            list: 每条语句的执行结果，str 或 EmbeddedResource
+        """
+        results = []
+        guard = get_cost_guard()
+        # 连接当前所在的库，首次需要时查询，执行 USE 后重新查询
+        current_db = None
+        cursor = conn.cursor()
+        try:
+            for index, parsed in enumerate(statements):
+                statement = parsed.text
+                try:
+                    # 检查权限
+                    if not self.check_sql_permission(parsed, allowed_operations):
+                        error_msg = f"权限不足: 当前角色 '{role}' 无权执行该SQL操作"
+                        logger.warning(error_msg)
+                        get_metrics().record_error("permission")
+                        results.append(error_msg)
+                        continue
+
+                    # SELECT 执行前的成本检查，可能拒绝执行或追加 LIMIT / 执行时间提示
+                    if guard.enabled:
+                        reviewed = guard.review(conn, parsed, database)
+                        if reviewed.rejected:
+                            logger.warning(reviewed.note)
+                            get_metrics().record_error("cost_guard")
+                            results.append(reviewed.note)
+                            continue
+                        if reviewed.note:
+                            results.append(reviewed.note)
+                        statement = reviewed.statement
+
+                    cursor.execute(statement)
+
+                    # 检查语句是否返回了结果集 (SELECT, SHOW, EXPLAIN, etc.)
+                    if cursor.description:
+                        columns = [desc[0] for desc in cursor.description]
+                        types = column_types(cursor.description)
+                        page = fetch_page(cursor, columns, max_rows, max_bytes)
+
+                        if page.exhausted:
+                            items = self.render_page(page, types, result_format)
+                            results.extend(items)
+                            if on_result is not None:
+                                if current_db is None:
+                                    current_db = self.current_database(conn, database)
+                                on_result(index, items, current_db)
+                        elif index == len(statements) - 1:
+                            # 最后一条语句：保留结果集，客户端可凭令牌续取而无需重新执行
+                            estimated = self.estimate_total_rows(handle.pool, statement)
+                            token = get_cursor_registry().park(ParkedCursor(
+                                handle.pool, conn, cursor, columns,
+                                len(page.lines), page.pending_rows, estimated,
+                                types, result_format
+                            ))
+                            handle.detach()
+                            cursor = None
+                            note = self.truncated_note(page, 1, token=token, estimated=estimated)
+                            results.extend(self.render_page(page, types, result_format, note))
+                        else:
+                            # 后续还有语句需要使用该连接，读完剩余数据以得到准确行数
+                            total = len(page.lines) + len(page.pending_rows) + drain(cursor)
+                            note = self.truncated_note(page, 1, total=total)
+                            results.extend(self.render_page(page, types, result_format, note))
+
+                    # 如果语句没有返回结果集 (INSERT, UPDATE, DELETE, etc.)
+                    else:
+                        conn.commit()  # 只有在非查询语句时才提交
+                        if parsed.keywords[:1] == ("USE",):
+                            current_db = None
+                        else:
+                            if current_db is None:
+                                current_db = self.current_database(conn, database)
+                            # DDL 会改变表结构，使对应的表结构缓存失效
+                            get_schema_cache().invalidate_for_statement(statement, current_db)
+                            get_result_cache().invalidate_for_statement(parsed, current_db)
+                        success_msg = f"查询执行成功。影响行数: {cursor.rowcount}"
+                        logger.info(success_msg)
+                        results.append(success_msg)
+
+                except Error as stmt_error:
+                    # 单条语句执行出错时，记录错误并继续执行
+                    error_msg = f"执行语句 '{statement}' 出错: {str(stmt_error)}"
+                    logger.error(error_msg)
+                    logger.error(traceback.format_exc())
+                    get_metrics().record_error("sql")
+                    results.append(error_msg)
+                    # 可以在这里选择是否继续执行后续语句，目前是继续
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+        return results
+
+    def execute_transaction(self, conn, statements: list, role: str, allowed_operations: list,
+                            max_rows: int, max_bytes: int, database: str = None,
+                            result_format: str = "text") -> list:
+        """在一个事务中执行全部语句（同步，在查询线程池中运行）
+
+        执行前先检查所有语句的权限；连续的单行 INSERT 合并为多行 INSERT，
+        任一语句出错时回滚整个事务并停止执行，全部成功后只提交一次。
+        注意 DDL 语句会被 MySQL 隐式提交，无法回滚。
+
+        参数:
+            conn: 从连接池借出的数据库连接
+            statements (list[Statement]): 待执行的SQL语句列表
+            role (str): 当前角色
+            allowed_operations (list): 允许的操作列表
+            max_rows (int): 每个结果集返回的最大行数
+            max_bytes (int): 每个结果集返回的最大字节数
+            database (str): 默认库名，无法查询连接当前所在的库时使用
+            result_format (str): 结果集的输出格式
+
+        返回:
+            list: 每个批次的执行结果，最后一项为事务状态
+        """
+        for parsed in statements:
+            if not self.check_sql_permission(parsed, allowed_operations):
+                error_msg = f"权限不足: 当前角色 '{role}' 无权执行该SQL操作: {parsed.text[:200]}"
+                logger.warning(error_msg)
+                get_metrics().record_error("permission")
+                return [error_msg, "事务未执行"]
+
+        batch_config = get_batch_config()
+        batches = batch_inserts(statements, batch_config["max_rows"], batch_config["max_bytes"])
+
+        results = []
+        # (写语句, 执行时连接所在的库)
+        written = []
+        current_db = None
+        guard = get_cost_guard()
+        cursor = conn.cursor()
+        try:
+            if not conn.in_transaction:
+                conn.start_transaction()
+            for parsed, count in batches:
+                statement = parsed.text
+                if guard.enabled and count == 1:
+                    reviewed = guard.review(conn, parsed, database)
+                    if reviewed.rejected:
+                        conn.rollback()
+                        get_metrics().record_error("cost_guard")
+                        results.append(reviewed.note)
+                        results.append("事务已回滚，后续语句未执行")
+                        return results
+                    if reviewed.note:
+                        results.append(reviewed.note)
+                    statement = reviewed.statement
+                try:
+                    cursor.execute(statement)
+                except Error as stmt_error:
+                    conn.rollback()
+                    error_msg = f"执行语句 '{statement[:200]}' 出错: {str(stmt_error)}"
+                    logger.error(error_msg)
+                    get_metrics().record_error("sql")
+                    results.append(error_msg)
+                    results.append("事务已回滚，后续语句未执行")
+                    return results
+
+                if cursor.description:
+                    # 事务提交前必须读完结果集，超出预算的部分读完丢弃
+                    columns = [desc[0] for desc in cursor.description]
+                    types = column_types(cursor.description)
+                    page = fetch_page(cursor, columns, max_rows, max_bytes)
+                    if page.exhausted:
+                        results.extend(self.render_page(page, types, result_format))
+                    else:
+                        total = len(page.lines) + len(page.pending_rows) + drain(cursor)
+                        note = self.truncated_note(page, 1, total=total)
+                        results.extend(self.render_page(page, types, result_format, note))
+                elif parsed.keywords[:1] == ("USE",):
+                    results.append(f"查询执行成功。影响行数: {cursor.rowcount}")
+                    current_db = None
+                else:
+                    if current_db is None:
+                        current_db = self.current_database(conn, database)
+                    if count > 1:
+                        results.append(f"批量插入 {count} 条语句。影响行数: {cursor.rowcount}")
+                    else:
+                        results.append(f"查询执行成功。影响行数: {cursor.rowcount}")
+                        get_schema_cache().invalidate_for_statement(statement, current_db)
+                    written.append((parsed, current_db))
+
+            conn.commit()
+            # 提交后再使结果缓存失效，避免其他查询在提交前重新缓存旧数据
+            result_cache = get_result_cache()
+            for parsed, written_db in written:
+                result_cache.invalidate_for_statement(parsed, written_db)
+            success_msg = f"事务已提交，共执行 {len(statements)} 条语句"
+            logger.info(success_msg)
+            results.append(success_msg)
+        finally:
+            cursor.close()
+
+        return results
+
+    def result_cache_key(self, parsed: Statement, role: str, allowed_operations: list, database: str,
+                         result_format: str, max_rows: int, max_bytes: int) -> Optional[tuple]:
+        """计算单条语句的结果缓存键
+
+        返回:
+            tuple: (缓存键, 引用的表)，不可缓存的语句为 None
+        """
+        if not self.check_sql_permission(parsed, allowed_operations):
+            return None
+        cacheable = get_result_cache().cacheable(parsed, database)
+        if cacheable is None:
+            return None
+        normalized, tables = cacheable
+        return (role, (database or "").lower(), result_format, max_rows, max_bytes, normalized), tables
+
+    def result_cache_keys(self, statements: list, role: str, allowed_operations: list, database: str,
+                          result_format: str, max_rows: int, max_bytes: int) -> list:
+        """计算每条语句的结果缓存键
+
+        包含 USE 的调用会切换当前库，整个调用都不使用缓存。
+
+        返回:
+            list: 每条语句对应 (缓存键, 引用的表)，不可缓存的语句为 None；整个调用不可缓存时为空列表
+        """
+        if any(parsed.keywords[:1] == ("USE",) for parsed in statements):
+            return []
+        return [
+            self.result_cache_key(parsed, role, allowed_operations, database, result_format, max_rows, max_bytes)
+            for parsed in statements
+        ]
+
+    def fetch_next_page(self, parked, max_rows: int, max_bytes: int, result_format: str = None) -> list:
+        """从保留的结果集中读取下一页（同步，在查询线程池中运行）
+
+        result_format 为空时沿用首次执行时的格式。
+        """
+        result_format = result_format or parked.result_format
+        start = parked.rows_sent + 1
+        try:
+            page = fetch_page(parked.cursor, parked.columns, max_rows, max_bytes, parked.pending_rows)
+        except Error:
+            parked.close()
+            raise
+
+        if page.exhausted:
+            # 结果集已读完，连接归还连接池
+            parked.cursor.close()
+            parked.pool.release(parked.conn)
+            note = f"-- 已返回第 {start}-{start + len(page.lines) - 1} 行，结果已全部返回"
+            return self.render_page(page, parked.types, result_format, note)
+
+        parked.rows_sent += len(page.lines)
+        parked.pending_rows = page.pending_rows
+        parked.touched_at = time.monotonic()
+        token = get_cursor_registry().park(parked)
+        note = self.truncated_note(page, start, token=token, estimated=parked.estimated_total)
+        return self.render_page(page, parked.types, result_format, note)
+
+    async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[Union[TextContent, EmbeddedResource]]:
+        """执行SQL查询语句
+
+        查询在有界线程池中执行，不会阻塞事件循环；超时或调用被取消时
+        会通过 KILL QUERY 终止服务端正在执行的语句。
+
+        参数:
+            query (str): 要执行的SQL语句，支持多条语句以分号（或 DELIMITER 指定的分隔符）分隔
+            timeout (float): 可选，超时时间(秒)，默认使用 MYSQL_QUERY_TIMEOUT
+            max_rows (int): 可选，每个结果集返回的最大行数，默认使用 MYSQL_MAX_ROWS
+            max_bytes (int): 可选，每个结果集返回的最大字节数，默认使用 MYSQL_MAX_RESULT_BYTES
+            cursor (str): 可选，上次返回的续取令牌，传入时读取下一页，忽略 query
+            transaction (bool): 可选，在一个事务中执行全部语句，出错时整体回滚并批量合并单行INSERT
+            format (str): 可选，结果格式 text/csv/json/arrow，默认 text
+            cache (bool): 可选，是否使用查询结果缓存，默认 true；只缓存确定性的只读 SELECT
+
+        返回:
+            list[TextContent]: 包含查询结果的TextContent列表
+            - 对于SELECT查询：默认返回CSV格式的结果，包含列名和数据，超出预算时附带续取令牌；
+              format=arrow 时结果集以 EmbeddedResource 返回
+            - 对于SHOW TABLES：返回数据库中的所有表名
+            - 对于其他查询：返回执行状态和影响行数
+            - 多条语句的结果以"---"分隔
+
+        异常:
+            Error: 当数据库连接或查询执行失败时抛出
+        """
+        try:
+            config = get_db_config()
+
+            result_config = get_result_config()
+            max_rows = int(arguments.get("max_rows") or result_config["max_rows"])
+            max_bytes = int(arguments.get("max_bytes") or result_config["max_bytes"])
+            result_format = check_format(arguments.get("format")) if arguments.get("format") else None
+
+            # 续取已保留结果集的下一页
+            if arguments.get("cursor"):
+                parked = get_cursor_registry().take(arguments["cursor"])
+                if parked is None:
+                    return [TextContent(type="text", text="续取令牌无效或已过期，请重新执行查询")]
+                results = await run_blocking(self.fetch_next_page, parked, max_rows, max_bytes, result_format)
+                return self.to_contents(results)
+
+            if "query" not in arguments:
+                raise ValueError("缺少查询语句")
+
+            query = arguments["query"]
+
+            # 获取角色权限
+            role = config["role"]
+            allowed_operations = get_role_permissions(role)
+
+            # 按词法拆分，引号和注释中的分号不会拆分语句，支持 DELIMITER
+            statements = split_statements(query)
+
+            # 结果缓存：全部语句都命中时无需借用连接
+            cache = get_result_cache()
+            cache_keys = []
+            if cache.enabled and arguments.get("cache", True) and not arguments.get("transaction"):
+                cache_keys = self.result_cache_keys(
+                    statements, role, allowed_operations, config["database"],
+                    result_format or "text", max_rows, max_bytes
+                )
+                cached = [cache.get(key[0]) if key else None for key in cache_keys]
+                if cached and all(item is not None for item in cached):
+                    return self.to_contents([part for items in cached for part in items])
+            generation = cache.generation
+
+            def store_result(index: int, items: list, database: str) -> None:
+                # 按执行时连接实际所在的库重新计算键，与查找时的库不同则不会被命中
+                if index >= len(cache_keys) or not cache_keys[index]:
+                    return
+                cache_key = self.result_cache_key(
+                    statements[index], role, allowed_operations, database,
+                    result_format or "text", max_rows, max_bytes
+                )
+                if cache_key is not None:
+                    key, tables = cache_key
+                    size = sum(self.item_size(item) for item in items)
+                    cache.put(key, items, size, tables, generation)
+
+            try:
+                # 在查询线程池中借用连接执行，事件循环可继续处理其他会话
+                if arguments.get("transaction"):
+                    task = lambda conn, handle: self.execute_transaction(
+                        conn, statements, role, allowed_operations, max_rows, max_bytes,
+                        config["database"], result_format or "text"
+                    )
+                else:
+                    task = lambda conn, handle: self.execute_statements(
+                        conn, handle, statements, role, allowed_operations, max_rows, max_bytes,
+                        config["database"], result_format or "text", store_result if cache_keys else None
+                    )
+                results = await run_query(
+                    task,
+                    role=role,
+                    timeout=arguments.get("timeout"),
+                )
+                return self.to_contents(results)
+
+            except TimeoutError as e:
+                error_msg = f"执行超时: {str(e)}"
+                logger.error(error_msg)
+                get_metrics().record_error("timeout")
+                return [TextContent(type="text", text=error_msg)]
+
+            except Error as e:
+                error_msg = f"数据库连接失败: {str(e)}"
+                logger.error(error_msg)
+                logger.error(traceback.format_exc())
+                get_metrics().record_error("connection")
+                return [TextContent(type="text", text=error_msg)]
 
+        except Exception as e:
+            error_msg = f"未知错误: {str(e)}"
+            logger.error(error_msg)
+            logger.error(traceback.format_exc())
+            get_metrics().record_error("unknown")
+            return [TextContent(type="text", text=error_msg)]
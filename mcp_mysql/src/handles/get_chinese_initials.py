@@ -1,43 +1,92 @@
-from typing import Dict, Any, Sequence
+from functools import lru_cache
+from typing import Dict, Any, Sequence, List, Optional
+import re
 
-from mcp import Tool
 from mcp.types import TextContent
 from pypinyin import pinyin, Style
 from .base import BaseHandler
 
+# 批量模式下的分隔符：中英文逗号、顿号、换行
+_BATCH_SEPARATOR = re.compile(r"[，,、\r\n]+")
+
+
+def warmup() -> None:
+    """预加载 pypinyin 词典（首次转换时才会加载，耗时较长）"""
+    pinyin("预热拼音词典", style=Style.FIRST_LETTER, heteronym=True)
+
+
+@lru_cache(maxsize=8192)
+def char_initial(char: str) -> Optional[str]:
+    """单个字符的拼音首字母（大写）
+
+    多音字且各读音首字母不同时返回 None，需要结合词语上下文转换；
+    非汉字原样返回（大写）。
+    """
+    candidates = pinyin(char, style=Style.FIRST_LETTER, heteronym=True)[0]
+    if len({candidate.upper() for candidate in candidates}) > 1:
+        return None
+    return candidates[0].upper()
+
+
+@lru_cache(maxsize=65536)
+def word_initials(word: str) -> str:
+    """词语的拼音首字母（大写）
+
+    所有字符都只有一种首字母时直接由单字缓存拼接；包含多音字时对整个词调用
+    pypinyin，利用其词组词典确定读音（如 银行 -> YH）。
+    """
+    parts = []
+    for char in word:
+        initial = char_initial(char)
+        if initial is None:
+            return ''.join(p[0].upper() for p in pinyin(word, style=Style.FIRST_LETTER))
+        parts.append(initial)
+    return ''.join(parts)
+
+
+def dedupe_initials(names: List[str]) -> List[tuple]:
+    """批量转换并处理首字母冲突
+
+    不同名称转换出相同首字母时，第一个保留原结果，其余依次追加数字后缀（2、3...），
+    后缀会跳过其他名称已经使用的首字母；重复的名称只保留一次。
+
+    返回:
+        list[tuple]: (名称, 首字母, 是否因冲突追加了后缀)
+    """
+    names = list(dict.fromkeys(names))
+    bases = [word_initials(name) for name in names]
+    used = set(bases)
+    seen = set()
+    result = []
+    for name, base in zip(names, bases):
+        if base not in seen:
+            seen.add(base)
+            result.append((name, base, False))
+            continue
+        suffix = 2
+        while f"{base}{suffix}" in used:
+            suffix += 1
+        initials = f"{base}{suffix}"
+        used.add(initials)
+        result.append((name, initials, True))
+    return result
+
 
 class GetChineseInitials(BaseHandler):
     name = "get_chinese_initials"
-    description = (
-        "创建表结构时，将中文字段名转换为拼音首字母字段"
-    )
-
-    def get_tool_description(self) -> Tool:
-        return Tool(
-            name=self.name,
-            description=self.description,
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "要获取拼音首字母的汉字文本，以“,”分隔"
-                    }
-                },
-                "required": ["text"]
-            }
-        )
 
     async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
             """将中文文本转换为拼音首字母
 
             参数:
                 text (str): 要转换的中文文本，以中文逗号分隔
+                batch (bool): 可选，批量模式，text 以中英文逗号、顿号或换行分隔
 
             返回:
                 list[TextContent]: 包含转换结果的TextContent列表
                 - 每个词的首字母会被转换为大写
                 - 多个词的结果以英文逗号连接
+                - 批量模式返回CSV（NAME,INITIALS），首字母冲突的字段追加数字后缀
 
             示例:
                 get_chinese_initials("用户名，密码")
@@ -49,18 +98,20 @@ class GetChineseInitials(BaseHandler):
 
                 text = arguments["text"]
 
+                if arguments.get("batch"):
+                    names = [name.strip() for name in _BATCH_SEPARATOR.split(text) if name.strip()]
+                    rows = dedupe_initials(names)
+                    lines = ["NAME,INITIALS"] + [f"{name},{initials}" for name, initials, _ in rows]
+                    collisions = sum(1 for _, _, renamed in rows if renamed)
+                    if collisions:
+                        lines.append(f"-- {collisions} 个字段首字母冲突，已追加数字后缀")
+                    return [TextContent(type="text", text="\n".join(lines))]
+
                 # 将文本按逗号分割
                 words = text.split('，')
 
-                # 存储每个词的首字母
-                initials = []
-
-                for word in words:
-                    # 获取每个字的拼音首字母
-                    word_pinyin = pinyin(word, style=Style.FIRST_LETTER)
-                    # 将每个字的首字母连接起来
-                    word_initials = ''.join([p[0].upper() for p in word_pinyin])
-                    initials.append(word_initials)
+                # 获取每个词的拼音首字母（按字、按词缓存）
+                initials = [word_initials(word) for word in words]
 
                 # 用逗号连接所有结果
                 return [TextContent(type="text", text=','.join(initials))]
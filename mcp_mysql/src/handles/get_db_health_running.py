@@ -1,40 +1,61 @@
-from typing import Dict, Any, Sequence
+from typing import Dict, Any, Sequence, Optional, Tuple
+import asyncio
+import time
 
-from mcp import Tool
 from mcp.types import TextContent
 
-from .base import BaseHandler
+from .base import BaseHandler, ToolRegistry
+from config import get_health_config
 
-from handles import (
-    ExecuteSQL
-)
-
-execute_sql = ExecuteSQL()
 
 class GetDBHealthRunning(BaseHandler):
     name = "get_db_health_running"
-    description = (
-        "获取当前mysql的健康状态(Analyze MySQL health status )"
-    )
-
-    def get_tool_description(self) -> Tool:
-        return Tool(
-            name=self.name,
-            description=self.description,
-            inputSchema={
-                "type": "object",
-                "properties": {
-
-                }
-            }
-        )
 
-    async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-        lock_result = await self.get_lock(arguments)
-        processlist_result = await self.get_processlist(arguments)
-        status_result = await self.get_status(arguments)
-        trx_result = await self.get_trx(arguments)
+    # 最近一次检查结果快照: (检查完成时间, 结果)
+    _snapshot: Optional[Tuple[float, Sequence[TextContent]]] = None
+    _refresh_lock: Optional[asyncio.Lock] = None
 
+    async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """获取健康状态
+
+        四组检查项并发执行（各自从连接池借用连接，单独超时），结果按固定顺序合并。
+        指定 max_age 时，若已有不超过该时长的快照则直接返回，避免频繁执行
+        SHOW ENGINE INNODB STATUS。
+        """
+        max_age = float(arguments.get("max_age", get_health_config()["max_age"]) or 0)
+        cls = type(self)
+
+        if max_age > 0:
+            cached = self._get_snapshot(max_age)
+            if cached is not None:
+                return cached
+
+            # 多个调用方同时刷新时只执行一次检查
+            if cls._refresh_lock is None:
+                cls._refresh_lock = asyncio.Lock()
+            async with cls._refresh_lock:
+                cached = self._get_snapshot(max_age)
+                if cached is not None:
+                    return cached
+                return await self._refresh(arguments)
+
+        return await self._refresh(arguments)
+
+    def _get_snapshot(self, max_age: float) -> Optional[Sequence[TextContent]]:
+        """返回未超过 max_age 的快照"""
+        snapshot = type(self)._snapshot
+        if snapshot is not None and time.monotonic() - snapshot[0] <= max_age:
+            return snapshot[1]
+        return None
+
+    async def _refresh(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """并发执行所有检查项并更新快照"""
+        processlist_result, lock_result, trx_result, status_result = await asyncio.gather(
+            self.get_processlist(arguments),
+            self.get_lock(arguments),
+            self.get_trx(arguments),
+            self.get_status(arguments),
+        )
 
         # 合并结果
         combined_result = []
@@ -43,48 +64,42 @@ class GetDBHealthRunning(BaseHandler):
         combined_result.extend(trx_result)
         combined_result.extend(status_result)
 
+        type(self)._snapshot = (time.monotonic(), combined_result)
         return combined_result
 
+    async def _probe(self, sql: str) -> Sequence[TextContent]:
+        """执行一组检查语句，超时由 execute_sql 终止查询"""
+        try:
+            timeout = get_health_config()["probe_timeout"]
+            return await ToolRegistry.get_tool("execute_sql").run_tool({"query": sql, "timeout": timeout})
+        except Exception as e:
+            return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
+
     """
         获取连接情况
     """
     async def get_processlist(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-        try:
-            sql = "SHOW FULL PROCESSLIST;SHOW VARIABLES LIKE 'max_connections';"
-
-            return await execute_sql.run_tool({"query": sql})
-        except Exception as e:
-            return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
+        sql = "SHOW FULL PROCESSLIST;SHOW VARIABLES LIKE 'max_connections';"
+        return await self._probe(sql)
 
     """
         获取运行情况
     """
     async def get_status(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-        try:
-            sql = "SHOW ENGINE INNODB STATUS;"
-
-            return await execute_sql.run_tool({"query": sql})
-        except Exception as e:
-            return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
+        sql = "SHOW ENGINE INNODB STATUS;"
+        return await self._probe(sql)
 
     """
         获取事务情况
     """
     async def get_trx(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-        try:
-            sql = "SELECT * FROM INFORMATION_SCHEMA.INNODB_TRX;"
-            return await execute_sql.run_tool({"query": sql})
-        except Exception as e:
-            return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
+        sql = "SELECT * FROM INFORMATION_SCHEMA.INNODB_TRX;"
+        return await self._probe(sql)
 
 
     """
         获取锁情况
     """
     async def get_lock(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
-        try:
-            sql = "SHOW OPEN TABLES WHERE In_use > 0;select * from information_schema.innodb_locks;select * from information_schema.innodb_lock_waits;"
-
-            return await execute_sql.run_tool({"query": sql})
-        except Exception as e:
-            return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
\ No newline at end of file
+        sql = "SHOW OPEN TABLES WHERE In_use > 0;select * from information_schema.innodb_locks;select * from information_schema.innodb_lock_waits;"
+        return await self._probe(sql)
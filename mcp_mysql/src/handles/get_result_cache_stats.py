@@ -0,0 +1,31 @@
+from typing import Dict, Any, Sequence
+
+from mcp.types import TextContent
+
+from .base import BaseHandler
+from db.result_cache import get_result_cache
+
+
+class GetResultCacheStats(BaseHandler):
+    name = "get_result_cache_stats"
+
+    async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
+        """获取查询结果缓存的统计信息
+
+        参数:
+            clear (bool): 可选，是否在返回统计后清空缓存
+
+        返回:
+            list[TextContent]: 包含统计信息的TextContent列表
+            - 结果以CSV格式返回，包含统计项和值
+        """
+        cache = get_result_cache()
+        if not cache.enabled:
+            return [TextContent(type="text", text="查询结果缓存未启用，可通过 MYSQL_RESULT_CACHE_BYTES 开启")]
+
+        stats = cache.stats()
+        lines = ["name,value"] + [f"{name},{value}" for name, value in stats.items()]
+        if arguments.get("clear"):
+            count = cache.clear()
+            lines.append(f"-- 已清空 {count} 条缓存")
+        return [TextContent(type="text", text="\n".join(lines))]
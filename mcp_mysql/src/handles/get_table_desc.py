@@ -1,42 +1,43 @@
-from typing import Dict, Sequence, Any
+from typing import Dict, Sequence, Any, List
 
-from mcp import Tool
 from mcp.types import TextContent
 
 from .base import BaseHandler
 from config import get_db_config
-from handles import (
-    ExecuteSQL
-)
+from db import run_query, execute_prepared, in_placeholders
+from db.cursors import format_row
+from db.schema_cache import get_schema_cache
+from metrics import get_metrics
 
 
 class GetTableDesc(BaseHandler):
     name = "get_table_desc"
-    description = (
-        "根据表名搜索数据库中对应的表字段,支持多表查询(Search for table structures in the database based on table names, supporting multi-table queries)"
-    )
-
-    def get_tool_description(self) -> Tool:
-        return Tool(
-            name=self.name,
-            description=self.description,
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "要搜索的表名"
-                    }
-                },
-                "required": ["text"]
-            }
-        )
+
+    columns = ["TABLE_NAME", "COLUMN_NAME", "COLUMN_COMMENT"]
+
+
+    def fetch_columns(self, conn, database: str, table_names: List[str],
+                      cache_size: int = 32) -> Dict[str, List[tuple]]:
+        """查询多张表的字段信息（同步，在查询线程池中运行）"""
+        placeholders, params = in_placeholders(table_names)
+        sql = "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_COMMENT "
+        sql += "FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = %s "
+        sql += f"AND TABLE_NAME IN ({placeholders}) ORDER BY TABLE_NAME, ORDINAL_POSITION"
+
+        result: Dict[str, List[tuple]] = {}
+        for row in execute_prepared(conn, sql, (database, *params), cache_size):
+            result.setdefault(row[0], []).append(row)
+        return result
 
     async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
             """获取指定表的字段结构信息
 
+            表结构按库、表缓存在进程内（MYSQL_SCHEMA_CACHE_TTL），只有未命中的表才会查询
+            information_schema；通过 execute_sql 执行的DDL会自动使相关缓存失效。
+
             参数:
                 text (str): 要查询的表名，多个表名以逗号分隔
+                refresh (bool): 可选，是否忽略缓存重新查询
 
             返回:
                 list[TextContent]: 包含查询结果的TextContent列表
@@ -51,16 +52,28 @@ class GetTableDesc(BaseHandler):
                 text = arguments["text"]
 
                 config = get_db_config()
-                execute_sql = ExecuteSQL()
+                database = config["database"]
+
+                # 将输入的表名按逗号分割成列表（去重）
+                table_names = list(dict.fromkeys(name.strip() for name in text.split(',') if name.strip()))
+
+                cache = get_schema_cache()
+                rows_by_table, missing = cache.lookup("columns", database, table_names, bool(arguments.get("refresh")))
+                if missing:
+                    fetched = await run_query(
+                        lambda conn, handle: self.fetch_columns(
+                            conn, database, missing, handle.pool.statement_cache_size
+                        ),
+                        role=config["role"],
+                        reset_session=False,
+                    )
+                    rows_by_table.update(cache.store("columns", database, missing, fetched))
 
-                # 将输入的表名按逗号分割成列表
-                table_names = [name.strip() for name in text.split(',')]
-                # 构建IN条件
-                table_condition = "','".join(table_names)
-                sql = "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_COMMENT "
-                sql += f"FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = '{config['database']}' "
-                sql += f"AND TABLE_NAME IN ('{table_condition}') ORDER BY TABLE_NAME, ORDINAL_POSITION;"
-                return await execute_sql.run_tool({"query":sql})
+                lines = [",".join(self.columns)]
+                for table in sorted(rows_by_table):
+                    lines.extend(format_row(row) for row in rows_by_table[table])
+                return [TextContent(type="text", text="\n".join(lines))]
 
             except Exception as e:
-                return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
\ No newline at end of file
+                get_metrics().record_error("query")
+                return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
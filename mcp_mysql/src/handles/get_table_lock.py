@@ -1,33 +1,12 @@
 from typing import Dict, Any, Sequence
 
-from mcp import Tool
 from mcp.types import TextContent
 
-from .base import BaseHandler
+from .base import BaseHandler, ToolRegistry
 
-from handles import (
-    ExecuteSQL
-)
-
-execute_sql = ExecuteSQL()
 
 class GetTableLock(BaseHandler):
     name = "get_table_lock"
-    description = (
-        "获取当前mysql服务器行级锁、表级锁情况(Check if there are row-level locks or table-level locks in the current MySQL server  )"
-    )
-
-    def get_tool_description(self) -> Tool:
-        return Tool(
-            name=self.name,
-            description=self.description,
-            inputSchema={
-                "type": "object",
-                "properties": {
-
-                }
-            }
-        )
 
     async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
         use_result = await self.get_table_use(arguments)
@@ -47,7 +26,7 @@ class GetTableLock(BaseHandler):
         try:
             sql = "SHOW OPEN TABLES WHERE In_use > 0;"
 
-            return await execute_sql.run_tool({"query": sql})
+            return await ToolRegistry.get_tool("execute_sql").run_tool({"query": sql})
         except Exception as e:
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
 
@@ -76,6 +55,6 @@ class GetTableLock(BaseHandler):
             sql += "INNER JOIN information_schema.PROCESSLIST p2 ON p2.ID = r.trx_mysql_thread_id "
             sql += "ORDER BY 等待时间 DESC;"
 
-            return await execute_sql.run_tool({"query": sql})
+            return await ToolRegistry.get_tool("execute_sql").run_tool({"query": sql})
         except Exception as e:
             return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
@@ -1,43 +1,36 @@
-from typing import Dict, Any, Sequence
+from typing import Dict, Any, Sequence, List
 
-from mcp import Tool
 from mcp.types import TextContent
 
 from .base import BaseHandler
 from config import get_db_config
-from handles import (
-    ExecuteSQL
-)
+from db import run_query, execute_prepared
+from db.cursors import format_row
+from db.schema_cache import get_schema_cache
+from metrics import get_metrics
 
 
 class GetTableName(BaseHandler):
 
     name = "get_table_name"
-    description = (
-        "根据表中文名或表描述搜索数据库中对应的表名(Search for table names in the database based on table comments and descriptions )"
-    )
-
-    def get_tool_description(self) -> Tool:
-        return Tool(
-            name=self.name,
-            description=self.description,
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "text": {
-                        "type": "string",
-                        "description": "要搜索的表中文名、表描述，仅支持单个查询"
-                    }
-                },
-                "required": ["text"]
-            }
-        )
+
+    columns = ["TABLE_SCHEMA", "TABLE_NAME", "TABLE_COMMENT"]
+
+
+    def fetch_tables(self, conn, database: str, text: str, cache_size: int = 32) -> List[tuple]:
+        """按表注释搜索表名（同步，在查询线程池中运行）"""
+        sql = "SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_COMMENT "
+        sql += "FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_COMMENT LIKE %s"
+        return execute_prepared(conn, sql, (database, f"%{text}%"), cache_size)
 
     async def run_tool(self, arguments: Dict[str, Any]) -> Sequence[TextContent]:
             """根据表的注释搜索数据库中的表名
 
+            搜索结果按库缓存在进程内（MYSQL_SCHEMA_CACHE_TTL），库内执行任何DDL后失效。
+
             参数:
                 text (str): 要搜索的表中文注释关键词
+                refresh (bool): 可选，是否忽略缓存重新查询
 
             返回:
                 list[TextContent]: 包含查询结果的TextContent列表
@@ -51,11 +44,24 @@ class GetTableName(BaseHandler):
                 text = arguments["text"]
 
                 config = get_db_config()
-                execute_sql = ExecuteSQL()
+                database = config["database"]
+
+                cache = get_schema_cache()
+                key = ("search", text)
+                rows = None if arguments.get("refresh") else cache.get("tables", database, key)
+                if rows is None:
+                    rows = await run_query(
+                        lambda conn, handle: self.fetch_tables(
+                            conn, database, text, handle.pool.statement_cache_size
+                        ),
+                        role=config["role"],
+                        reset_session=False,
+                    )
+                    cache.set("tables", database, key, rows)
 
-                sql = "SELECT TABLE_SCHEMA, TABLE_NAME, TABLE_COMMENT "
-                sql += f"FROM information_schema.TABLES WHERE TABLE_SCHEMA = '{config['database']}' AND TABLE_COMMENT LIKE '%{text}%';"
-                return await execute_sql.run_tool({"query":sql})
+                lines = [",".join(self.columns)] + [format_row(row) for row in rows]
+                return [TextContent(type="text", text="\n".join(lines))]
 
             except Exception as e:
-                return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
\ No newline at end of file
+                get_metrics().record_error("query")
+                return [TextContent(type="text", text=f"执行查询时出错: {str(e)}")]
@@ -0,0 +1,173 @@
+"""工具清单
+
+列出所有工具的名称、描述和参数定义，以及实现该工具的模块和类。
+list_tools 直接由清单生成工具列表，无需导入处理器模块；处理器在首次调用时才导入并实例化。
+新增工具时需同时在此登记。
+"""
+
+TOOL_MANIFEST = [
+    {
+        "name": "execute_sql",
+        "module": "handles.execute_sql",
+        "handler": "ExecuteSQL",
+        "description": "在MySQL数据库上执行SQL (multiple SQL execution, separated by ';')",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "要执行的SQL语句"
+                },
+                "timeout": {
+                    "type": "number",
+                    "description": "可选，执行超时时间(秒)，超时后终止查询"
+                },
+                "max_rows": {
+                    "type": "integer",
+                    "description": "可选，每个结果集返回的最大行数"
+                },
+                "max_bytes": {
+                    "type": "integer",
+                    "description": "可选，每个结果集返回的最大字节数"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "可选，上次结果返回的续取令牌，传入时返回下一页数据（无需query）"
+                },
+                "format": {
+                    "type": "string",
+                    "enum": ["text", "csv", "json", "arrow"],
+                    "description": "可选，结果格式：text(默认)、csv(标准转义的CSV)、json(按列输出并带类型)、arrow(Arrow IPC 二进制资源，需安装pyarrow)"
+                },
+                "cache": {
+                    "type": "boolean",
+                    "description": "可选，是否使用查询结果缓存（需配置 MYSQL_RESULT_CACHE_BYTES），默认 true"
+                },
+                "transaction": {
+                    "type": "boolean",
+                    "description": "可选，在一个事务中执行全部语句，任一语句出错则整体回滚；连续的单行INSERT会合并为多行INSERT批量执行"
+                }
+            }
+        }
+    },
+    {
+        "name": "get_chinese_initials",
+        "module": "handles.get_chinese_initials",
+        "handler": "GetChineseInitials",
+        "description": "创建表结构时，将中文字段名转换为拼音首字母字段",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "要获取拼音首字母的汉字文本，以“,”分隔"
+                },
+                "batch": {
+                    "type": "boolean",
+                    "description": "可选，批量模式：text 可包含大量字段名（以逗号、顿号或换行分隔），返回每个字段名对应的首字母，首字母冲突时自动追加数字后缀"
+                }
+            },
+            "required": ["text"]
+        }
+    },
+    {
+        "name": "get_table_desc",
+        "module": "handles.get_table_desc",
+        "handler": "GetTableDesc",
+        "description": "根据表名搜索数据库中对应的表字段,支持多表查询(Search for table structures in the database based on table names, supporting multi-table queries)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "要搜索的表名"
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "可选，是否忽略缓存重新查询"
+                }
+            },
+            "required": ["text"]
+        }
+    },
+    {
+        "name": "get_table_index",
+        "module": "handles.get_table_index",
+        "handler": "GetTableIndex",
+        "description": "根据表名搜索数据库中对应的表索引,支持多表查询(Search for table indexes in the database based on table names, supporting multi-table queries)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "要搜索的表名"
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "可选，是否忽略缓存重新查询"
+                }
+            },
+            "required": ["text"]
+        }
+    },
+    {
+        "name": "get_table_lock",
+        "module": "handles.get_table_lock",
+        "handler": "GetTableLock",
+        "description": "获取当前mysql服务器行级锁、表级锁情况(Check if there are row-level locks or table-level locks in the current MySQL server  )",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "get_table_name",
+        "module": "handles.get_table_name",
+        "handler": "GetTableName",
+        "description": "根据表中文名或表描述搜索数据库中对应的表名(Search for table names in the database based on table comments and descriptions )",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "text": {
+                    "type": "string",
+                    "description": "要搜索的表中文名、表描述，仅支持单个查询"
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "可选，是否忽略缓存重新查询"
+                }
+            },
+            "required": ["text"]
+        }
+    },
+    {
+        "name": "get_db_health_running",
+        "module": "handles.get_db_health_running",
+        "handler": "GetDBHealthRunning",
+        "description": "获取当前mysql的健康状态(Analyze MySQL health status )",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "max_age": {
+                    "type": "number",
+                    "description": "可选，允许返回的快照最大时长(秒)，在此时长内直接返回上次检查结果，0 表示实时检查"
+                }
+            }
+        }
+    },
+    {
+        "name": "get_result_cache_stats",
+        "module": "handles.get_result_cache_stats",
+        "handler": "GetResultCacheStats",
+        "description": "获取 execute_sql 查询结果缓存的命中率等统计信息(Get hit/miss statistics of the execute_sql result cache)",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "clear": {
+                    "type": "boolean",
+                    "description": "可选，是否在返回统计后清空缓存"
+                }
+            }
+        }
+    },
+]
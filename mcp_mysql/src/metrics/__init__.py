@@ -0,0 +1,10 @@
+from .registry import Counter, Histogram, MetricsRegistry
+from .calls import ToolMetrics, get_metrics
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "ToolMetrics",
+    "get_metrics",
+]
@@ -0,0 +1,162 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from .registry import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# 响应字节数、结果行数的区间
+_BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+_ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10)
+
+
+class CallStats:
+    """单次工具调用中累计的统计"""
+
+    __slots__ = ("tool", "rows", "errors")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.rows = 0
+        self.errors = 0
+
+
+# 当前正在执行的工具调用，线程池中的查询通过复制上下文访问
+_current_call: ContextVar[Optional[CallStats]] = ContextVar("mcp_tool_call", default=None)
+
+
+def response_bytes(contents: Sequence[Any]) -> int:
+    """工具返回内容的大小（文本按 UTF-8 编码，资源按 base64 长度）"""
+    size = 0
+    for content in contents:
+        text = getattr(content, "text", None)
+        if text is not None:
+            size += len(text.encode("utf-8"))
+            continue
+        resource = getattr(content, "resource", None)
+        blob = getattr(resource, "blob", None) or getattr(resource, "text", None)
+        if blob:
+            size += len(blob)
+    return size
+
+
+class ToolMetrics:
+    """工具调用指标与抽样日志
+
+    - 每个工具的调用耗时、返回字节数、结果行数直方图，错误按类型计数
+    - 连接池借用连接的等待时间直方图
+    - 每次调用结束输出一条 JSON 日志，出错或耗时超过 slow_call_seconds 的调用总是输出，
+      其余按 log_sample_rate 抽样，避免日志拖慢高频调用
+    """
+
+    def __init__(self, enabled: bool = True, log_sample_rate: float = 0.01, slow_call_seconds: float = 1):
+        self.enabled = enabled
+        self.log_sample_rate = log_sample_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.registry = MetricsRegistry()
+        self.duration = self.registry.histogram(
+            "mcp_tool_duration_seconds", "Tool call latency in seconds", ("tool",))
+        self.response_bytes = self.registry.histogram(
+            "mcp_tool_response_bytes", "Size of tool call results in bytes", ("tool",), _BYTES_BUCKETS)
+        self.rows = self.registry.histogram(
+            "mcp_tool_result_rows", "Rows returned per result set", ("tool",), _ROWS_BUCKETS)
+        self.errors = self.registry.counter(
+            "mcp_tool_errors", "Tool call errors by kind", ("tool", "kind"))
+        self.pool_wait = self.registry.histogram(
+            "mysql_pool_wait_seconds", "Time spent waiting for a pooled connection", ("pool",), _WAIT_BUCKETS)
+
+    async def track(self, tool: str, call: Callable[[], Awaitable[Sequence[Any]]]) -> Sequence[Any]:
+        """执行一次工具调用并记录指标
+
+        Args:
+            tool: 工具名称
+            call: 执行工具的协程函数
+
+        Returns:
+            工具的返回内容
+        """
+        if not self.enabled:
+            return await call()
+
+        stats = CallStats(tool)
+        token = _current_call.set(stats)
+        start = time.perf_counter()
+        status = "ok"
+        size = 0
+        try:
+            contents = await call()
+            size = response_bytes(contents)
+            return contents
+        except BaseException as e:
+            status = "exception"
+            self.errors.inc(tool=tool, kind=type(e).__name__)
+            raise
+        finally:
+            _current_call.reset(token)
+            elapsed = time.perf_counter() - start
+            self.duration.observe(elapsed, tool=tool)
+            self.response_bytes.observe(size, tool=tool)
+            if status == "ok" and stats.errors:
+                status = "error"
+            self.log_call(stats, status, elapsed, size)
+
+    def log_call(self, stats: CallStats, status: str, elapsed: float, size: int) -> None:
+        """按抽样率输出一条调用日志"""
+        if status == "ok" and elapsed < self.slow_call_seconds and random.random() >= self.log_sample_rate:
+            return
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        logger.info(json.dumps({
+            "event": "tool_call",
+            "tool": stats.tool,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 2),
+            "rows": stats.rows,
+            "bytes": size,
+            "errors": stats.errors,
+        }, ensure_ascii=False))
+
+    def record_rows(self, rows: int) -> None:
+        """记录当前调用返回的一个结果集的行数"""
+        stats = _current_call.get()
+        if stats is None or not self.enabled:
+            return
+        stats.rows += rows
+        self.rows.observe(rows, tool=stats.tool)
+
+    def record_error(self, kind: str) -> None:
+        """记录当前调用中的一次错误（处理器捕获后以文本返回的错误）"""
+        stats = _current_call.get()
+        if stats is None or not self.enabled:
+            return
+        stats.errors += 1
+        self.errors.inc(tool=stats.tool, kind=kind)
+
+    def record_pool_wait(self, pool: str, seconds: float) -> None:
+        """记录借用连接的等待时间"""
+        if self.enabled:
+            self.pool_wait.observe(seconds, pool=pool)
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+_metrics: Optional[ToolMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> ToolMetrics:
+    """获取进程级指标"""
+    global _metrics
+    if _metrics is None:
+        from config import get_metrics_config
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = ToolMetrics(**get_metrics_config())
+    return _metrics
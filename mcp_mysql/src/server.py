@@ -1,16 +1,25 @@
 import asyncio
-import uvicorn
+import contextlib
+import logging
+import threading
 
-from typing import Sequence
-from mcp.server.sse import SseServerTransport
+import anyio
+from typing import Sequence, Union
 
 from mcp.server import Server
-from mcp.types import  Tool, TextContent
+from mcp.types import  Tool, TextContent, EmbeddedResource
 
 from starlette.applications import Starlette
-from starlette.routing import Route, Mount
+from starlette.responses import Response
+from starlette.routing import Route
 
 from handles.base import ToolRegistry
+from config import get_sse_config
+from db import init_pools, close_pools, shutdown_executor
+from metrics import get_metrics
+from transport import SessionRouter, StreamableHTTPHandler, get_drain_state, serve_worker, run_workers
+
+logger = logging.getLogger(__name__)
 
 # 初始化服务器
 app = Server("operateMysql")
@@ -24,7 +33,7 @@ async def list_tools() -> list[Tool]:
     return ToolRegistry.get_all_tools()
 
 @app.call_tool()
-async def call_tool(name: str, arguments: dict) -> Sequence[TextContent]:
+async def call_tool(name: str, arguments: dict) -> Sequence[Union[TextContent, EmbeddedResource]]:
     """调用指定的工具执行操作
     
     Args:
@@ -32,14 +41,31 @@ async def call_tool(name: str, arguments: dict) -> Sequence[TextContent]:
         arguments (dict): 工具参数
 
     Returns:
-        Sequence[TextContent]: 工具执行结果
+        Sequence[Union[TextContent, EmbeddedResource]]: 工具执行结果
 
     Raises:
         ValueError: 当指定了未知的工具名称时抛出异常
+        ServerDrainingError: 服务正在关闭时抛出异常
     """
     tool = ToolRegistry.get_tool(name)
 
-    return await tool.run_tool(arguments)
+    # 关闭时等待进行中的调用完成；记录耗时、返回行数/字节数、错误等指标
+    async with get_drain_state().track():
+        return await get_metrics().track(name, lambda: tool.run_tool(arguments))
+
+
+def result_cache_gauges():
+    """查询结果缓存的当前统计，作为 /metrics 的 gauge 输出"""
+    from db.result_cache import get_result_cache
+
+    cache = get_result_cache()
+    if not cache.enabled:
+        return []
+    stats = cache.stats()
+    return [
+        (f"mysql_result_cache_{key}", f"Result cache {key.replace('_', ' ')}", {}, stats[key])
+        for key in ("entries", "bytes", "hits", "misses", "evictions", "invalidations")
+    ]
 
 
 async def run_stdio():
@@ -63,13 +89,32 @@ async def run_stdio():
             print(f"服务器错误: {str(e)}")
             raise
 
-def run_sse():
-    """运行SSE(Server-Sent Events)模式的服务器
-    
-    启动一个支持SSE的Web服务器，允许客户端通过HTTP长连接接收服务器推送的消息
-    服务器默认监听0.0.0.0:9000
+def _warmup_pinyin() -> None:
+    """预加载拼音词典，避免首次调用 get_chinese_initials 时等待"""
+    try:
+        from handles.get_chinese_initials import warmup
+        warmup()
+    except Exception as e:
+        logger.warning(f"预加载拼音词典失败: {e}")
+
+
+def create_sse_app(worker_id: str = "0", socket_dir: str = None) -> Starlette:
+    """创建一个 worker 的 SSE 应用
+
+    Args:
+        worker_id: worker 编号，写入消息地址用于会话路由
+        socket_dir: 多 worker 部署时接收转发消息的 Unix socket 目录，单进程时为空
+
+    Returns:
+        Starlette: ASGI 应用，启动时创建连接池，关闭时释放
     """
-    sse = SseServerTransport("/messages/")
+    metrics = get_metrics()
+    if metrics.enabled:
+        # 每个 worker 进程各有一份指标，以 worker 标签区分
+        metrics.registry.set_constant_labels(worker=worker_id)
+        metrics.registry.add_collector(result_cache_gauges)
+    router = SessionRouter(worker_id, socket_dir, metrics.render if metrics.enabled else None)
+    drain = get_drain_state()
 
     async def handle_sse(request):
         """处理SSE连接请求
@@ -77,19 +122,74 @@ def run_sse():
         Args:
             request: HTTP请求对象
         """
-        async with sse.connect_sse(
+        async with router.sse.connect_sse(
                 request.scope, request.receive, request._send
         ) as streams:
-            await app.run(streams[0], streams[1], app.create_initialization_options())
+            async with anyio.create_task_group() as tg:
+                async def run_session():
+                    await app.run(streams[0], streams[1], app.create_initialization_options())
+                    tg.cancel_scope.cancel()
+
+                tg.start_soon(run_session)
+                # 服务关闭且进行中的调用排空后断开会话
+                await drain.closed.wait()
+                tg.cancel_scope.cancel()
+        # 响应已由 SSE 流发送，这里只是满足路由对返回值的要求
+        return Response()
+
+    async def handle_metrics(request):
+        """以 Prometheus 文本格式输出指标
+
+        /metrics 为接受该请求的 worker 的指标，/metrics/<worker> 为指定 worker 的指标
+        """
+        worker = request.path_params.get("worker", worker_id)
+        status, payload = await router.metrics(worker)
+        return Response(payload, status_code=status, media_type="text/plain; version=0.0.4")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(starlette_app):
+        # 每个 worker 进程各自创建连接池
+        init_pools()
+        await router.start()
+        # 长驻服务在后台线程预加载拼音词典，不阻塞启动；stdio 模式仍在首次调用时加载
+        threading.Thread(target=_warmup_pinyin, name="pinyin-warmup", daemon=True).start()
+        try:
+            yield
+        finally:
+            await router.stop()
+            shutdown_executor(wait=True)
+            close_pools()
+
+    routes = [
+        Route("/sse", endpoint=handle_sse),
+        Route("/messages/{worker}/", endpoint=router, methods=["POST"]),
+        # 无状态 Streamable HTTP 传输，短时调用无需建立 SSE 长连接
+        Route("/mcp", endpoint=StreamableHTTPHandler(app), methods=["GET", "POST", "DELETE"]),
+    ]
+    if metrics.enabled:
+        routes.append(Route("/metrics", endpoint=handle_metrics))
+        routes.append(Route("/metrics/{worker}", endpoint=handle_metrics))
 
-    starlette_app = Starlette(
-        debug=True,
-        routes=[
-            Route("/sse", endpoint=handle_sse),
-            Mount("/messages/", app=sse.handle_post_message)
-        ],
-    )
-    uvicorn.run(starlette_app, host="0.0.0.0", port=9000)
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+def run_sse():
+    """运行SSE(Server-Sent Events)模式的服务器
+    
+    启动一个支持SSE的Web服务器，允许客户端通过HTTP长连接接收服务器推送的消息
+    服务器默认监听0.0.0.0:9000，MYSQL_SSE_WORKERS 大于 1 时以多进程方式运行，
+    会话的消息由地址中的 worker 编号路由到建立该会话的进程
+    同一端口上的 /mcp 提供无状态的 Streamable HTTP 传输，每个请求直接返回 JSON 结果
+    启用指标时（MYSQL_METRICS）同时提供 /metrics 接口，输出 Prometheus 文本格式的指标；
+    指标按进程统计并带有 worker 标签，多 worker 时 /metrics 只返回接受该请求的 worker 的
+    指标，应把 /metrics/0 ... /metrics/<N-1> 分别配置为抓取目标，由 Prometheus 按 worker 汇总
+    收到 SIGINT/SIGTERM 时先等待进行中的工具调用完成（MYSQL_DRAIN_TIMEOUT）再退出
+    """
+    options = get_sse_config()
+    if options["workers"] > 1:
+        run_workers(create_sse_app, options)
+    else:
+        serve_worker(create_sse_app, "0", {**options, "socket_dir": None})
 
 
 if __name__ == "__main__":
@@ -97,8 +197,13 @@ if __name__ == "__main__":
 
     # 根据命令行参数选择启动模式
     if len(sys.argv) > 1 and sys.argv[1] == "--stdio":
-        # 标准输入输出模式
-        asyncio.run(run_stdio())
+        # 标准输入输出模式，启动时创建数据库连接池，所有工具共享
+        init_pools()
+        try:
+            asyncio.run(run_stdio())
+        finally:
+            shutdown_executor(wait=False)
+            close_pools()
     else:
-        # 默认 SSE 模式
+        # 默认 SSE 模式，连接池由各 worker 启动时创建
         run_sse()
@@ -0,0 +1,15 @@
+from .drain import DrainState, ServerDrainingError, get_drain_state
+from .affinity import SessionRouter
+from .streamable_http import StreamableHTTPHandler
+from .workers import DrainingServer, serve_worker, run_workers
+
+__all__ = [
+    "DrainState",
+    "ServerDrainingError",
+    "get_drain_state",
+    "SessionRouter",
+    "StreamableHTTPHandler",
+    "DrainingServer",
+    "serve_worker",
+    "run_workers",
+]
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import os
+import struct
+from typing import Callable, Optional, Tuple
+
+from mcp.server.sse import SseServerTransport
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# 转发请求: 类型、查询串长度、消息体长度；转发响应: 状态码、响应体长度
+_REQUEST_HEADER = struct.Struct(">BII")
+_RESPONSE_HEADER = struct.Struct(">HI")
+
+# 转发请求的类型：会话消息 / 读取该 worker 的指标
+FORWARD_MESSAGE = 0
+FORWARD_METRICS = 1
+
+
+def socket_path(socket_dir: str, worker_id: str) -> str:
+    """worker 接收转发消息的 Unix socket 路径"""
+    return os.path.join(socket_dir, f"worker-{worker_id}.sock")
+
+
+class SessionRouter:
+    """多 worker 部署时把 SSE 会话的消息路由到持有该会话的 worker
+
+    SseServerTransport 的会话只保存在建立 SSE 连接的进程内存中。每个 worker 把
+    自己的编号写入消息地址（/messages/<worker>/?session_id=...），收到其他 worker
+    的消息时，经本机 Unix socket 转发给对应 worker，由其 SseServerTransport 处理。
+
+    同一 socket 也用于读取指定 worker 的指标（render_metrics 返回的文本）。
+    """
+
+    def __init__(self, worker_id: str, socket_dir: Optional[str] = None,
+                 render_metrics: Optional[Callable[[], str]] = None):
+        self.worker_id = worker_id
+        self.socket_dir = socket_dir
+        self.render_metrics = render_metrics
+        self.sse = SseServerTransport(f"/messages/{worker_id}/")
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """监听本 worker 的 Unix socket，接收其他 worker 转发的消息"""
+        if not self.socket_dir:
+            return
+        os.makedirs(self.socket_dir, mode=0o700, exist_ok=True)
+        path = socket_path(self.socket_dir, self.worker_id)
+        if os.path.exists(path):
+            # 上一个同编号 worker 异常退出时遗留
+            os.unlink(path)
+        self._server = await asyncio.start_unix_server(self._serve_forwarded, path=path)
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        try:
+            os.unlink(socket_path(self.socket_dir, self.worker_id))
+        except FileNotFoundError:
+            pass
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """处理 POST /messages/<worker>/ 请求"""
+        worker_id = scope.get("path_params", {}).get("worker", self.worker_id)
+        if worker_id == self.worker_id:
+            await self.sse.handle_post_message(scope, receive, send)
+            return
+
+        if not self.socket_dir:
+            response = Response("Could not find session", status_code=404)
+            await response(scope, receive, send)
+            return
+
+        body = await Request(scope, receive).body()
+        status, payload = await self.forward(worker_id, scope.get("query_string", b""), body)
+        await Response(payload, status_code=status)(scope, receive, send)
+
+    async def metrics(self, worker_id: str) -> Tuple[int, bytes]:
+        """读取指定 worker 的指标文本
+
+        Returns:
+            (状态码, 响应体)，目标 worker 不存在或未启用指标时返回 404
+        """
+        if worker_id == self.worker_id:
+            if self.render_metrics is None:
+                return 404, b"Metrics disabled"
+            return 200, self.render_metrics().encode("utf-8")
+        if not self.socket_dir:
+            return 404, b"Could not find worker"
+        return await self.forward(worker_id, b"", b"", FORWARD_METRICS)
+
+    async def forward(self, worker_id: str, query_string: bytes, body: bytes,
+                      kind: int = FORWARD_MESSAGE) -> Tuple[int, bytes]:
+        """把消息转发给持有会话的 worker
+
+        Returns:
+            (状态码, 响应体)，目标 worker 不存在时返回 404
+        """
+        path = socket_path(self.socket_dir, worker_id)
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            logger.warning(f"目标 worker 不存在: {worker_id}")
+            return 404, b"Could not find session" if kind == FORWARD_MESSAGE else b"Could not find worker"
+
+        try:
+            writer.write(_REQUEST_HEADER.pack(kind, len(query_string), len(body)) + query_string + body)
+            await writer.drain()
+            status, length = _RESPONSE_HEADER.unpack(await reader.readexactly(_RESPONSE_HEADER.size))
+            return status, await reader.readexactly(length)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.warning(f"转发消息到 worker {worker_id} 失败: {e}")
+            return 502, b"Session worker unavailable"
+        finally:
+            writer.close()
+
+    async def _serve_forwarded(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理其他 worker 转发来的一条消息或指标请求"""
+        try:
+            kind, query_length, body_length = _REQUEST_HEADER.unpack(await reader.readexactly(_REQUEST_HEADER.size))
+            query_string = await reader.readexactly(query_length)
+            body = await reader.readexactly(body_length)
+
+            if kind == FORWARD_METRICS:
+                status, payload = await self.metrics(self.worker_id)
+                writer.write(_RESPONSE_HEADER.pack(status, len(payload)) + payload)
+                await writer.drain()
+                return
+
+            scope = {
+                "type": "http",
+                "method": "POST",
+                "path": f"/messages/{self.worker_id}/",
+                "query_string": query_string,
+                "headers": [(b"content-type", b"application/json")],
+            }
+            received = False
+
+            async def receive():
+                nonlocal received
+                if received:
+                    return {"type": "http.disconnect"}
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            status = 500
+            chunks = []
+
+            async def send(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+                    if not message.get("more_body", False):
+                        # 响应先返回，消息交给会话处理时可能还需等待
+                        payload = b"".join(chunks)
+                        writer.write(_RESPONSE_HEADER.pack(status, len(payload)) + payload)
+                        await writer.drain()
+
+            await self.sse.handle_post_message(scope, receive, send)
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            logger.error(f"处理转发消息失败: {e}")
+        finally:
+            writer.close()
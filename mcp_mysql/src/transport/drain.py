@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServerDrainingError(RuntimeError):
+    """服务正在关闭，不再接受新的工具调用"""
+
+
+class DrainState:
+    """跟踪进行中的工具调用，关闭时等待其执行完成
+
+    - track() 包裹每次工具调用，开始关闭后新的调用直接抛出 ServerDrainingError
+    - drain() 在进行中的调用全部结束（或超时）后设置 closed，SSE 连接据此断开
+    每个 worker 进程只有一个事件循环，计数不需要加锁。
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        self._idle: Optional[asyncio.Event] = None
+        self._closed: Optional[asyncio.Event] = None
+
+    @property
+    def idle(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if self.in_flight == 0:
+                self._idle.set()
+        return self._idle
+
+    @property
+    def closed(self) -> asyncio.Event:
+        if self._closed is None:
+            self._closed = asyncio.Event()
+        return self._closed
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        """包裹一次工具调用"""
+        if self.draining:
+            raise ServerDrainingError("服务正在关闭，请重新连接后重试")
+        self.in_flight += 1
+        self.idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self.idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """停止接受新调用并等待进行中的调用结束
+
+        Args:
+            timeout: 最长等待时间(秒)，超时后仍在执行的调用随连接断开被取消
+
+        Returns:
+            bool: 是否在超时前全部完成
+        """
+        self.draining = True
+        if self.in_flight:
+            logger.info(f"等待 {self.in_flight} 个进行中的工具调用完成（最长 {timeout}s）")
+        try:
+            await asyncio.wait_for(self.idle.wait(), timeout or None)
+            completed = True
+        except asyncio.TimeoutError:
+            logger.warning(f"等待超时，{self.in_flight} 个工具调用将被取消")
+            completed = False
+        self.closed.set()
+        return completed
+
+
+_drain_state = DrainState()
+
+
+def get_drain_state() -> DrainState:
+    """获取进程级调用跟踪状态"""
+    return _drain_state
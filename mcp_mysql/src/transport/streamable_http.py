@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+import typing
+from typing import Any, Dict, Optional
+
+from mcp import types
+from mcp.server import Server
+from pydantic import ValidationError
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# 客户端请求的协议版本不在其中时按 mcp 库的最新版本应答
+SUPPORTED_PROTOCOL_VERSIONS = (types.LATEST_PROTOCOL_VERSION, "2025-03-26")
+
+# 协议定义的客户端请求方法，用于区分参数错误和未知方法
+_CLIENT_METHODS = frozenset(
+    typing.get_args(cls.model_fields["method"].annotation)[0]
+    for cls in typing.get_args(types.ClientRequest.model_fields["root"].annotation)
+)
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class StreamableHTTPHandler:
+    """无状态的 Streamable HTTP 传输（单一 /mcp 端点）
+
+    每个 POST 携带一条 JSON-RPC 消息或一个批量数组，处理完成后直接以 application/json
+    返回结果，批量中的请求并发执行。服务端不保存会话，也不保留长连接：短时调用无需
+    先建立 SSE 流，客户端可以通过 HTTP keep-alive 复用连接，多 worker 部署时任意
+    worker 都能处理请求。
+
+    由于不保存会话，服务端不会主动推送消息，GET（订阅流）和 DELETE（结束会话）返回 405。
+    """
+
+    def __init__(self, server: Server):
+        self.server = server
+        self._init_options = None
+
+    def initialize_result(self, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if self._init_options is None:
+            self._init_options = self.server.create_initialization_options()
+        options = self._init_options
+        requested = (params or {}).get("protocolVersion")
+        result = types.InitializeResult(
+            protocolVersion=requested if requested in SUPPORTED_PROTOCOL_VERSIONS else types.LATEST_PROTOCOL_VERSION,
+            capabilities=options.capabilities,
+            serverInfo=types.Implementation(name=options.server_name, version=options.server_version),
+            instructions=options.instructions,
+        )
+        return result.model_dump(by_alias=True, exclude_none=True)
+
+    async def handle_message(self, message: Any) -> Optional[Dict[str, Any]]:
+        """处理一条 JSON-RPC 消息，通知和响应没有返回值"""
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0":
+            return _error(None, types.INVALID_REQUEST, "Invalid JSON-RPC message")
+        if "method" not in message or "id" not in message:
+            # 通知（如 notifications/initialized）或客户端对服务端请求的响应，无需应答
+            return None
+
+        request_id = message["id"]
+        method = message["method"]
+        if method == "initialize":
+            return {"jsonrpc": "2.0", "id": request_id, "result": self.initialize_result(message.get("params"))}
+
+        try:
+            request = types.ClientRequest.model_validate(
+                {"method": method, "params": message.get("params")}
+            ).root
+        except ValidationError:
+            if method in _CLIENT_METHODS:
+                return _error(request_id, types.INVALID_PARAMS, f"Invalid params for {method}")
+            return _error(request_id, types.METHOD_NOT_FOUND, f"Method not found: {method}")
+
+        handler = self.server.request_handlers.get(type(request))
+        if handler is None:
+            return _error(request_id, types.METHOD_NOT_FOUND, f"Method not found: {method}")
+        try:
+            result = await handler(request)
+        except Exception as e:
+            logger.error(f"处理请求 {method} 失败: {e}")
+            return _error(request_id, types.INTERNAL_ERROR, str(e))
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": result.model_dump(by_alias=True, exclude_none=True),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request = Request(scope, receive)
+        if request.method != "POST":
+            response = Response(
+                "Method Not Allowed", status_code=405, headers={"Allow": "POST"}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            await JSONResponse(_error(None, types.PARSE_ERROR, "Parse error"), status_code=400)(scope, receive, send)
+            return
+
+        batch = isinstance(payload, list)
+        messages = payload if batch else [payload]
+        if not messages:
+            await JSONResponse(_error(None, types.INVALID_REQUEST, "Empty batch"), status_code=400)(scope, receive, send)
+            return
+
+        results = await asyncio.gather(*(self.handle_message(message) for message in messages))
+        replies = [result for result in results if result is not None]
+        if not replies:
+            # 只有通知或响应
+            await Response(status_code=202)(scope, receive, send)
+            return
+        await JSONResponse(replies if batch else replies[0])(scope, receive, send)
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import uvicorn
+from sse_starlette.sse import AppStatus
+
+from .drain import get_drain_state
+
+logger = logging.getLogger(__name__)
+
+
+class DrainingServer(uvicorn.Server):
+    """收到退出信号后先排空工具调用再关闭的 uvicorn 服务
+
+    第一次 SIGINT/SIGTERM 时停止接受新的工具调用，等待进行中的调用完成（最长
+    drain_timeout 秒），再断开 SSE 连接并退出；排空期间再次 SIGINT 立即退出。
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_timeout: float):
+        super().__init__(config)
+        self.drain_timeout = drain_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._drain_started = False
+
+    async def serve(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        self._loop = asyncio.get_running_loop()
+        # 由本服务决定何时断开 SSE 连接，而不是收到信号时立即断开
+        AppStatus.disable_automatic_graceful_drain()
+        await super().serve(sockets)
+
+    def handle_exit(self, sig: int, frame) -> None:
+        if self._loop is None or self.should_exit:
+            super().handle_exit(sig, frame)
+            return
+        if self._drain_started:
+            if sig == signal.SIGINT:
+                AppStatus.should_exit = True
+                super().handle_exit(sig, frame)
+            return
+        self._drain_started = True
+        # 信号处理函数中不能直接操作事件循环
+        self._loop.call_soon_threadsafe(self._loop.create_task, self._drain(sig, frame))
+
+    async def _drain(self, sig: int, frame) -> None:
+        await get_drain_state().drain(self.drain_timeout)
+        AppStatus.should_exit = True
+        super().handle_exit(sig, frame)
+
+
+def serve_worker(app_factory: Callable[..., Any], worker_id: str, options: Dict[str, Any],
+                 sockets: Optional[List[socket.socket]] = None) -> None:
+    """在当前进程中运行一个 worker
+
+    Args:
+        app_factory: 以 (worker_id, socket_dir) 创建 ASGI 应用的函数
+        worker_id: worker 编号
+        options: host/port/drain_timeout/socket_dir/keep_alive
+        sockets: 主进程绑定的监听 socket，为空时由 uvicorn 自行监听 host:port
+    """
+    app = app_factory(worker_id, options.get("socket_dir"))
+    config = uvicorn.Config(
+        app,
+        host=options["host"],
+        port=options["port"],
+        lifespan="on",
+        # Streamable HTTP 客户端在请求之间复用连接
+        timeout_keep_alive=options.get("keep_alive", 5),
+        # 排空超时后仍未关闭的连接由 uvicorn 取消
+        timeout_graceful_shutdown=int(options["drain_timeout"]) + 5,
+    )
+    DrainingServer(config, options["drain_timeout"]).run(sockets=sockets)
+
+
+def run_workers(app_factory: Callable[..., Any], options: Dict[str, Any]) -> None:
+    """以多进程方式运行 SSE 服务
+
+    主进程绑定监听端口后启动 options["workers"] 个 worker 进程共享该端口，
+    异常退出的 worker 以相同编号重启；收到 SIGINT/SIGTERM 时通知所有 worker
+    排空后退出，并等待其结束。
+
+    Args:
+        app_factory: 以 (worker_id, socket_dir) 创建 ASGI 应用的函数，需可被子进程导入
+        options: host/port/workers/drain_timeout/socket_dir/keep_alive
+    """
+    config = uvicorn.Config(app_factory, host=options["host"], port=options["port"])
+    sock = config.bind_socket()
+    context = multiprocessing.get_context("spawn")
+    stopping = threading.Event()
+
+    def start(worker_id: str):
+        process = context.Process(
+            target=serve_worker,
+            args=(app_factory, worker_id, options, [sock]),
+            name=f"mcp-mysql-worker-{worker_id}",
+        )
+        process.start()
+        return process
+
+    def handle_signal(sig, frame):
+        if not stopping.is_set():
+            logger.info("正在关闭，等待 worker 排空进行中的调用")
+        stopping.set()
+        for process in processes.values():
+            if process.is_alive():
+                # worker 收到重复的 SIGTERM 会忽略，重复的 SIGINT 会强制退出
+                os.kill(process.pid, signal.SIGTERM)
+
+    processes = {str(index): start(str(index)) for index in range(options["workers"])}
+    logger.info(f"已启动 {len(processes)} 个 worker: http://{options['host']}:{options['port']}")
+    previous = {sig: signal.signal(sig, handle_signal) for sig in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        while not stopping.wait(1):
+            for worker_id, process in list(processes.items()):
+                if not process.is_alive() and not stopping.is_set():
+                    logger.warning(f"worker {worker_id} 已退出(exitcode={process.exitcode})，正在重启")
+                    processes[worker_id] = start(worker_id)
+        for process in processes.values():
+            process.join()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        sock.close()
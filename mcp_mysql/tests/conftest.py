@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 服务以 src 为工作目录运行，模块按顶层包（db、handles、config）导入
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,33 @@
+import asyncio
+
+from transport.affinity import SessionRouter
+
+
+def test_metrics_read_from_other_worker(tmp_path):
+    async def run():
+        routers = [
+            SessionRouter(worker_id, str(tmp_path), lambda worker_id=worker_id: f"metrics of {worker_id}\n")
+            for worker_id in ("0", "1")
+        ]
+        for router in routers:
+            await router.start()
+        try:
+            return [
+                await routers[0].metrics("0"),
+                await routers[0].metrics("1"),
+                await routers[0].metrics("7"),
+            ]
+        finally:
+            for router in routers:
+                await router.stop()
+
+    local, forwarded, missing = asyncio.run(run())
+    assert local == (200, b"metrics of 0\n")
+    assert forwarded == (200, b"metrics of 1\n")
+    assert missing[0] == 404
+
+
+def test_metrics_without_socket_dir_only_serves_local_worker():
+    router = SessionRouter("0", None, lambda: "local\n")
+    assert asyncio.run(router.metrics("0")) == (200, b"local\n")
+    assert asyncio.run(router.metrics("1"))[0] == 404
@@ -0,0 +1,116 @@
+import pytest
+from mysql.connector import Error
+
+import handles.execute_sql as execute_sql
+from db.statements import split_statements, insert_values, batch_inserts
+from handles.execute_sql import ExecuteSQL
+from test_result_cache import Connection, Cursor, DisabledGuard
+
+ALLOWED = ["SELECT", "INSERT", "UPDATE"]
+
+
+def batched(sql, max_rows=100, max_bytes=1 << 20):
+    return [(statement.text, count) for statement, count in batch_inserts(split_statements(sql), max_rows, max_bytes)]
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("INSERT INTO t (a, b) VALUES (1, 'x')", ("INSERT INTO t (a, b)", "(1, 'x')")),
+    ("insert into t value (f(1, 2), ')')", ("insert into t", "(f(1, 2), ')')")),
+    ("INSERT INTO t VALUES (1), (2)", None),
+    ("INSERT INTO t VALUES (1) ON DUPLICATE KEY UPDATE a = 1", None),
+    ("INSERT INTO t SELECT * FROM u", None),
+    ("INSERT INTO t SET a = 1", None),
+    ("UPDATE t SET a = 1", None),
+])
+def test_insert_values(sql, expected):
+    assert insert_values(split_statements(sql)[0]) == expected
+
+
+def test_consecutive_inserts_into_same_columns_are_merged():
+    sql = (
+        "INSERT INTO t (a) VALUES (1); INSERT INTO t (a) VALUES (2);"
+        "INSERT INTO t (b) VALUES (3); UPDATE t SET a = 0; INSERT INTO t (b) VALUES (4)"
+    )
+    assert batched(sql) == [
+        ("INSERT INTO t (a) VALUES (1),(2)", 2),
+        ("INSERT INTO t (b) VALUES (3)", 1),
+        ("UPDATE t SET a = 0", 1),
+        ("INSERT INTO t (b) VALUES (4)", 1),
+    ]
+
+
+def test_batches_respect_row_and_byte_limits():
+    sql = ";".join(f"INSERT INTO t VALUES ({i})" for i in range(5))
+    assert [count for _, count in batched(sql, max_rows=2)] == [2, 2, 1]
+    # 每行 "(i)," 4 字节，头部 "INSERT INTO t VALUES " 21 字节
+    assert [count for _, count in batched(sql, max_bytes=21 + 8)] == [2, 2, 1]
+
+
+class CountingConnection(Connection):
+    def __init__(self, database, fail_on=None):
+        super().__init__(database)
+        self.commits = 0
+        self.rollbacks = 0
+        self.fail_on = fail_on
+
+    def cursor(self):
+        cursor = Cursor(self)
+        execute = cursor.execute
+
+        def failing_execute(sql):
+            if self.fail_on and self.fail_on in sql:
+                raise Error("Duplicate entry")
+            execute(sql)
+
+        cursor.execute = failing_execute
+        return cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture(autouse=True)
+def transaction_config(monkeypatch):
+    monkeypatch.setattr(execute_sql, "get_cost_guard", lambda: DisabledGuard())
+    monkeypatch.setattr(execute_sql, "get_batch_config", lambda: {"max_rows": 100, "max_bytes": 1 << 20})
+
+
+def run_transaction(conn, sql):
+    return ExecuteSQL().execute_transaction(conn, split_statements(sql), "writer", ALLOWED, 100, 1 << 20, "appdb")
+
+
+def test_transaction_batches_inserts_and_commits_once():
+    conn = CountingConnection("appdb")
+    sql = ";".join(f"INSERT INTO t VALUES ({i})" for i in range(250)) + "; UPDATE t SET a = 1"
+    results = run_transaction(conn, sql)
+
+    assert conn.executed[:3] == [
+        "INSERT INTO t VALUES " + ",".join(f"({i})" for i in range(0, 100)),
+        "INSERT INTO t VALUES " + ",".join(f"({i})" for i in range(100, 200)),
+        "INSERT INTO t VALUES " + ",".join(f"({i})" for i in range(200, 250)),
+    ]
+    assert conn.executed[3] == "UPDATE t SET a = 1"
+    assert conn.commits == 1
+    assert results[0].startswith("批量插入 100 条语句")
+    assert results[-1] == "事务已提交，共执行 251 条语句"
+
+
+def test_transaction_rolls_back_on_first_error():
+    conn = CountingConnection("appdb", fail_on="UPDATE")
+    results = run_transaction(conn, "INSERT INTO t VALUES (1); UPDATE t SET a = 1; INSERT INTO u VALUES (2)")
+
+    assert conn.executed == ["INSERT INTO t VALUES (1)"]
+    assert conn.commits == 0
+    assert conn.rollbacks == 1
+    assert "Duplicate entry" in results[-2]
+    assert results[-1] == "事务已回滚，后续语句未执行"
+
+
+def test_transaction_denied_statement_runs_nothing():
+    conn = CountingConnection("appdb")
+    results = run_transaction(conn, "INSERT INTO t VALUES (1); DROP TABLE t")
+    assert conn.executed == []
+    assert results[-1] == "事务未执行"
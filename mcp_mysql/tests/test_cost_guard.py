@@ -0,0 +1,101 @@
+import json
+
+from db.cost_guard import CostGuard
+from db.statements import split_statements
+
+
+class ExplainCursor:
+    def __init__(self, plan):
+        self.plan = plan
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return (json.dumps(self.plan),)
+
+    def fetchall(self):
+        return []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class ExplainConnection:
+    """EXPLAIN FORMAT=JSON 总是返回同一个全表扫描计划的连接"""
+
+    def __init__(self, rows):
+        self.cursor_obj = ExplainCursor({
+            "query_block": {
+                "cost_info": {"query_cost": str(rows / 10)},
+                "table": {"table_name": "big", "rows_examined_per_scan": rows},
+            }
+        })
+
+    def cursor(self, **kwargs):
+        return self.cursor_obj
+
+
+def review(guard, sql, rows=5_000_000):
+    return guard.review(ExplainConnection(rows), split_statements(sql)[0], "test")
+
+
+def test_reject_full_scan_without_limit():
+    result = review(CostGuard(mode="reject", max_rows_examined=1000), "SELECT * FROM big")
+    assert result.rejected
+
+
+def test_existing_limit_is_not_rejected():
+    guard = CostGuard(mode="reject", max_rows_examined=1000, max_cost=100)
+    result = review(guard, "SELECT * FROM big LIMIT 10")
+    assert not result.rejected
+    assert result.statement == "SELECT * FROM big LIMIT 10"
+
+
+def test_existing_limit_with_offset_is_checked():
+    guard = CostGuard(mode="reject", max_rows_examined=1000)
+    assert not review(guard, "SELECT * FROM big LIMIT 10 OFFSET 500").rejected
+    assert review(guard, "SELECT * FROM big LIMIT 100000, 10").rejected
+
+
+def test_limit_in_subquery_does_not_count():
+    guard = CostGuard(mode="reject", max_rows_examined=1000)
+    assert review(guard, "SELECT * FROM big WHERE id IN (SELECT id FROM small LIMIT 5)").rejected
+
+
+def test_limit_mode_appends_limit_after_trailing_comment():
+    guard = CostGuard(mode="limit", max_rows_examined=1000, limit_rows=50)
+    result = review(guard, "SELECT * FROM big -- all rows")
+    assert not result.rejected
+    assert result.statement == "SELECT * FROM big -- all rows\nLIMIT 50"
+    assert "LIMIT 50" in result.note
+
+
+def test_limit_does_not_waive_aggregate_sort_or_group():
+    guard = CostGuard(mode="reject", max_rows_examined=1000)
+    assert review(guard, "SELECT COUNT(*) FROM big LIMIT 1", rows=50_000_000).rejected
+    assert review(guard, "SELECT * FROM big ORDER BY unindexed LIMIT 10", rows=50_000_000).rejected
+    assert review(
+        guard,
+        "SELECT b.k, SUM(b.v) FROM big b JOIN other o ON o.id = b.oid GROUP BY b.k LIMIT 5",
+        rows=50_000_000,
+    ).rejected
+    assert review(guard, "SELECT DISTINCT k FROM big LIMIT 5", rows=50_000_000).rejected
+
+
+def test_aggregate_in_subquery_keeps_limit_waiver():
+    guard = CostGuard(mode="reject", max_rows_examined=1000)
+    result = review(guard, "SELECT * FROM big WHERE v > (SELECT MAX(v) FROM small) LIMIT 10", rows=50_000_000)
+    assert not result.rejected
+
+
+def test_limit_mode_rejects_aggregate_and_sort():
+    guard = CostGuard(mode="limit", max_rows_examined=1000, limit_rows=50)
+    for sql in ("SELECT COUNT(*) FROM big", "SELECT * FROM big ORDER BY unindexed"):
+        result = review(guard, sql)
+        assert result.rejected
+        assert "LIMIT 50" not in result.statement
@@ -0,0 +1,38 @@
+import json
+
+from db.cursors import ResultPage
+from handles.execute_sql import ExecuteSQL
+
+
+def make_page():
+    page = ResultPage(["id", "name"])
+    for row in [(1, "a"), (2, "b")]:
+        page.rows.append(row)
+        page.lines.append(f"{row[0]}\t{row[1]}")
+    return page
+
+
+def test_json_result_and_note_are_separate_contents():
+    handler = ExecuteSQL()
+    results = ["查询执行成功。影响行数: 1"]
+    results += handler.render_page(make_page(), ["LONG", "VAR_STRING"], "json", "-- 已返回第 1-2 行")
+    contents = handler.to_contents(results)
+
+    assert [content.text for content in contents[:1]] == ["查询执行成功。影响行数: 1"]
+    assert json.loads(contents[1].text)["row_count"] == 2
+    assert contents[2].text == "-- 已返回第 1-2 行"
+
+
+def test_csv_result_stays_parseable():
+    handler = ExecuteSQL()
+    contents = handler.to_contents(handler.render_page(make_page(), ["LONG", "VAR_STRING"], "csv", "-- note"))
+    assert contents[0].text.splitlines()[0] == "id,name"
+    assert "---" not in contents[0].text
+    assert contents[1].text == "-- note"
+
+
+def test_plain_text_results_are_merged():
+    handler = ExecuteSQL()
+    contents = handler.to_contents(["a", "b"])
+    assert len(contents) == 1
+    assert contents[0].text == "a\n---\nb"
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+
+import pytest
+
+import db.executor as executor
+from db.executor import QueryHandle, QueryCancelledError
+from test_pool import SessionConnection, make_pool
+
+
+class KillConnection:
+    """记录 KILL QUERY 的独立连接，可在发送时阻塞"""
+
+    def __init__(self, sent, unblock=None):
+        self.sent = sent
+        self.unblock = unblock
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.sent.append(sql)
+        if self.unblock is not None:
+            self.unblock.wait(5)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = make_pool(SessionConnection())
+    monkeypatch.setattr(executor, "get_pool", lambda role=None: pool)
+    return pool
+
+
+def test_kill_after_release_is_skipped(pool, monkeypatch):
+    sent = []
+    monkeypatch.setattr(executor, "connect", lambda **params: KillConnection(sent))
+    handles = []
+    asyncio.run(executor.run_query(lambda conn, handle: handles.append(handle), timeout=5))
+
+    handle = handles[0]
+    assert handle.connection_id is None
+    handle.kill()
+    assert sent == []
+
+
+def test_cancelled_handle_does_not_bind(pool):
+    handle = QueryHandle(pool)
+    handle.kill()
+    assert not handle.bind(SessionConnection())
+
+
+def test_release_waits_for_kill_in_progress(pool, monkeypatch):
+    sent = []
+    kill_started = threading.Event()
+    unblock = threading.Event()
+    running = threading.Event()
+    finish = threading.Event()
+
+    def blocking_connect(**params):
+        kill_started.set()
+        return KillConnection(sent, unblock)
+
+    monkeypatch.setattr(executor, "connect", blocking_connect)
+    handles = []
+
+    def query(conn, handle):
+        handles.append(handle)
+        running.set()
+        finish.wait(5)
+
+    worker = threading.Thread(target=lambda: asyncio.run(executor.run_query(query, timeout=5)))
+    worker.start()
+    assert running.wait(5)
+
+    killer = threading.Thread(target=handles[0].kill)
+    killer.start()
+    assert kill_started.wait(5)
+    # 查询结束，但 KILL 仍在发送，连接不能归还给其他借用方
+    finish.set()
+    worker.join(0.2)
+    assert pool._idle.empty()
+
+    unblock.set()
+    killer.join(5)
+    worker.join(5)
+    assert sent == ["KILL QUERY 1"]
+    assert not pool._idle.empty()
+    assert handles[0].connection_id is None
+
+
+def test_query_cancelled_before_start(pool, monkeypatch):
+    class CancelledHandle(QueryHandle):
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.cancelled = True
+
+    monkeypatch.setattr(executor, "QueryHandle", CancelledHandle)
+    with pytest.raises(QueryCancelledError):
+        asyncio.run(executor.run_query(lambda conn, handle: None, timeout=5))
+    # 名额已归还
+    assert pool.acquire(timeout=0) is not None
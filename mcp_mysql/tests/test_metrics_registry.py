@@ -0,0 +1,24 @@
+from metrics import MetricsRegistry
+
+
+def pool_gauges():
+    return [("mysql_pool_idle", "空闲连接数", {"pool": "default"}, 2)]
+
+
+def test_collector_added_once():
+    registry = MetricsRegistry()
+    registry.add_collector(pool_gauges)
+    registry.add_collector(pool_gauges)
+    text = registry.render()
+    assert text.count('mysql_pool_idle{pool="default"} 2') == 1
+    assert text.count("# TYPE mysql_pool_idle gauge") == 1
+
+
+def test_constant_labels_added_to_every_sample():
+    registry = MetricsRegistry()
+    registry.counter("mcp_tool_errors", "错误数", ["tool"]).inc(tool="execute_sql")
+    registry.add_collector(pool_gauges)
+    registry.set_constant_labels(worker="3")
+    text = registry.render()
+    assert 'mcp_tool_errors_total{worker="3",tool="execute_sql"} 1' in text
+    assert 'mysql_pool_idle{worker="3",pool="default"} 2' in text
@@ -0,0 +1,107 @@
+import asyncio
+
+from mysql.connector import Error
+
+import db.executor as executor
+from db.pool import ConnectionPool
+from db.prepared import execute_prepared
+from test_prepared import FakeConnection
+
+
+class SessionConnection(FakeConnection):
+    def __init__(self, reset_error=None):
+        super().__init__()
+        self.in_transaction = False
+        self.rolled_back = False
+        self.resets = 0
+        self.reset_error = reset_error
+        self.database = "appdb"
+
+    def is_connected(self):
+        return not self.closed
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def reset_session(self):
+        if self.reset_error is not None:
+            raise self.reset_error
+        # 与 COM_RESET_CONNECTION 一致，重置不会切换当前库
+        self.resets += 1
+
+    def cmd_init_db(self, database):
+        self.database = database
+
+
+def make_pool(conn):
+    pool = ConnectionPool({"database": "appdb"}, size=1, validate_on_borrow=False)
+    pool._create_connection = lambda: conn
+    return pool
+
+
+def test_release_resets_session():
+    conn = SessionConnection()
+    pool = make_pool(conn)
+    borrowed = pool.acquire()
+    borrowed.in_transaction = True
+    execute_prepared(borrowed, "SELECT %s", (1,))
+    cursor = borrowed.cursors[0]
+
+    pool.release(borrowed)
+    assert conn.rolled_back
+    assert conn.resets == 1
+    # 重置会话会释放服务端的预处理语句
+    assert cursor.closed
+    assert not hasattr(conn, "_mcp_statement_cache")
+    assert pool.acquire(timeout=0) is conn
+
+
+def test_release_closes_connection_when_reset_fails():
+    conn = SessionConnection(reset_error=Error("reset failed"))
+    pool = make_pool(conn)
+    pool.release(pool.acquire())
+    assert conn.closed
+    assert pool._idle.empty()
+    # 名额已释放，可以重新借用
+    pool._create_connection = SessionConnection
+    assert pool.acquire(timeout=0) is not conn
+
+
+
+def test_release_restores_default_database():
+    conn = SessionConnection()
+    pool = make_pool(conn)
+    borrowed = pool.acquire()
+    # 借用方执行了 USE other_db
+    borrowed.database = "other_db"
+    pool.release(borrowed)
+
+    borrowed = pool.acquire(timeout=0)
+    assert borrowed is conn
+    assert borrowed.database == "appdb"
+
+
+def test_prepared_statements_reused_across_calls(monkeypatch):
+    conn = SessionConnection()
+    pool = make_pool(conn)
+    monkeypatch.setattr(executor, "get_pool", lambda role=None: pool)
+    sql = "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s"
+
+    async def lookup(database):
+        return await executor.run_query(
+            lambda borrowed, handle: execute_prepared(borrowed, sql, (database,)),
+            timeout=5,
+            reset_session=False,
+        )
+
+    assert asyncio.run(lookup("a")) == [("a",)]
+    assert asyncio.run(lookup("b")) == [("b",)]
+    # 两次调用使用同一个预处理语句，会话没有被重置
+    assert len(conn.cursors) == 1
+    assert not conn.cursors[0].closed
+    assert conn.resets == 0
+
+    # 执行任意SQL的调用归还时重置会话，同时关闭预处理语句
+    asyncio.run(executor.run_query(lambda borrowed, handle: None, timeout=5))
+    assert conn.resets == 1
+    assert conn.cursors[0].closed
@@ -0,0 +1,65 @@
+import gc
+import weakref
+
+from db.pool import ConnectionPool
+from db.prepared import execute_prepared
+
+
+class PreparedCursor:
+    def __init__(self):
+        self.closed = False
+
+    def execute(self, sql, params=()):
+        self.params = params
+
+    def fetchall(self):
+        return [self.params]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    connection_id = 1
+
+    def __init__(self):
+        self.cursors = []
+        self.closed = False
+
+    def cursor(self, prepared=False):
+        cursor = PreparedCursor()
+        self.cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool():
+    return ConnectionPool({}, size=1, validate_on_borrow=False)
+
+
+def test_statements_reused_on_same_connection():
+    conn = FakeConnection()
+    assert execute_prepared(conn, "SELECT %s", (1,)) == [(1,)]
+    assert execute_prepared(conn, "SELECT %s", (2,)) == [(2,)]
+    assert len(conn.cursors) == 1
+
+
+def test_discarded_connection_frees_its_cache():
+    pool = make_pool()
+    pool._slots.acquire()
+    conn = FakeConnection()
+    execute_prepared(conn, "SELECT %s", (1,))
+    cursors = list(conn.cursors)
+    conn_ref = weakref.ref(conn)
+    cache_ref = weakref.ref(conn._mcp_statement_cache)
+
+    pool.discard(conn)
+    assert conn.closed
+    assert all(cursor.closed for cursor in cursors)
+
+    del conn
+    gc.collect()
+    assert conn_ref() is None
+    assert cache_ref() is None
@@ -0,0 +1,120 @@
+import pytest
+
+import handles.execute_sql as execute_sql
+from db.result_cache import ResultCache
+from db.statements import split_statements
+from handles.execute_sql import ExecuteSQL
+
+ALLOWED = ["SELECT", "UPDATE", "INSERT", "USE"]
+
+
+class Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rowcount = 0
+        self.rows = []
+
+    def execute(self, sql):
+        self.conn.executed.append(sql)
+        words = sql.split()
+        if words[0].upper() == "USE":
+            self.conn.database = words[1]
+        if words[0].upper() == "SELECT":
+            self.description = [("id", 3)]
+            self.rows = [(1,)]
+        else:
+            self.description = None
+            self.rowcount = 1
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class Connection:
+    def __init__(self, database):
+        self.database = database
+        self.executed = []
+        self.in_transaction = False
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        pass
+
+    def start_transaction(self):
+        self.in_transaction = True
+
+
+class DisabledGuard:
+    enabled = False
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResultCache(1 << 20, 60)
+    monkeypatch.setattr(execute_sql, "get_result_cache", lambda: cache)
+    monkeypatch.setattr(execute_sql, "get_cost_guard", lambda: DisabledGuard())
+    return cache
+
+
+def cache_keys(handler, query, database="appdb"):
+    return handler.result_cache_keys(split_statements(query), "admin", ALLOWED, database, "text", 100, 1 << 20)
+
+
+def test_call_with_use_is_not_cacheable(cache):
+    handler = ExecuteSQL()
+    assert cache_keys(handler, "USE other; SELECT * FROM t") == []
+    key, tables = cache_keys(handler, "SELECT * FROM t")[0]
+    assert tables == frozenset({("appdb", "t")})
+
+
+def test_result_keyed_on_connection_database(cache):
+    handler = ExecuteSQL()
+    stored = []
+    # 连接实际位于 other 库（例如残留的 USE），结果不能按默认库缓存
+    conn = Connection("other")
+    handler.execute_statements(
+        conn, None, split_statements("SELECT * FROM t"), "admin", ALLOWED, 100, 1 << 20,
+        "appdb", "text", lambda index, items, database: stored.append(database)
+    )
+    assert stored == ["other"]
+
+    statement = split_statements("SELECT * FROM t")[0]
+    key, tables = handler.result_cache_key(statement, "admin", ALLOWED, "other", "text", 100, 1 << 20)
+    assert tables == frozenset({("other", "t")})
+    assert key != cache_keys(handler, "SELECT * FROM t")[0][0]
+
+
+def test_write_after_use_invalidates_that_database(cache):
+    handler = ExecuteSQL()
+    for database in ("appdb", "other"):
+        key, tables = cache_keys(handler, "SELECT * FROM t", database)[0]
+        cache.put(key, ["rows"], 4, tables, cache.generation)
+
+    conn = Connection("appdb")
+    handler.execute_statements(
+        conn, None, split_statements("USE other; UPDATE t SET a = 1"), "admin", ALLOWED, 100, 1 << 20,
+        "appdb", "text"
+    )
+    assert cache.get(cache_keys(handler, "SELECT * FROM t", "other")[0][0]) is None
+    assert cache.get(cache_keys(handler, "SELECT * FROM t", "appdb")[0][0]) == ["rows"]
+
+
+def test_transaction_write_after_use_invalidates_that_database(cache):
+    handler = ExecuteSQL()
+    key, tables = cache_keys(handler, "SELECT * FROM t", "other")[0]
+    cache.put(key, ["rows"], 4, tables, cache.generation)
+
+    conn = Connection("appdb")
+    conn.rollback = lambda: None
+    results = handler.execute_transaction(
+        conn, split_statements("USE other; UPDATE t SET a = 1"), "admin", ALLOWED, 100, 1 << 20, "appdb"
+    )
+    assert results[-1].startswith("事务已提交")
+    assert cache.get(key) is None
@@ -0,0 +1,109 @@
+import pytest
+
+import db.schema_cache as schema_cache
+import handles.execute_sql as execute_sql
+from db.schema_cache import SchemaCache, ddl_targets
+from db.statements import split_statements
+from handles.execute_sql import ExecuteSQL
+from test_result_cache import Connection, DisabledGuard
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT * FROM t", None),
+    ("INSERT INTO t VALUES (1)", None),
+    ("ALTER TABLE t ADD COLUMN c INT", [("appdb", "t")]),
+    ("alter table `other`.`t` drop column c", [("other", "t")]),
+    ("DROP TABLE IF EXISTS a, other.b", [("appdb", "a"), ("other", "b")]),
+    ("CREATE TEMPORARY TABLE IF NOT EXISTS tmp (id INT)", [("appdb", "tmp")]),
+    ("TRUNCATE TABLE t", [("appdb", "t")]),
+    ("CREATE UNIQUE INDEX idx ON `t` (c)", [("appdb", "t")]),
+    ("DROP INDEX idx ON other.t", [("other", "t")]),
+    ("RENAME TABLE a TO b, other.c TO other.d", [("appdb", "a"), ("appdb", "b"), ("other", "c"), ("other", "d")]),
+    ("DROP DATABASE IF EXISTS `other`", [("other", None)]),
+    # 无法识别的DDL使整个当前库失效
+    ("CREATE VIEW v AS SELECT 1", [("appdb", None)]),
+])
+def test_ddl_targets(statement, expected):
+    assert ddl_targets(statement, "appdb") == expected
+
+
+def filled_cache():
+    cache = SchemaCache(60)
+    cache.set("columns", "appdb", "a", ["a.id"])
+    cache.set("columns", "appdb", "b", ["b.id"])
+    cache.set("tables", "appdb", ("comment", "x"), ["a"])
+    cache.set("columns", "other", "a", ["other.a.id"])
+    return cache
+
+
+def test_table_invalidation_keeps_other_tables():
+    cache = filled_cache()
+    assert cache.invalidate("appdb", "a") == 2
+    assert cache.get("columns", "appdb", "a") is None
+    # 按注释搜索表名的结果属于整个库，同样失效
+    assert cache.get("tables", "appdb", ("comment", "x")) is None
+    assert cache.get("columns", "appdb", "b") == ["b.id"]
+    assert cache.get("columns", "other", "a") == ["other.a.id"]
+
+
+def test_database_and_full_invalidation():
+    cache = filled_cache()
+    assert cache.invalidate("appdb") == 3
+    assert cache.get("columns", "other", "a") == ["other.a.id"]
+    assert cache.invalidate() == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(schema_cache.time, "monotonic", lambda: now[0])
+    cache = SchemaCache(10)
+    cache.set("columns", "appdb", "a", ["a.id"])
+    now[0] += 5
+    assert cache.get("columns", "appdb", "a") == ["a.id"]
+    now[0] += 6
+    assert cache.get("columns", "appdb", "a") is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = SchemaCache(0)
+    assert not cache.enabled
+    cache.set("columns", "appdb", "a", ["a.id"])
+    assert cache.get("columns", "appdb", "a") is None
+
+
+def test_lookup_and_store():
+    cache = SchemaCache(60)
+    assert cache.lookup("columns", "appdb", ["a", "b"]) == ({}, ["a", "b"])
+    # 查询不到的表也缓存为空列表，避免反复查询
+    assert cache.store("columns", "appdb", ["a", "b"], {"a": ["a.id"]}) == {"a": ["a.id"], "b": []}
+    assert cache.lookup("columns", "appdb", ["a", "b"]) == ({"a": ["a.id"], "b": []}, [])
+    assert cache.lookup("columns", "appdb", ["a"], refresh=True) == ({}, ["a"])
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = filled_cache()
+    monkeypatch.setattr(execute_sql, "get_schema_cache", lambda: cache)
+    monkeypatch.setattr(execute_sql, "get_cost_guard", lambda: DisabledGuard())
+    return cache
+
+
+def test_ddl_through_execute_sql_invalidates_connection_database(cache):
+    conn = Connection("appdb")
+    ExecuteSQL().execute_statements(
+        conn, None, split_statements("USE other; ALTER TABLE a ADD COLUMN c INT"), "admin",
+        ["USE", "ALTER"], 100, 1 << 20, "appdb", "text"
+    )
+    assert cache.get("columns", "other", "a") is None
+    assert cache.get("columns", "appdb", "a") == ["a.id"]
+
+
+def test_ddl_in_transaction_invalidates_schema_cache(cache):
+    conn = Connection("appdb")
+    conn.rollback = lambda: None
+    results = ExecuteSQL().execute_transaction(
+        conn, split_statements("DROP TABLE b; SELECT 1"), "admin", ["DROP", "SELECT"], 100, 1 << 20, "appdb"
+    )
+    assert results[-1].startswith("事务已提交")
+    assert cache.get("columns", "appdb", "b") is None
+    assert cache.get("columns", "appdb", "a") == ["a.id"]
@@ -0,0 +1,99 @@
+import pytest
+
+from config.dbconfig import ROLE_PERMISSIONS
+from db.statements import split_statements, match_operation
+
+
+def texts(sql):
+    return [statement.text for statement in split_statements(sql)]
+
+
+def allowed(sql, role):
+    return [match_operation(statement, ROLE_PERMISSIONS[role]) is not None for statement in split_statements(sql)]
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT 'a;b' FROM t", ["SELECT 'a;b' FROM t"]),
+    ("SELECT 'it''s;' FROM t", ["SELECT 'it''s;' FROM t"]),
+    ('SELECT "a\\";b" FROM t; SELECT 2', ['SELECT "a\\";b" FROM t', "SELECT 2"]),
+    ("SELECT `a;b` FROM t", ["SELECT `a;b` FROM t"]),
+    ("SELECT 1 -- ; DROP TABLE t", ["SELECT 1 -- ; DROP TABLE t"]),
+    ("SELECT 1 # ; DROP TABLE t", ["SELECT 1 # ; DROP TABLE t"]),
+    ("SELECT 1 /* ; */ FROM t", ["SELECT 1 /* ; */ FROM t"]),
+    ("/* header; */ SELECT 1", ["SELECT 1"]),
+    ("SELECT 1;;  ; -- only a comment\n", ["SELECT 1"]),
+])
+def test_delimiters_inside_quotes_and_comments(sql, expected):
+    assert texts(sql) == expected
+
+
+def test_double_dash_needs_whitespace_to_start_a_comment():
+    # MySQL 中 --1 是两次取负，不是注释
+    assert texts("SELECT 1 --1; DROP TABLE t") == ["SELECT 1 --1", "DROP TABLE t"]
+
+
+def test_delimiter_command():
+    sql = (
+        "DELIMITER $$\n"
+        "CREATE PROCEDURE p() BEGIN SELECT 1; SELECT 2; END$$\n"
+        "DELIMITER ;\n"
+        "CALL p();"
+    )
+    statements = split_statements(sql)
+    assert [statement.text for statement in statements] == [
+        "CREATE PROCEDURE p() BEGIN SELECT 1; SELECT 2; END",
+        "CALL p()",
+    ]
+    assert statements[0].keywords[:2] == ("CREATE", "PROCEDURE")
+
+
+def test_keywords_stop_at_first_non_word():
+    statement = split_statements("(SELECT id FROM t) UNION (SELECT id FROM u)")[0]
+    assert statement.keywords == ("SELECT", "ID", "FROM", "T")
+    assert split_statements("CREATE OR REPLACE VIEW v AS SELECT 1")[0].keywords == ("CREATE", "OR", "REPLACE", "VIEW")
+
+
+def test_multi_statement_smuggling_is_split_and_denied():
+    assert texts("SELECT 1; DROP TABLE t") == ["SELECT 1", "DROP TABLE t"]
+    assert allowed("SELECT 1; DROP TABLE t", "readonly") == [True, False]
+    assert allowed("SELECT 'x'';'; DELETE FROM t", "readonly") == [True, False]
+
+
+@pytest.mark.parametrize("sql", [
+    # 可执行注释和优化器提示会被服务端执行，不能当作注释跳过
+    "/*! DROP TABLE t */",
+    "/*!50000 DROP TABLE t */ SELECT 1",
+    "/*+ SET_VAR(sql_mode='') */ SELECT 1",
+])
+def test_executable_comments_are_not_skipped(sql):
+    statements = split_statements(sql)
+    assert statements[0].text == sql
+    assert statements[0].keywords == ()
+    assert allowed(sql, "admin") == [False]
+
+
+def test_executable_comment_cannot_hide_a_delimiter():
+    assert texts("SELECT 1 /*! ; DROP TABLE t */") == ["SELECT 1 /*!", "DROP TABLE t */"]
+    assert allowed("SELECT 1 /*! ; DROP TABLE t */", "readonly") == [True, False]
+
+
+@pytest.mark.parametrize("sql, role, expected", [
+    ("SELECT * FROM t", "readonly", "SELECT"),
+    ("select * from t", "readonly", "SELECT"),
+    ("INSERT INTO t VALUES (1)", "readonly", None),
+    ("UPDATE t SET a = 1", "writer", "UPDATE"),
+    ("DROP TABLE t", "writer", None),
+    ("CREATE VIEW v AS SELECT 1", "admin", "CREATE VIEW"),
+    ("CREATE TABLE t (id INT)", "admin", "CREATE TABLE"),
+    ("USE other", "writer", None),
+    ("USE other", "admin", "USE"),
+    ("-- comment\nDROP DATABASE d", "readonly", None),
+])
+def test_role_permissions(sql, role, expected):
+    assert match_operation(split_statements(sql)[0], ROLE_PERMISSIONS[role]) == expected
+
+
+def test_multi_word_operation_requires_every_word():
+    assert match_operation(split_statements("LOCK TABLES t READ")[0], ["LOCK TABLES"]) == "LOCK TABLES"
+    assert match_operation(split_statements("LOCK INSTANCE FOR BACKUP")[0], ["LOCK TABLES"]) is None
+    assert match_operation(split_statements("CREATE TABLE t (id INT)")[0], ["CREATE VIEW"]) is None
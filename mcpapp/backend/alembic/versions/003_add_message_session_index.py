@@ -0,0 +1,25 @@
+"""add chat_messages session composite index
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # 会话消息统计与消息列表查询使用的复合索引
+    op.create_index(
+        'idx_chat_messages_session_active_created',
+        'chat_messages',
+        ['session_id', 'is_active', 'created_at']
+    )
+
+def downgrade():
+    op.drop_index('idx_chat_messages_session_active_created', table_name='chat_messages')
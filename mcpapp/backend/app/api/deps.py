@@ -1,12 +1,14 @@
-from typing import Generator
+from typing import Generator, AsyncGenerator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.session import SessionLocal
-from app.services.auth import AuthService
+from app.core.auth_cache import get_auth_cache, USER_ACTIVE, USER_INACTIVE, USER_MISSING
+from app.db.session import SessionLocal, AsyncSessionLocal
+from app.services.auth import AsyncAuthService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
@@ -18,9 +20,14 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """获取异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 async def get_current_user_id(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> int:
     """获取当前用户ID
     
@@ -39,28 +46,39 @@ async def get_current_user_id(
         detail="无法验证凭据",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        # 解码token
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id = int(payload.get("sub"))
-        if user_id is None:
+    cache = get_auth_cache()
+
+    user_id = cache.get_token(token)
+    if user_id is None:
+        try:
+            # 解码token
+            payload = jwt.decode(
+                token, 
+                settings.SECRET_KEY, 
+                algorithms=[settings.ALGORITHM]
+            )
+            user_id = int(payload.get("sub"))
+        except (JWTError, TypeError, ValueError):
             raise credentials_exception
-    except (JWTError, ValueError):
-        raise credentials_exception
-        
-    # 验证用户是否存在且处于激活状态
-    auth_service = AuthService(db)
-    user = auth_service.get_user_by_id(user_id)
-    if not user:
+        cache.set_token(token, user_id, payload.get("exp"))
+
+    # 验证用户是否存在且处于激活状态，命中缓存时不访问数据库
+    state = await cache.get_user_state(user_id)
+    if state is None:
+        auth_service = AsyncAuthService(db)
+        user = await auth_service.get_user_by_id(user_id)
+        if not user:
+            state = USER_MISSING
+        else:
+            state = USER_ACTIVE if user.is_active else USER_INACTIVE
+        await cache.set_user_state(user_id, state)
+
+    if state == USER_MISSING:
         raise credentials_exception
-    if not user.is_active:
+    if state == USER_INACTIVE:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="用户已被禁用"
         )
         
-    return user_id 
\ No newline at end of file
+    return user_id
\ No newline at end of file
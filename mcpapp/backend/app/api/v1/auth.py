@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 from app.api import deps
 from app.models.user import UserCreate, Token, UserResponse
-from app.services.auth import AuthService
-from app.db.models import User  # 从正确的模块导入
+from app.services.auth import AsyncAuthService
+from app.utils.security import PasswordHasherBusy
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -16,7 +16,7 @@ router = APIRouter()
 @router.post("/register", response_model=Token)
 async def register(
     user_in: UserCreate,
-    db: Session = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> Token:
     """用户注册
     
@@ -32,10 +32,10 @@ async def register(
     """
     try:
         logger.info(f"开始注册用户: {user_in.email}")
-        auth_service = AuthService(db)
+        auth_service = AsyncAuthService(db)
         
         # 检查邮箱是否已被注册
-        if auth_service.get_user_by_email(user_in.email):
+        if await auth_service.get_user_by_email(user_in.email):
             logger.warning(f"邮箱已被注册: {user_in.email}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,7 +43,7 @@ async def register(
             )
             
         # 检查用户名是否已被使用
-        existing_user = db.query(User).filter(User.username == user_in.username).first()
+        existing_user = await auth_service.get_user_by_username(user_in.username)
         if existing_user:
             logger.warning(f"用户名已被使用: {user_in.username}")
             raise HTTPException(
@@ -53,7 +53,7 @@ async def register(
         
         # 创建新用户
         logger.info(f"创建新用户: {user_in.email}")
-        user = auth_service.create_user(user_in)
+        user = await auth_service.create_user(user_in)
         
         # 创建访问令牌
         logger.info(f"为用户创建访问令牌: {user.id}")
@@ -63,6 +63,13 @@ async def register(
         return token
     except HTTPException:
         raise
+    except PasswordHasherBusy as e:
+        logger.warning(f"注册请求被拒绝: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"注册失败: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -73,7 +80,7 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> Token:
     """用户登录
     
@@ -88,10 +95,10 @@ async def login(
         HTTPException: 邮箱或密码错误时抛出
     """
     try:
-        auth_service = AuthService(db)
+        auth_service = AsyncAuthService(db)
         
         # 验证用户
-        user = auth_service.authenticate_user(form_data.username, form_data.password)
+        user = await auth_service.authenticate_user(form_data.username, form_data.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -111,6 +118,13 @@ async def login(
         return token
     except HTTPException:
         raise
+    except PasswordHasherBusy as e:
+        logger.warning(f"登录请求被拒绝: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"登录失败: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -121,7 +135,7 @@ async def login(
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     current_user_id: int = Depends(deps.get_current_user_id),
-    db: Session = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_async_db)
 ) -> UserResponse:
     """获取当前用户信息
     
@@ -136,8 +150,8 @@ async def get_current_user(
         HTTPException: 用户不存在时抛出
     """
     try:
-        auth_service = AuthService(db)
-        user = auth_service.get_user_by_id(current_user_id)
+        auth_service = AsyncAuthService(db)
+        user = await auth_service.get_user_by_id(current_user_id)
         
         if not user:
             raise HTTPException(
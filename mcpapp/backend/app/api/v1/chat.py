@@ -1,9 +1,12 @@
-from typing import List
+from typing import List, Any, Dict, AsyncIterator
+import json
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.services.chat import ChatService
+from app.services.response_cache import get_response_cache
 from app.schemas.chat import (
     SessionCreate,
     SessionResponse,
@@ -15,45 +18,45 @@ from app.schemas.chat import (
 router = APIRouter()
 
 @router.get("/sessions", response_model=List[SessionResponse])
-def get_sessions(
+async def get_sessions(
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user_id: int = Depends(deps.get_current_user_id)
 ):
     """获取用户的会话列表"""
     chat_service = ChatService(db)
-    sessions = chat_service.get_user_sessions(current_user_id, skip, limit)
+    sessions = await chat_service.get_user_sessions(current_user_id, skip, limit)
     return sessions
 
 @router.post("/sessions", response_model=SessionResponse)
-def create_session(
+async def create_session(
     session: SessionCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user_id: int = Depends(deps.get_current_user_id)
 ):
     """创建新会话"""
     chat_service = ChatService(db)
-    return chat_service.create_session(current_user_id, session.title)
+    return await chat_service.create_session(current_user_id, session.title)
 
 @router.get("/sessions/{session_id}/messages", response_model=List[MessageResponse])
-def get_messages(
+async def get_messages(
     session_id: int,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user_id: int = Depends(deps.get_current_user_id)
 ):
     """获取会话消息列表"""
     chat_service = ChatService(db)
-    messages = chat_service.get_session_messages(session_id, skip, limit)
+    messages = await chat_service.get_session_messages(session_id, skip, limit)
     return messages
 
 @router.post("/sessions/{session_id}/messages", response_model=List[MessageResponse])
 async def send_message(
     session_id: int,
     message: MessageCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user_id: int = Depends(deps.get_current_user_id)
 ):
     """发送消息并获取回复
@@ -70,10 +73,61 @@ async def send_message(
     chat_service = ChatService(db)
     return await chat_service.send_message(session_id, message.content)
 
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """格式化为Server-Sent Events数据帧"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/sessions/{session_id}/messages/stream")
+async def stream_message(
+    session_id: int,
+    message: MessageCreate,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user_id: int = Depends(deps.get_current_user_id)
+):
+    """发送消息并以SSE方式流式返回回复
+    
+    事件依次为 user_message、若干 delta、assistant_message；
+    出错时发送 error 事件（回复生成中途出错时先发送已收到部分的 assistant_message）。
+    
+    Args:
+        session_id: 会话ID
+        message: 消息内容
+        db: 数据库会话
+        current_user_id: 当前用户ID
+        
+    Returns:
+        StreamingResponse: text/event-stream 响应
+    """
+    chat_service = ChatService(db)
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for item in chat_service.stream_message(
+                session_id, message.content, message.metadata
+            ):
+                if item["event"] == "delta":
+                    yield _format_sse("delta", {"content": item["content"]})
+                elif item["event"] == "error":
+                    yield _format_sse("error", {"detail": item["detail"]})
+                else:
+                    data = MessageResponse.model_validate(item["message"]).model_dump(mode="json")
+                    yield _format_sse(item["event"], data)
+        except Exception as e:
+            yield _format_sse("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @router.delete("/sessions/{session_id}", response_model=DeleteResponse)
 async def delete_session(
     session_id: int,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user_id: int = Depends(deps.get_current_user_id)
 ):
     """删除会话
@@ -92,7 +146,7 @@ async def delete_session(
     chat_service = ChatService(db)
     
     # 检查会话是否存在
-    session = chat_service.get_session(session_id)
+    session = await chat_service.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="会话不存在")
         
@@ -101,8 +155,18 @@ async def delete_session(
         raise HTTPException(status_code=403, detail="无权限删除此会话")
     
     # 删除会话
-    success = chat_service.delete_session(session_id)
+    success = await chat_service.delete_session(session_id)
     if not success:
         raise HTTPException(status_code=500, detail="删除会话失败")
         
-    return {"success": True, "message": "会话已删除"} 
\ No newline at end of file
+    return {"success": True, "message": "会话已删除"} 
+
+@router.get("/llm-cache/stats")
+async def get_llm_cache_stats(
+    current_user_id: int = Depends(deps.get_current_user_id)
+) -> Dict[str, Any]:
+    """获取LLM回复缓存的命中率、节省耗时和过期淘汰等统计信息"""
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
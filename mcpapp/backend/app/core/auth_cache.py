@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.redis_client import create_redis_client
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# 用户状态缓存值：用户不存在 / 已禁用 / 正常
+USER_MISSING = "missing"
+USER_INACTIVE = "inactive"
+USER_ACTIVE = "active"
+
+_REDIS_KEY_PREFIX = "auth:user_state:"
+_REDIS_INVALIDATE_CHANNEL = "auth:user_state:invalidate"
+
+
+class AuthCache:
+    """认证缓存：已验证的JWT和用户状态
+
+    - token缓存只保存在进程内，过期时间不超过JWT自身的exp，避免重复解码验签
+    - 用户状态缓存保存在进程内，配置了Redis时同时写入Redis供多个worker共享，
+      禁用用户时通过Redis发布失效消息，各worker立即清除本地缓存
+
+    命中缓存时认证不需要访问数据库。
+    """
+
+    def __init__(self, maxsize: int, token_ttl: float, user_ttl: float):
+        self.token_ttl = token_ttl
+        self.user_ttl = user_ttl
+        self._tokens = TTLCache(maxsize)
+        self._users = TTLCache(maxsize)
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {
+            "token_hits": 0,
+            "token_misses": 0,
+            "user_hits": 0,
+            "user_misses": 0,
+        }
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        # 只保存摘要，避免在内存中长期持有完整token
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get_token(self, token: str) -> Optional[int]:
+        """获取已验证token对应的用户ID
+
+        Args:
+            token: JWT token
+
+        Returns:
+            Optional[int]: 用户ID，未缓存或已过期返回None
+        """
+        user_id = self._tokens.get(self._token_key(token))
+        self.stats["token_hits" if user_id is not None else "token_misses"] += 1
+        return user_id
+
+    def set_token(self, token: str, user_id: int, exp: Optional[float] = None) -> None:
+        """缓存验证通过的token
+
+        Args:
+            token: JWT token
+            user_id: 用户ID
+            exp: JWT的过期时间戳，缓存不会超过该时间
+        """
+        ttl = self.token_ttl
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        self._tokens.set(self._token_key(token), user_id, ttl)
+
+    async def get_user_state(self, user_id: int) -> Optional[str]:
+        """获取用户状态
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            Optional[str]: USER_ACTIVE/USER_INACTIVE/USER_MISSING，未缓存返回None
+        """
+        state = self._users.get(user_id)
+        if state is None and self._redis is not None:
+            try:
+                state = await self._redis.get(f"{_REDIS_KEY_PREFIX}{user_id}")
+            except Exception as e:
+                logger.warning(f"读取Redis用户状态缓存失败: {e}")
+                state = None
+            if state is not None:
+                self._users.set(user_id, state, self.user_ttl)
+        self.stats["user_hits" if state is not None else "user_misses"] += 1
+        return state
+
+    async def set_user_state(self, user_id: int, state: str) -> None:
+        """缓存用户状态
+
+        Args:
+            user_id: 用户ID
+            state: USER_ACTIVE/USER_INACTIVE/USER_MISSING
+        """
+        self._users.set(user_id, state, self.user_ttl)
+        if self._redis is not None:
+            try:
+                await self._redis.set(f"{_REDIS_KEY_PREFIX}{user_id}", state, ex=max(1, int(self.user_ttl)))
+            except Exception as e:
+                logger.warning(f"写入Redis用户状态缓存失败: {e}")
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """清除用户状态缓存（禁用、删除用户后调用）
+
+        Args:
+            user_id: 用户ID
+        """
+        self._users.pop(user_id)
+        if self._redis is not None:
+            try:
+                await self._redis.delete(f"{_REDIS_KEY_PREFIX}{user_id}")
+                await self._redis.publish(_REDIS_INVALIDATE_CHANNEL, str(user_id))
+            except Exception as e:
+                logger.warning(f"发布用户缓存失效消息失败: {e}")
+
+    def clear(self) -> None:
+        """清空本进程的缓存"""
+        self._tokens.clear()
+        self._users.clear()
+
+    async def connect_redis(self, client: Any) -> None:
+        """使用Redis共享用户状态，并订阅其他worker发布的失效消息
+
+        Args:
+            client: redis.asyncio.Redis 客户端（测试时可传入实现相同接口的替身）
+        """
+        pubsub = client.pubsub()
+        await pubsub.subscribe(_REDIS_INVALIDATE_CHANNEL)
+        self._redis = client
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def _listen(self, pubsub: Any) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    self._users.pop(int(message["data"]))
+                except (TypeError, ValueError):
+                    continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 订阅中断后本地缓存最多保留 user_ttl 秒，清空以免错过失效消息
+            logger.warning(f"用户缓存失效订阅中断: {e}")
+            self._users.clear()
+        finally:
+            await pubsub.close()
+
+    async def close(self) -> None:
+        """停止订阅并关闭Redis连接"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+_auth_cache: Optional[AuthCache] = None
+
+
+def get_auth_cache() -> AuthCache:
+    """获取应用级共享的认证缓存
+
+    Returns:
+        AuthCache: 认证缓存
+    """
+    global _auth_cache
+    if _auth_cache is None:
+        _auth_cache = AuthCache(
+            maxsize=settings.AUTH_CACHE_MAXSIZE,
+            token_ttl=settings.AUTH_TOKEN_CACHE_TTL,
+            user_ttl=settings.AUTH_USER_CACHE_TTL,
+        )
+    return _auth_cache
+
+
+async def init_auth_cache() -> AuthCache:
+    """初始化认证缓存（应用启动时调用）
+
+    AUTH_CACHE_USE_REDIS 开启时连接 Settings 中配置的Redis，
+    未安装 redis 包或连接失败时只使用进程内缓存。
+
+    Returns:
+        AuthCache: 认证缓存
+    """
+    cache = get_auth_cache()
+    if not settings.AUTH_CACHE_USE_REDIS or cache._redis is not None:
+        return cache
+    client = await create_redis_client()
+    if client is None:
+        return cache
+    try:
+        await cache.connect_redis(client)
+    except Exception as e:
+        logger.warning(f"订阅Redis失效消息失败，认证缓存仅在进程内生效: {e}")
+        await client.close()
+    return cache
+
+
+async def close_auth_cache() -> None:
+    """关闭认证缓存（应用关闭时调用）"""
+    global _auth_cache
+    if _auth_cache is not None:
+        await _auth_cache.close()
+    _auth_cache = None
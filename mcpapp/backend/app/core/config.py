@@ -33,17 +33,39 @@ class Settings(BaseSettings):
         encoded_password = quote_plus(self.MYSQL_PASSWORD)
         return f"mysql+pymysql://{self.MYSQL_USER}:{encoded_password}@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}?charset=utf8mb4"
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        """获取异步数据库连接URI（aiomysql驱动）"""
+        encoded_password = quote_plus(self.MYSQL_PASSWORD)
+        return f"mysql+aiomysql://{self.MYSQL_USER}:{encoded_password}@{self.MYSQL_HOST}:{self.MYSQL_PORT}/{self.MYSQL_DATABASE}?charset=utf8mb4"
+
+    # 数据库连接池配置
+    DB_POOL_SIZE: int = 10  # 连接池常驻连接数
+    DB_MAX_OVERFLOW: int = 20  # 超出常驻连接数后允许的额外连接数
+    DB_POOL_RECYCLE: int = 3600  # 连接回收时间(秒)，需小于MySQL wait_timeout
+
     # Redis配置
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
     REDIS_DB: int = 0
 
+    # 认证缓存配置
+    AUTH_CACHE_MAXSIZE: int = 10000  # token和用户状态缓存的条目上限
+    AUTH_TOKEN_CACHE_TTL: float = 300.0  # 已验证token的缓存时间(秒)，不超过token自身有效期
+    AUTH_USER_CACHE_TTL: float = 30.0  # 用户激活状态的缓存时间(秒)
+    AUTH_CACHE_USE_REDIS: bool = False  # 是否通过Redis在多个worker间共享用户状态
+
     # JWT配置
     SECRET_KEY: str = "your-secret-key"  # 在生产环境中应该使用环境变量
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7天
 
+    # 密码哈希配置
+    BCRYPT_ROUNDS: int = 12  # bcrypt cost，修改后旧密码在用户下次登录时自动重新哈希
+    PASSWORD_HASH_WORKERS: int = 4  # 密码哈希线程数
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 排队和执行中的哈希任务上限，超出时返回503
+
     # DeepSeek配置
     DEEPSEEK_API_KEY: str = Field(default="your-api-key-here")
     DEEPSEEK_API_BASE: str = "https://api.deepseek.com/v1"
@@ -57,6 +79,37 @@ class Settings(BaseSettings):
 5. 请一步一步思考
 """
 
+    # 对话上下文配置
+    CHAT_CONTEXT_MAX_TOKENS: int = 4000  # 每轮发送的历史消息和当前消息的token预算
+    CHAT_CONTEXT_MAX_MESSAGES: int = 50  # 上下文窗口最多保留的消息数
+    CHAT_CONTEXT_CACHE_SESSIONS: int = 1000  # 内存中缓存上下文窗口的会话数
+
+    # 会话滚动摘要配置
+    CHAT_SUMMARY_ENABLED: bool = True  # 是否在后台压缩较早的对话
+    CHAT_SUMMARY_TRIGGER_TOKENS: int = 2500  # 未摘要消息超过该token数时刷新摘要，需小于上下文预算
+    CHAT_SUMMARY_KEEP_TOKENS: int = 1200  # 摘要时保留原文的最近消息token数
+    CHAT_SUMMARY_BATCH_MESSAGES: int = 100  # 每次调用LLM合并的消息数上限
+    CHAT_SUMMARY_MAX_CHARS: int = 500  # 摘要字数上限（写入提示词）
+    CHAT_SUMMARY_MAX_TOKENS: int = 800  # 生成摘要的最大token数
+
+    # LLM回复缓存配置
+    LLM_CACHE_ENABLED: bool = False  # 是否缓存相同请求的回复（默认关闭）
+    LLM_CACHE_MAX_ENTRIES: int = 1000  # 内存中缓存的回复数
+    LLM_CACHE_TTL: int = 60 * 60 * 24  # 回复缓存有效期(秒)
+    LLM_CACHE_USE_REDIS: bool = False  # 是否使用Redis作为持久化缓存层
+    LLM_SEMANTIC_CACHE_ENABLED: bool = False  # 是否对近似问题复用回复
+    LLM_SEMANTIC_CACHE_MAX_ENTRIES: int = 2000  # 语义索引中的条目数
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.9  # 近似问题的最低余弦相似度
+
+    # LLM HTTP连接池配置
+    LLM_HTTP_POOL_LIMIT: int = 100  # 连接池总连接数上限
+    LLM_HTTP_POOL_LIMIT_PER_HOST: int = 20  # 单个主机连接数上限
+    LLM_HTTP_DNS_CACHE_TTL: int = 300  # DNS缓存时间(秒)
+    LLM_HTTP_KEEPALIVE_TIMEOUT: float = 60.0  # 空闲连接保活时间(秒)
+    LLM_HTTP_CONNECT_TIMEOUT: float = 10.0  # 建立连接超时(秒)
+    LLM_HTTP_READ_TIMEOUT: float = 120.0  # 读取响应超时(秒)
+    LLM_HTTP_TOTAL_TIMEOUT: float = 300.0  # 单次请求总超时(秒)
+
     class Config:
         case_sensitive = True
         env_file = ".env"
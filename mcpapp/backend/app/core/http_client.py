@@ -0,0 +1,64 @@
+from typing import Optional
+import aiohttp
+
+from app.core.config import settings
+
+# 应用级共享的HTTP会话，在FastAPI启动时创建、关闭时释放
+_client_session: Optional[aiohttp.ClientSession] = None
+
+
+def _create_client_session() -> aiohttp.ClientSession:
+    """根据配置创建带连接池的HTTP会话
+
+    Returns:
+        aiohttp.ClientSession: 复用TCP/TLS连接的HTTP会话
+    """
+    connector = aiohttp.TCPConnector(
+        limit=settings.LLM_HTTP_POOL_LIMIT,
+        limit_per_host=settings.LLM_HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=settings.LLM_HTTP_DNS_CACHE_TTL,
+        use_dns_cache=True,
+        keepalive_timeout=settings.LLM_HTTP_KEEPALIVE_TIMEOUT,
+        enable_cleanup_closed=True,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.LLM_HTTP_TOTAL_TIMEOUT,
+        connect=settings.LLM_HTTP_CONNECT_TIMEOUT,
+        sock_read=settings.LLM_HTTP_READ_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+async def init_http_client() -> aiohttp.ClientSession:
+    """初始化共享HTTP会话（应用启动时调用）
+
+    Returns:
+        aiohttp.ClientSession: 共享HTTP会话
+    """
+    global _client_session
+    if _client_session is None or _client_session.closed:
+        _client_session = _create_client_session()
+    return _client_session
+
+
+async def close_http_client() -> None:
+    """关闭共享HTTP会话（应用关闭时调用）"""
+    global _client_session
+    if _client_session is not None and not _client_session.closed:
+        await _client_session.close()
+    _client_session = None
+
+
+def get_http_client() -> aiohttp.ClientSession:
+    """获取共享HTTP会话
+
+    未经过应用启动流程（如脚本中直接调用）时按需创建，
+    之后的调用会继续复用同一个连接池。
+
+    Returns:
+        aiohttp.ClientSession: 共享HTTP会话
+    """
+    global _client_session
+    if _client_session is None or _client_session.closed:
+        _client_session = _create_client_session()
+    return _client_session
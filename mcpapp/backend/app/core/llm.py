@@ -1,6 +1,6 @@
 from typing import Optional, List, Dict, Any
-import aiohttp
 from app.core.config import settings
+from app.core.http_client import get_http_client
 
 async def get_llm_response(
     message: str,
@@ -35,19 +35,19 @@ async def get_llm_response(
     }
     
     try:
-        # 发送请求到DeepSeek API
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{settings.DEEPSEEK_API_BASE}/chat/completions",
-                json=payload,
-                headers=headers
-            ) as response:
-                if response.status != 200:
-                    error_msg = await response.text()
-                    raise Exception(f"DeepSeek API error: {error_msg}")
-                
-                data = await response.json()
-                return data["choices"][0]["message"]["content"]
+        # 发送请求到DeepSeek API（复用应用级连接池）
+        session = get_http_client()
+        async with session.post(
+            f"{settings.DEEPSEEK_API_BASE}/chat/completions",
+            json=payload,
+            headers=headers
+        ) as response:
+            if response.status != 200:
+                error_msg = await response.text()
+                raise Exception(f"DeepSeek API error: {error_msg}")
+            
+            data = await response.json()
+            return data["choices"][0]["message"]["content"]
     except Exception as e:
         # 如果API调用失败，返回一个友好的错误消息
         error_message = f"抱歉，我现在无法正常回复。错误信息：{str(e)}"
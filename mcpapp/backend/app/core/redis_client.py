@@ -0,0 +1,36 @@
+import logging
+from typing import Any, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def create_redis_client() -> Optional[Any]:
+    """根据 Settings 中的 REDIS_* 配置创建Redis客户端
+
+    redis 为可选依赖，未安装或连接失败时返回None，调用方应退化为进程内缓存。
+
+    Returns:
+        Optional[redis.asyncio.Redis]: 已连通的客户端
+    """
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        logger.warning("未安装redis，缓存仅在进程内生效")
+        return None
+
+    client = redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        password=settings.REDIS_PASSWORD,
+        db=settings.REDIS_DB,
+        decode_responses=True,
+    )
+    try:
+        await client.ping()
+    except Exception as e:
+        logger.warning(f"连接Redis失败，缓存仅在进程内生效: {e}")
+        await client.close()
+        return None
+    return client
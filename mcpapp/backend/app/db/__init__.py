@@ -1,4 +1,4 @@
 from .base import Base
-from .session import SessionLocal, engine
+from .session import SessionLocal, engine, AsyncSessionLocal, async_engine
 
-__all__ = ["Base", "SessionLocal", "engine"] 
\ No newline at end of file
+__all__ = ["Base", "SessionLocal", "engine", "AsyncSessionLocal", "async_engine"] 
\ No newline at end of file
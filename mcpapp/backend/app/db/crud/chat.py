@@ -1,8 +1,48 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, func, select, and_, update
 from app.db.models.chat import Session as ChatSession, Message, MessageType
 
+def _user_sessions_with_stats_stmt(user_id: int, skip: int, limit: int):
+    """构建会话列表统计查询
+
+    通过一条查询完成：先取出当前分页的会话ID，再用窗口函数
+    在这些会话的消息上计算消息数量和最新一条消息。
+    """
+    # 当前分页的会话ID
+    page = select(ChatSession.id.label("id"))\
+        .where(ChatSession.user_id == user_id)\
+        .where(ChatSession.is_active == True)\
+        .order_by(ChatSession.updated_at.desc())\
+        .offset(skip)\
+        .limit(limit)\
+        .subquery("page")
+
+    # 分页内会话的消息统计，rn = 1 为最新一条消息
+    ranked = select(
+            Message.session_id.label("session_id"),
+            Message.content.label("content"),
+            func.row_number().over(
+                partition_by=Message.session_id,
+                order_by=(Message.created_at.desc(), Message.id.desc())
+            ).label("rn"),
+            func.count(Message.id).over(
+                partition_by=Message.session_id
+            ).label("message_count")
+        )\
+        .join(page, page.c.id == Message.session_id)\
+        .where(Message.is_active == True)\
+        .subquery("ranked")
+
+    return select(ChatSession, ranked.c.message_count, ranked.c.content)\
+        .join(page, page.c.id == ChatSession.id)\
+        .outerjoin(ranked, and_(
+            ranked.c.session_id == ChatSession.id,
+            ranked.c.rn == 1
+        ))\
+        .order_by(ChatSession.updated_at.desc())
+
 class ChatCRUD:
     """聊天相关数据库操作类"""
 
@@ -26,6 +66,25 @@ class ChatCRUD:
             .limit(limit)\
             .all()
 
+    def get_user_sessions_with_stats(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10
+    ) -> List[Tuple[ChatSession, int, Optional[str]]]:
+        """获取用户的会话列表及每个会话的消息数量和最后一条消息
+
+        Args:
+            user_id: 用户ID
+            skip: 跳过数量
+            limit: 返回数量
+
+        Returns:
+            List[Tuple[ChatSession, int, Optional[str]]]: (会话, 消息数量, 最后一条消息内容)
+        """
+        rows = self.db.execute(_user_sessions_with_stats_stmt(user_id, skip, limit)).all()
+        return [(session, count or 0, content) for session, count, content in rows]
+
     def create_session(self, user_id: int, title: str) -> ChatSession:
         """创建新会话"""
         session = ChatSession(user_id=user_id, title=title)
@@ -109,4 +168,216 @@ class ChatCRUD:
         except Exception as e:
             self.db.rollback()
             print(f"Error updating session status: {e}")
-            return False 
\ No newline at end of file
+            return False
+
+
+class AsyncChatCRUD:
+    """聊天相关数据库操作类（异步版本，基于AsyncSession）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_session(self, session_id: int) -> Optional[ChatSession]:
+        """获取单个会话"""
+        result = await self.db.execute(
+            select(ChatSession)
+            .where(ChatSession.id == session_id)
+            .where(ChatSession.is_active == True)
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def get_user_sessions(self, user_id: int, skip: int = 0, limit: int = 10) -> List[ChatSession]:
+        """获取用户的会话列表"""
+        result = await self.db.execute(
+            select(ChatSession)
+            .where(ChatSession.user_id == user_id)
+            .where(ChatSession.is_active == True)
+            .order_by(ChatSession.updated_at.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_user_sessions_with_stats(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10
+    ) -> List[Tuple[ChatSession, int, Optional[str]]]:
+        """获取用户的会话列表及每个会话的消息数量和最后一条消息"""
+        result = await self.db.execute(_user_sessions_with_stats_stmt(user_id, skip, limit))
+        return [(session, count or 0, content) for session, count, content in result.all()]
+
+    async def create_session(self, user_id: int, title: str) -> ChatSession:
+        """创建新会话"""
+        session = ChatSession(user_id=user_id, title=title)
+        self.db.add(session)
+        await self.db.commit()
+        await self.db.refresh(session)
+        return session
+
+    async def get_session_messages(self, session_id: int, skip: int = 0, limit: int = 50) -> List[Message]:
+        """获取会话消息列表"""
+        result = await self.db.execute(
+            select(Message)
+            .where(Message.session_id == session_id)
+            .where(Message.is_active == True)
+            .order_by(Message.created_at.asc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_recent_session_messages(
+        self,
+        session_id: int,
+        limit: int,
+        after_id: Optional[int] = None
+    ) -> List[Message]:
+        """获取会话最近的消息（按时间倒序）
+
+        按 (session_id, is_active, created_at) 索引倒序扫描，只读取最新的 limit 条。
+
+        Args:
+            session_id: 会话ID
+            limit: 最多返回的消息数
+            after_id: 只返回ID大于该值的消息（增量读取）
+
+        Returns:
+            List[Message]: 最新的消息在前
+        """
+        stmt = select(Message)\
+            .where(Message.session_id == session_id)\
+            .where(Message.is_active == True)
+        if after_id is not None:
+            stmt = stmt.where(Message.id > after_id)
+        result = await self.db.execute(
+            stmt.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_session_messages_between(
+        self,
+        session_id: int,
+        after_id: Optional[int],
+        before_id: int,
+        limit: int
+    ) -> List[Message]:
+        """获取会话中ID位于 (after_id, before_id) 之间的消息（按时间正序）
+
+        Args:
+            session_id: 会话ID
+            after_id: 起始消息ID（不含），为空时从第一条开始
+            before_id: 结束消息ID（不含）
+            limit: 最多返回的消息数
+
+        Returns:
+            List[Message]: 最早的消息在前
+        """
+        stmt = select(Message)\
+            .where(Message.session_id == session_id)\
+            .where(Message.is_active == True)\
+            .where(Message.id < before_id)
+        if after_id is not None:
+            stmt = stmt.where(Message.id > after_id)
+        result = await self.db.execute(
+            stmt.order_by(Message.created_at.asc(), Message.id.asc()).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def update_session_data(self, session_id: int, key: str, value: Any) -> bool:
+        """更新会话 session_data 中的一项
+
+        Args:
+            session_id: 会话ID
+            key: 数据键
+            value: 数据值
+
+        Returns:
+            bool: 会话存在且更新成功返回True
+        """
+        session = await self.get_session(session_id)
+        if not session:
+            return False
+        # JSON列需要整体赋值才会被识别为已修改
+        session.session_data = {**(session.session_data or {}), key: value}
+        await self.db.commit()
+        return True
+
+    async def get_session_last_message(self, session_id: int) -> Optional[Message]:
+        """获取会话的最后一条消息"""
+        result = await self.db.execute(
+            select(Message)
+            .where(Message.session_id == session_id)
+            .where(Message.is_active == True)
+            .order_by(Message.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def get_session_message_count(self, session_id: int) -> int:
+        """获取会话的消息数量"""
+        result = await self.db.execute(
+            select(func.count(Message.id))
+            .where(Message.session_id == session_id)
+            .where(Message.is_active == True)
+        )
+        return result.scalar() or 0
+
+    async def create_message(self, session_id: int, content: str, message_type: MessageType, metadata: Optional[Dict[str, Any]] = None) -> Message:
+        """创建新消息"""
+        message = Message(
+            session_id=session_id,
+            content=content,
+            message_type=message_type,
+            message_metadata=metadata if metadata else {}
+        )
+
+        self.db.add(message)
+
+        # 更新会话的更新时间
+        await self.db.execute(
+            update(ChatSession)
+            .where(ChatSession.id == session_id)
+            .where(ChatSession.is_active == True)
+            .values(updated_at=func.now())
+        )
+
+        await self.db.commit()
+        await self.db.refresh(message)
+        return message
+
+    async def update_session_status(self, session_id: int, is_active: bool = True) -> bool:
+        """更新会话状态（软删除）
+
+        Args:
+            session_id: 会话ID
+            is_active: 是否激活，False表示删除
+
+        Returns:
+            bool: 更新是否成功
+        """
+        try:
+            session = await self.get_session(session_id)
+            if not session:
+                return False
+
+            # 更新会话状态
+            session.is_active = is_active
+            session.updated_at = func.now()
+
+            # 如果是删除操作，同时更新所有相关消息的状态
+            if not is_active:
+                await self.db.execute(
+                    update(Message)
+                    .where(Message.session_id == session_id)
+                    .values(is_active=False)
+                )
+
+            await self.db.commit()
+            return True
+        except Exception as e:
+            await self.db.rollback()
+            print(f"Error updating session status: {e}")
+            return False
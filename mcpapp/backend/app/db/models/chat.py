@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Float, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Float, Boolean, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func, text
 from app.db.base_class import Base
@@ -27,6 +27,11 @@ class Message(Base):
     # 关联
     session = relationship("Session", back_populates="messages")
 
+    __table_args__ = (
+        # 按会话查询有效消息并按时间排序（消息列表、会话统计）
+        Index("idx_chat_messages_session_active_created", "session_id", "is_active", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Message {self.id}>"
 
@@ -1,13 +1,18 @@
 from datetime import timedelta
 from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.auth_cache import get_auth_cache
 from app.db import models
 from app.models.user import UserCreate, Token
 from app.utils.security import (
     verify_password,
+    verify_password_async,
     get_password_hash,
+    get_password_hash_async,
     create_access_token
 )
 
@@ -106,4 +111,136 @@ class AuthService:
             expires_delta=access_token_expires
         )
         
-        return Token(access_token=access_token) 
\ No newline at end of file
+        return Token(access_token=access_token)
+
+
+class AsyncAuthService:
+    """认证服务（异步版本，基于AsyncSession）"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_by_email(self, email: str) -> Optional[models.User]:
+        """通过邮箱获取用户
+        
+        Args:
+            email: 用户邮箱
+
+        Returns:
+            Optional[models.User]: 用户对象
+        """
+        result = await self.db.execute(
+            select(models.User).where(models.User.email == email).limit(1)
+        )
+        return result.scalars().first()
+
+    async def get_user_by_username(self, username: str) -> Optional[models.User]:
+        """通过用户名获取用户
+        
+        Args:
+            username: 用户名
+
+        Returns:
+            Optional[models.User]: 用户对象
+        """
+        result = await self.db.execute(
+            select(models.User).where(models.User.username == username).limit(1)
+        )
+        return result.scalars().first()
+
+    async def get_user_by_id(self, user_id: int) -> Optional[models.User]:
+        """通过ID获取用户
+        
+        Args:
+            user_id: 用户ID
+            
+        Returns:
+            Optional[User]: 用户对象，不存在则返回None
+        """
+        return await self.db.get(models.User, user_id)
+
+    async def set_user_active(self, user_id: int, is_active: bool) -> bool:
+        """启用或禁用用户，并清除该用户的认证缓存
+        
+        Args:
+            user_id: 用户ID
+            is_active: 是否激活，False表示禁用
+            
+        Returns:
+            bool: 用户存在且更新成功返回True
+        """
+        user = await self.get_user_by_id(user_id)
+        if not user:
+            return False
+        user.is_active = is_active
+        await self.db.commit()
+        await get_auth_cache().invalidate_user(user_id)
+        return True
+
+    async def authenticate_user(
+        self,
+        email: str,
+        password: str
+    ) -> Optional[models.User]:
+        """验证用户
+        
+        Args:
+            email: 用户邮箱
+            password: 用户密码
+
+        Returns:
+            Optional[models.User]: 验证成功返回用户对象，失败返回None
+        """
+        user = await self.get_user_by_email(email)
+        if not user:
+            return None
+        verified, new_hash = await verify_password_async(password, user.hashed_password)
+        if not verified:
+            return None
+        if new_hash:
+            # bcrypt cost 已调整，使用新的参数重新保存密码哈希
+            user.hashed_password = new_hash
+            await self.db.commit()
+        return user
+
+    async def create_user(self, user_in: UserCreate) -> models.User:
+        """创建新用户
+        
+        Args:
+            user_in: 用户创建请求模型
+
+        Returns:
+            models.User: 创建的用户对象
+        """
+        db_user = models.User(
+            email=user_in.email,
+            username=user_in.username,
+            hashed_password=await get_password_hash_async(user_in.password),
+            is_active=True
+        )
+        
+        self.db.add(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        
+        return db_user
+
+    def create_token(self, user_id: int) -> Token:
+        """创建访问令牌
+        
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            Token: 令牌对象
+        """
+        access_token_expires = timedelta(
+            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        )
+        
+        access_token = create_access_token(
+            user_id,
+            expires_delta=access_token_expires
+        )
+        
+        return Token(access_token=access_token)
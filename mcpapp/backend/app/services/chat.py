@@ -1,55 +1,65 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
+import asyncio
+import logging
+from typing import List, Optional, Dict, Any, AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.chat import Session as ChatSession, Message, MessageType
-from app.db.crud.chat import ChatCRUD
+from app.db.crud.chat import AsyncChatCRUD
 from app.services.llm import LLMService
+from app.services.context import get_context_builder
+from app.services.summary import get_summarizer
+
+logger = logging.getLogger(__name__)
 
 class ChatService:
     """聊天服务"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
-        self.crud = ChatCRUD(db)
+        self.crud = AsyncChatCRUD(db)
         self.llm = LLMService()
+        self.context_builder = get_context_builder()
+        self.summarizer = get_summarizer()
 
-    def get_user_sessions(
+    async def get_user_sessions(
         self, 
         user_id: int, 
         skip: int = 0, 
         limit: int = 10
     ) -> List[ChatSession]:
         """获取用户的会话列表"""
-        sessions = self.crud.get_user_sessions(user_id, skip, limit)
-        # 为每个会话添加最后一条消息和消息数量
-        for session in sessions:
-            last_message = self.crud.get_session_last_message(session.id)
-            if last_message:
-                session.last_message = last_message.content
-            message_count = self.crud.get_session_message_count(session.id)
+        # 一次查询同时取回会话、消息数量和最后一条消息
+        sessions = []
+        for session, message_count, last_message in \
+                await self.crud.get_user_sessions_with_stats(user_id, skip, limit):
+            if last_message is not None:
+                session.last_message = last_message
             session.message_count = message_count
+            sessions.append(session)
         return sessions
 
-    def create_session(self, user_id: int, title: str = "新会话") -> ChatSession:
+    async def create_session(self, user_id: int, title: str = "新会话") -> ChatSession:
         """创建新会话"""
-        return self.crud.create_session(user_id, title)
+        return await self.crud.create_session(user_id, title)
 
-    def get_session(self, session_id: int) -> Optional[ChatSession]:
+    async def get_session(self, session_id: int) -> Optional[ChatSession]:
         """获取指定会话"""
-        return self.crud.get_session(session_id)
+        return await self.crud.get_session(session_id)
 
-    def delete_session(self, session_id: int) -> bool:
+    async def delete_session(self, session_id: int) -> bool:
         """删除(软删除)指定会话"""
-        return self.crud.update_session_status(session_id, False)
+        deleted = await self.crud.update_session_status(session_id, False)
+        if deleted:
+            self.context_builder.invalidate(session_id)
+        return deleted
 
-    def get_session_messages(
+    async def get_session_messages(
         self, 
         session_id: int, 
         skip: int = 0, 
         limit: int = 50
     ) -> List[Message]:
         """获取会话消息列表"""
-        return self.crud.get_session_messages(session_id, skip, limit)
+        return await self.crud.get_session_messages(session_id, skip, limit)
 
     async def send_message(
         self, 
@@ -68,33 +78,101 @@ class ChatService:
             List[Message]: 包含用户消息和AI回复的消息列表
         """
         # 创建用户消息
-        user_message = self.crud.create_message(
+        user_message = await self.crud.create_message(
             session_id=session_id,
             content=content,
             message_type=MessageType.USER.value,  # 使用枚举值的字符串表示
             metadata=metadata
         )
         
-        # 获取会话历史消息作为上下文
-        context = [
-            {"role": msg.message_type, "content": msg.content}
-            for msg in self.crud.get_session_messages(session_id, limit=10)
-        ]
+        # 获取会话历史消息作为上下文（不含本轮用户消息）
+        context = await self._build_context(session_id, user_message)
         
         # 调用LLM获取回复
         assistant_reply = await self.llm.get_llm_response(content, context)
         
         # 创建助手回复消息
-        assistant_message = self.crud.create_message(
+        assistant_message = await self._save_assistant_message(session_id, assistant_reply)
+        
+        return [user_message, assistant_message]
+
+    async def stream_message(
+        self, 
+        session_id: int, 
+        content: str, 
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """发送消息并以流式方式获取AI回复
+        
+        客户端中途断开时，已收到的部分回复仍会保存。
+        
+        Args:
+            session_id: 会话ID
+            content: 消息内容
+            metadata: 元数据
+            
+        Yields:
+            Dict[str, Any]: 流式事件，依次为
+            - {"event": "user_message", "message": 用户消息}
+            - {"event": "delta", "content": 增量内容}（多次）
+            - {"event": "assistant_message", "message": 完整的AI回复消息}
+            - {"event": "error", "detail": 错误信息}（上游出错时，在已收到内容的
+              assistant_message 之后发送，错误信息不写入消息内容）
+        """
+        user_message = await self.crud.create_message(
             session_id=session_id,
-            content=assistant_reply,
-            message_type=MessageType.ASSISTANT.value  # 使用枚举值的字符串表示
+            content=content,
+            message_type=MessageType.USER.value,
+            metadata=metadata
         )
+        yield {"event": "user_message", "message": user_message}
+        
+        context = await self._build_context(session_id, user_message)
         
-        # 更新会话最后活动时间
-        session = self.crud.get_session(session_id)
-        if session:
-            session.updated_at = func.now()
-            self.db.commit()
+        # 边接收边转发增量内容，同时拼接完整回复
+        parts: List[str] = []
+        error: Optional[str] = None
+        saving = False
+        try:
+            try:
+                async for delta in self.llm.stream_llm_response(content, context):
+                    parts.append(delta)
+                    yield {"event": "delta", "content": delta}
+            except Exception as e:
+                logger.error(f"流式获取回复失败: session_id={session_id}, {str(e)}", exc_info=True)
+                error = f"抱歉，我现在无法正常回复。错误信息：{str(e)}"
+            
+            # 流结束后保存助手回复，出错时只保存已收到的部分
+            if parts or error is None:
+                saving = True
+                assistant_message = await asyncio.shield(
+                    self._save_assistant_message(session_id, "".join(parts))
+                )
+                yield {"event": "assistant_message", "message": assistant_message}
+            if error is not None:
+                yield {"event": "error", "detail": error}
+        finally:
+            # 客户端断开（GeneratorExit/CancelledError）时保存已生成的部分回复
+            if parts and not saving:
+                await asyncio.shield(self._save_assistant_message(session_id, "".join(parts)))
+
+    async def _build_context(
+        self, 
+        session_id: int, 
+        current_message: Optional[Message] = None
+    ) -> List[Dict[str, Any]]:
+        """构建发送给LLM的上下文消息（最近的消息，受token预算限制）"""
+        return await self.context_builder.build(self.crud, session_id, current_message)
+
+    async def _save_assistant_message(self, session_id: int, content: str) -> Message:
+        """保存助手回复（create_message 会同时更新会话最后活动时间）
         
-        return [user_message, assistant_message] 
\ No newline at end of file
+        历史较长时在后台把较早的对话压缩为摘要，不影响本次回复。
+        """
+        message = await self.crud.create_message(
+            session_id=session_id,
+            content=content,
+            message_type=MessageType.ASSISTANT.value  # 使用枚举值的字符串表示
+        )
+        self.summarizer.maybe_schedule(session_id)
+        return message 
\ No newline at end of file
@@ -0,0 +1,202 @@
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.db.crud.chat import AsyncChatCRUD
+from app.db.models.chat import Message
+from app.utils.tokenizer import count_message_tokens
+
+# 会话摘要在 Session.session_data 中的键
+SUMMARY_KEY = "summary"
+
+
+class ContextEntry:
+    """上下文窗口中的一条消息（已计算token数）"""
+
+    __slots__ = ("id", "role", "content", "tokens")
+
+    def __init__(self, message: Message):
+        self.id = message.id
+        self.role = message.message_type
+        self.content = message.content
+        self.tokens = count_message_tokens(message.content)
+
+
+class SessionContext:
+    """单个会话的滑动上下文窗口"""
+
+    def __init__(self):
+        self.entries: Deque[ContextEntry] = deque()
+        self.tokens = 0
+        self.last_id: Optional[int] = None
+        # 已被摘要覆盖的消息（ID不大于 summary_until_id）不再进入窗口
+        self.summary: Optional[str] = None
+        self.summary_tokens = 0
+        self.summary_until_id: Optional[int] = None
+
+    def set_summary(self, content: Optional[str], until_id: Optional[int]) -> None:
+        self.summary = content or None
+        self.summary_tokens = count_message_tokens(self.summary) if self.summary else 0
+        self.summary_until_id = until_id
+        while self.entries and until_id is not None and self.entries[0].id <= until_id:
+            self.tokens -= self.entries.popleft().tokens
+
+
+class ContextBuilder:
+    """基于token预算的滑动窗口上下文构建器
+
+    每个会话在内存中缓存最近的消息及其token数。首次构建时按索引倒序读取最新的
+    消息，之后每轮只增量读取ID大于缓存中最后一条的新消息，超出预算的旧消息从
+    窗口头部移出，不再重复查询和计算整段历史。
+
+    会话存在滚动摘要时，上下文为摘要加上摘要之后的最近消息。
+    """
+
+    def __init__(self, max_tokens: int, max_messages: int, max_sessions: int):
+        self.max_tokens = max_tokens
+        self.max_messages = max_messages
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[int, SessionContext]" = OrderedDict()
+
+    async def build(
+        self,
+        crud: AsyncChatCRUD,
+        session_id: int,
+        current_message: Optional[Message] = None
+    ) -> List[Dict[str, Any]]:
+        """构建发送给LLM的历史上下文
+
+        Args:
+            crud: 当前请求的数据库操作对象
+            session_id: 会话ID
+            current_message: 本轮刚保存的用户消息，单独发送，不计入历史
+
+        Returns:
+            List[Dict[str, Any]]: 按时间正序的历史消息（有摘要时以摘要开头），
+            总token数不超过预算
+        """
+        context = await self._refresh(crud, session_id)
+
+        budget = self.max_tokens - context.summary_tokens
+        exclude_id = None
+        if current_message is not None:
+            budget -= count_message_tokens(current_message.content)
+            exclude_id = current_message.id
+
+        selected: List[ContextEntry] = []
+        for entry in reversed(context.entries):
+            if exclude_id is not None and entry.id >= exclude_id:
+                continue
+            if entry.tokens > budget:
+                break
+            budget -= entry.tokens
+            selected.append(entry)
+
+        messages = [
+            {"role": entry.role, "content": entry.content}
+            for entry in reversed(selected)
+        ]
+        if context.summary:
+            messages.insert(0, {"role": "system", "content": f"此前对话的摘要：\n{context.summary}"})
+        return messages
+
+    def pending_tokens(self, session_id: int) -> int:
+        """会话窗口中尚未被摘要覆盖的消息token数
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            int: token数，会话未缓存时返回0
+        """
+        context = self._sessions.get(session_id)
+        return context.tokens if context is not None else 0
+
+    def set_summary(self, session_id: int, content: str, until_id: int) -> None:
+        """更新缓存中的会话摘要（摘要保存后调用）
+
+        Args:
+            session_id: 会话ID
+            content: 摘要内容
+            until_id: 摘要覆盖到的最后一条消息ID
+        """
+        context = self._sessions.get(session_id)
+        if context is not None:
+            context.set_summary(content, until_id)
+
+    async def _refresh(self, crud: AsyncChatCRUD, session_id: int) -> SessionContext:
+        """读取会话的新消息并更新缓存的窗口"""
+        context = self._sessions.get(session_id)
+        if context is None:
+            context = SessionContext()
+            session = await crud.get_session(session_id)
+            summary = ((session.session_data or {}) if session else {}).get(SUMMARY_KEY) or {}
+            context.set_summary(summary.get("content"), summary.get("until_id"))
+            messages = await crud.get_recent_session_messages(
+                session_id, self.max_messages, after_id=context.summary_until_id
+            )
+        else:
+            messages = await crud.get_recent_session_messages(
+                session_id, self.max_messages, after_id=context.last_id
+            )
+            if len(messages) >= self.max_messages:
+                # 新消息已填满窗口，缓存中的旧消息不再需要
+                summary, until_id = context.summary, context.summary_until_id
+                context = SessionContext()
+                context.set_summary(summary, until_id)
+
+        for message in reversed(messages):
+            self._append(context, message)
+        self._trim(context)
+
+        self._sessions[session_id] = context
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return context
+
+    @staticmethod
+    def _append(context: SessionContext, message: Message) -> None:
+        # 并发请求可能读到相同的消息
+        if context.last_id is not None and message.id <= context.last_id:
+            return
+        if context.summary_until_id is not None and message.id <= context.summary_until_id:
+            return
+        entry = ContextEntry(message)
+        context.entries.append(entry)
+        context.tokens += entry.tokens
+        context.last_id = entry.id
+
+    def _trim(self, context: SessionContext) -> None:
+        while context.entries and (
+            len(context.entries) > self.max_messages
+            or context.tokens + context.summary_tokens > self.max_tokens
+        ):
+            context.tokens -= context.entries.popleft().tokens
+
+    def invalidate(self, session_id: int) -> None:
+        """清除会话的上下文缓存（会话删除后调用）
+
+        Args:
+            session_id: 会话ID
+        """
+        self._sessions.pop(session_id, None)
+
+
+_context_builder: Optional[ContextBuilder] = None
+
+
+def get_context_builder() -> ContextBuilder:
+    """获取应用级共享的上下文构建器
+
+    Returns:
+        ContextBuilder: 上下文构建器
+    """
+    global _context_builder
+    if _context_builder is None:
+        _context_builder = ContextBuilder(
+            max_tokens=settings.CHAT_CONTEXT_MAX_TOKENS,
+            max_messages=settings.CHAT_CONTEXT_MAX_MESSAGES,
+            max_sessions=settings.CHAT_CONTEXT_CACHE_SESSIONS,
+        )
+    return _context_builder
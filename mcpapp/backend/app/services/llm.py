@@ -1,6 +1,8 @@
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, AsyncIterator
 import json
+import time
 import aiohttp
+from langchain.callbacks.manager import AsyncCallbackManagerForLLMRun
 from langchain.chat_models.base import BaseChatModel
 from langchain.schema import (
     AIMessage,
@@ -10,9 +12,13 @@ from langchain.schema import (
     LLMResult,
     Generation
 )
+from langchain.schema.messages import AIMessageChunk
+from langchain.schema.output import ChatGenerationChunk
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.http_client import get_http_client
+from app.services.response_cache import get_response_cache
 from app.db.models import Message, MessageType
 
 class DeepSeekMessage(BaseModel):
@@ -20,6 +26,39 @@ class DeepSeekMessage(BaseModel):
     role: str = Field(..., description="消息角色：system/user/assistant")
     content: str = Field(..., description="消息内容")
 
+async def iter_stream_deltas(
+    response: aiohttp.ClientResponse,
+    state: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[str]:
+    """解析DeepSeek流式(stream=true)响应，逐个产出增量文本
+
+    Args:
+        response: 流式补全接口的HTTP响应
+        state: 可选的状态字典，收到 [DONE] 结束标记时置 state["done"] 为True，
+            上游提前断开时保持False
+
+    Yields:
+        str: 每个数据块中的增量内容
+    """
+    if state is not None:
+        state["done"] = False
+    async for raw_line in response.content:
+        line = raw_line.decode("utf-8").strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            if state is not None:
+                state["done"] = True
+            break
+        chunk = json.loads(data)
+        choices = chunk.get("choices") or []
+        if not choices:
+            continue
+        delta = choices[0].get("delta", {}).get("content")
+        if delta:
+            yield delta
+
 class DeepSeekChatModel(BaseChatModel):
     """DeepSeek聊天模型实现"""
     
@@ -155,20 +194,61 @@ class DeepSeekChatModel(BaseChatModel):
             **kwargs
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.api_base}/chat/completions",
-                headers=headers,
-                json=data
-            ) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    raise ValueError(
-                        f"Error calling DeepSeek API: {response.status} {text}"
-                    )
-                    
-                result = await response.json()
-                return result["choices"][0]["message"]["content"]
+        session = get_http_client()
+        async with session.post(
+            f"{self.api_base}/chat/completions",
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status != 200:
+                text = await response.text()
+                raise ValueError(
+                    f"Error calling DeepSeek API: {response.status} {text}"
+                )
+                
+            result = await response.json()
+            return result["choices"][0]["message"]["content"]
+    
+    async def _astream_chat_completion(
+        self,
+        messages: List[BaseMessage],
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """以流式方式异步调用DeepSeek API
+        
+        Args:
+            messages: 消息列表
+            **kwargs: 其他参数
+            
+        Yields:
+            str: 模型回复的增量内容
+        """
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": self.model_name,
+            "messages": self._convert_messages_to_dict(messages),
+            **kwargs,
+            "stream": True
+        }
+        
+        session = get_http_client()
+        async with session.post(
+            f"{self.api_base}/chat/completions",
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status != 200:
+                text = await response.text()
+                raise ValueError(
+                    f"Error calling DeepSeek API: {response.status} {text}"
+                )
+            
+            async for delta in iter_stream_deltas(response):
+                yield delta
     
     def _generate(
         self,
@@ -208,6 +288,32 @@ class DeepSeekChatModel(BaseChatModel):
         response = await self._acreate_chat_completion(messages, stop=stop, **kwargs)
         return LLMResult(generations=[[Generation(text=response)]])
 
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """异步流式生成回复
+        
+        Args:
+            messages: 消息列表
+            stop: 停止词列表
+            run_manager: 回调管理器
+            **kwargs: 其他参数
+            
+        Yields:
+            ChatGenerationChunk: 增量生成结果
+        """
+        if stop:
+            kwargs["stop"] = stop
+        async for delta in self._astream_chat_completion(messages, **kwargs):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=delta))
+            if run_manager:
+                await run_manager.on_llm_new_token(delta, chunk=chunk)
+            yield chunk
+
     @property
     def _llm_type(self) -> str:
         """返回模型类型"""
@@ -220,24 +326,23 @@ class LLMService:
         self.api_base = settings.DEEPSEEK_API_BASE
         self.api_key = settings.DEEPSEEK_API_KEY
         self.model_name = settings.DEEPSEEK_MODEL_NAME
+        self.cache = get_response_cache()
     
-    async def get_llm_response(
+    def _build_payload(
         self,
         message: str,
         context: Optional[List[Dict[str, Any]]] = None
-    ) -> str:
-        """
-        获取大模型回复
+    ) -> Dict[str, Any]:
+        """构建补全接口请求数据
         
         Args:
             message: 用户输入的消息
             context: 历史上下文消息列表
             
         Returns:
-            str: 大模型的回复内容
+            Dict[str, Any]: 请求数据
         """
-        # 构建请求数据
-        payload = {
+        return {
             "model": self.model_name,
             "messages": [
                 {"role": "system", "content": "你是一个智能助手，请用简洁专业的方式回答问题。"},
@@ -248,30 +353,151 @@ class LLMService:
             "temperature": 0.7,
             "max_tokens": 2000
         }
-        
-        headers = {
+
+    def _build_headers(self) -> Dict[str, str]:
+        """构建请求头"""
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+
+    async def _request_completion(self, payload: Dict[str, Any]) -> str:
+        """调用补全接口（复用应用级连接池）
+        
+        Args:
+            payload: 请求数据
+            
+        Returns:
+            str: 大模型的回复内容
+            
+        Raises:
+            Exception: API调用失败时抛出
+        """
+        session = get_http_client()
+        async with session.post(
+            f"{self.api_base}/chat/completions",
+            json=payload,
+            headers=self._build_headers()
+        ) as response:
+            if response.status != 200:
+                error_msg = await response.text()
+                raise Exception(f"DeepSeek API error: {error_msg}")
+            
+            data = await response.json()
+            return data["choices"][0]["message"]["content"]
+
+    async def get_llm_response(
+        self,
+        message: str,
+        context: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """
+        获取大模型回复
+        
+        相同请求（归一化后）优先使用缓存的回复，只有成功的回复会被缓存。
+        
+        Args:
+            message: 用户输入的消息
+            context: 历史上下文消息列表
+            
+        Returns:
+            str: 大模型的回复内容
+        """
+        payload = self._build_payload(message, context)
+        if self.cache is not None:
+            cached = await self.cache.get(payload)
+            if cached is not None:
+                return cached
         
         try:
-            # 发送请求到DeepSeek API
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.api_base}/chat/completions",
-                    json=payload,
-                    headers=headers
-                ) as response:
-                    if response.status != 200:
-                        error_msg = await response.text()
-                        raise Exception(f"DeepSeek API error: {error_msg}")
-                    
-                    data = await response.json()
-                    return data["choices"][0]["message"]["content"]
+            start = time.perf_counter()
+            content = await self._request_completion(payload)
         except Exception as e:
             # 如果API调用失败，返回一个友好的错误消息
             error_message = f"抱歉，我现在无法正常回复。错误信息：{str(e)}"
             return error_message
+        
+        if self.cache is not None:
+            await self.cache.set(payload, content, time.perf_counter() - start)
+        return content
+
+    async def get_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> str:
+        """
+        以给定的完整消息列表调用补全接口
+        
+        与 get_llm_response 不同，调用失败时直接抛出异常且不使用缓存，供摘要等内部任务使用。
+        
+        Args:
+            messages: 消息列表（含系统提示）
+            temperature: 采样温度
+            max_tokens: 最大生成token数
+            
+        Returns:
+            str: 大模型的回复内容
+            
+        Raises:
+            Exception: API调用失败时抛出
+        """
+        return await self._request_completion({
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        })
+
+    async def stream_llm_response(
+        self,
+        message: str,
+        context: Optional[List[Dict[str, Any]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        以流式方式获取大模型回复
+        
+        命中缓存时一次性产出缓存的回复；收到 [DONE] 结束标记的完整回复才会写入缓存，
+        上游中途断开的回复不缓存。
+        
+        Args:
+            message: 用户输入的消息
+            context: 历史上下文消息列表
+            
+        Yields:
+            str: 大模型回复的增量内容
+            
+        Raises:
+            Exception: 调用失败或流式响应中途出错（已产出的内容由调用方处理）
+        """
+        payload = self._build_payload(message, context)
+        if self.cache is not None:
+            cached = await self.cache.get(payload)
+            if cached is not None:
+                yield cached
+                return
+        
+        headers = self._build_headers()
+        parts: List[str] = []
+        state: Dict[str, Any] = {}
+        start = time.perf_counter()
+        session = get_http_client()
+        async with session.post(
+            f"{self.api_base}/chat/completions",
+            json={**payload, "stream": True},
+            headers=headers
+        ) as response:
+            if response.status != 200:
+                error_msg = await response.text()
+                raise Exception(f"DeepSeek API error: {error_msg}")
+            
+            async for delta in iter_stream_deltas(response, state):
+                parts.append(delta)
+                yield delta
+        
+        if self.cache is not None and state.get("done"):
+            await self.cache.set(payload, "".join(parts), time.perf_counter() - start)
 
     def _convert_message_to_langchain(self, message: Message) -> BaseMessage:
         """将自定义消息转换为LangChain消息格式
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+import unicodedata
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.redis_client import create_redis_client
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_REDIS_KEY_PREFIX = "llm:response:"
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+# 语义匹配时忽略标点、符号和空白
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    """统一全角/半角字符并合并空白，作为精确匹配的归一化形式"""
+    return _WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def embed_text(text: str) -> Dict[str, float]:
+    """计算文本的本地向量表示
+
+    使用字符二元组和三元组的词频向量（L2归一化的稀疏向量），不依赖外部模型，
+    对中文问句的措辞微调、语气词和标点差异不敏感。
+
+    Args:
+        text: 文本内容
+
+    Returns:
+        Dict[str, float]: n-gram到权重的稀疏向量
+    """
+    chars = _NON_WORD_PATTERN.sub("", normalize_text(text).lower())
+    features: Dict[str, float] = defaultdict(float)
+    if len(chars) < 2:
+        if chars:
+            features[chars] = 1.0
+        return dict(features)
+    for size in (2, 3):
+        for i in range(len(chars) - size + 1):
+            features[chars[i:i + size]] += 1.0
+    norm = math.sqrt(sum(weight * weight for weight in features.values()))
+    return {feature: weight / norm for feature, weight in features.items()}
+
+
+class SemanticIndex:
+    """近似问题的最近邻索引
+
+    按 (分区, n-gram) 建立倒排表，查询时只在共享n-gram的条目上累加点积，
+    得到与所有候选条目的余弦相似度。分区为除最后一条用户消息外的请求内容，
+    只有系统提示、上下文、模型参数都相同的请求之间才会匹配。
+    """
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.expired = 0
+        self.evicted = 0
+        self._next_id = 0
+        # entry_id -> (分区, 向量, 回复, 过期时间)
+        self._entries: "OrderedDict[int, Tuple[str, Dict[str, float], str, float]]" = OrderedDict()
+        self._postings: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+
+    def add(self, partition: str, question: str, response: str) -> None:
+        vector = embed_text(question)
+        if not vector or self.maxsize <= 0:
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (partition, vector, response, time.monotonic() + self.ttl)
+        for feature in vector:
+            self._postings[(partition, feature)].add(entry_id)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.evicted += 1
+
+    def search(self, partition: str, question: str) -> Optional[Tuple[str, float]]:
+        """查找相似度不低于阈值的最近邻
+
+        Returns:
+            Optional[Tuple[str, float]]: (回复, 相似度)，未命中返回None
+        """
+        vector = embed_text(question)
+        scores: Dict[int, float] = defaultdict(float)
+        for feature, weight in vector.items():
+            for entry_id in self._postings.get((partition, feature), ()):
+                scores[entry_id] += weight * self._entries[entry_id][1][feature]
+
+        now = time.monotonic()
+        for entry_id, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            if score < self.threshold:
+                break
+            _, _, response, expires_at = self._entries[entry_id]
+            if expires_at <= now:
+                self._remove(entry_id)
+                self.expired += 1
+                continue
+            self._entries.move_to_end(entry_id)
+            return response, score
+        return None
+
+    def _remove(self, entry_id: int) -> None:
+        partition, vector, _, _ = self._entries.pop(entry_id)
+        for feature in vector:
+            key = (partition, feature)
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.discard(entry_id)
+                if not postings:
+                    del self._postings[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._postings.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """LLM回复缓存
+
+    依次查找三级缓存：
+    - 内存LRU：按归一化后的 (系统提示, 上下文, 消息, 模型, 温度, 最大token数) 哈希精确匹配
+    - Redis（LLM_CACHE_USE_REDIS 开启时）：同一键的持久化副本，多个worker共享
+    - 语义索引（LLM_SEMANTIC_CACHE_ENABLED 开启时）：相同上下文下的近似问题
+
+    所有条目在 LLM_CACHE_TTL 秒后过期，命中率、各级命中数、过期和淘汰数量以及
+    节省的调用耗时可通过 stats() 查看。
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        semantic_index: Optional[SemanticIndex] = None
+    ):
+        self.ttl = ttl
+        self._memory = TTLCache(maxsize)
+        self._semantic = semantic_index
+        self._redis = None
+        self.hits: Dict[str, int] = {"memory": 0, "persistent": 0, "semantic": 0}
+        self.misses = 0
+        self.stores = 0
+        self.latency_saved = 0.0
+        # 未命中时上游调用耗时的指数移动平均，用于估算命中节省的时间
+        self._avg_latency = 0.0
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> Tuple[str, str, str]:
+        """计算请求的缓存键
+
+        Args:
+            payload: 补全接口请求数据
+
+        Returns:
+            Tuple[str, str, str]: (精确匹配键, 语义匹配分区, 最后一条用户消息)
+        """
+        messages = [
+            [message["role"], normalize_text(message["content"])]
+            for message in payload["messages"]
+        ]
+        params = {
+            "model": payload.get("model"),
+            "temperature": payload.get("temperature"),
+            "max_tokens": payload.get("max_tokens"),
+        }
+
+        def digest(items) -> str:
+            data = json.dumps({**params, "messages": items}, ensure_ascii=False, sort_keys=True)
+            return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+        question = messages[-1][1] if messages else ""
+        return digest(messages), digest(messages[:-1]), question
+
+    async def get(self, payload: Dict[str, Any]) -> Optional[str]:
+        """查找缓存的回复
+
+        Args:
+            payload: 补全接口请求数据
+
+        Returns:
+            Optional[str]: 缓存的回复，未命中返回None
+        """
+        start = time.perf_counter()
+        key, partition, question = self.make_key(payload)
+
+        tier = "memory"
+        response = self._memory.get(key)
+        if response is None and self._redis is not None:
+            tier = "persistent"
+            try:
+                response = await self._redis.get(f"{_REDIS_KEY_PREFIX}{key}")
+            except Exception as e:
+                logger.warning(f"读取Redis回复缓存失败: {e}")
+            if response is not None:
+                self._memory.set(key, response, self.ttl)
+        if response is None and self._semantic is not None:
+            tier = "semantic"
+            match = self._semantic.search(partition, question)
+            if match is not None:
+                response, score = match
+                logger.debug(f"语义缓存命中: similarity={score:.3f}")
+
+        if response is None:
+            self.misses += 1
+            return None
+        self.hits[tier] += 1
+        self.latency_saved += max(0.0, self._avg_latency - (time.perf_counter() - start))
+        return response
+
+    async def set(self, payload: Dict[str, Any], response: str, latency: float) -> None:
+        """缓存一次成功的回复
+
+        Args:
+            payload: 补全接口请求数据
+            response: 回复内容
+            latency: 本次上游调用耗时(秒)
+        """
+        self._avg_latency = latency if not self._avg_latency else 0.9 * self._avg_latency + 0.1 * latency
+        if not response:
+            return
+        key, partition, question = self.make_key(payload)
+        self._memory.set(key, response, self.ttl)
+        if self._semantic is not None:
+            self._semantic.add(partition, question, response)
+        if self._redis is not None:
+            try:
+                await self._redis.set(f"{_REDIS_KEY_PREFIX}{key}", response, ex=max(1, int(self.ttl)))
+            except Exception as e:
+                logger.warning(f"写入Redis回复缓存失败: {e}")
+        self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        hits = sum(self.hits.values())
+        total = hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "semantic_entries": len(self._semantic) if self._semantic is not None else 0,
+            "persistent": self._redis is not None,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "stores": self.stores,
+            "expired": self._memory.expired + (self._semantic.expired if self._semantic is not None else 0),
+            "evicted": self._memory.evicted + (self._semantic.evicted if self._semantic is not None else 0),
+            "latency_saved_seconds": round(self.latency_saved, 3),
+            "avg_upstream_latency_seconds": round(self._avg_latency, 3),
+        }
+
+    def clear(self) -> None:
+        """清空本进程的缓存"""
+        self._memory.clear()
+        if self._semantic is not None:
+            self._semantic.clear()
+
+    def connect_redis(self, client: Any) -> None:
+        """使用Redis作为持久化缓存层
+
+        Args:
+            client: redis.asyncio.Redis 客户端
+        """
+        self._redis = client
+
+    async def close(self) -> None:
+        """关闭Redis连接"""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取应用级共享的LLM回复缓存
+
+    Returns:
+        Optional[ResponseCache]: 回复缓存，LLM_CACHE_ENABLED 关闭时返回None
+    """
+    global _response_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        semantic_index = None
+        if settings.LLM_SEMANTIC_CACHE_ENABLED:
+            semantic_index = SemanticIndex(
+                maxsize=settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl=settings.LLM_CACHE_TTL,
+                threshold=settings.LLM_SEMANTIC_CACHE_THRESHOLD,
+            )
+        _response_cache = ResponseCache(
+            maxsize=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl=settings.LLM_CACHE_TTL,
+            semantic_index=semantic_index,
+        )
+    return _response_cache
+
+
+async def init_response_cache() -> Optional[ResponseCache]:
+    """初始化LLM回复缓存（应用启动时调用）
+
+    LLM_CACHE_USE_REDIS 开启时使用 Settings 中配置的Redis作为持久化缓存层，
+    未安装 redis 包或连接失败时只使用进程内缓存。
+
+    Returns:
+        Optional[ResponseCache]: 回复缓存
+    """
+    cache = get_response_cache()
+    if cache is None or not settings.LLM_CACHE_USE_REDIS or cache._redis is not None:
+        return cache
+    client = await create_redis_client()
+    if client is not None:
+        cache.connect_redis(client)
+    return cache
+
+
+async def close_response_cache() -> None:
+    """关闭LLM回复缓存（应用关闭时调用）"""
+    global _response_cache
+    if _response_cache is not None:
+        await _response_cache.close()
+    _response_cache = None
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.db.crud.chat import AsyncChatCRUD
+from app.db.models.chat import Message, MessageType
+from app.db.session import AsyncSessionLocal
+from app.services.context import ContextBuilder, SUMMARY_KEY, get_context_builder
+from app.services.llm import LLMService
+from app.utils.tokenizer import count_message_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = """你负责压缩一段对话的历史记录。
+请在已有摘要的基础上合并新的对话内容，输出一份更新后的摘要：
+1. 保留用户的目标、偏好、关键事实、已得出的结论和尚未解决的问题
+2. 省略寒暄和重复内容，使用第三人称简洁陈述
+3. 不超过{max_chars}字，只输出摘要本身
+"""
+
+_ROLE_NAMES = {
+    MessageType.USER.value: "用户",
+    MessageType.ASSISTANT.value: "助手",
+    MessageType.SYSTEM.value: "系统",
+}
+
+
+class SessionSummarizer:
+    """会话滚动摘要
+
+    会话窗口中尚未被摘要覆盖的消息超过 CHAT_SUMMARY_TRIGGER_TOKENS 时，在后台
+    把较早的消息连同已有摘要一起压缩为新的摘要，保存在 Session.session_data
+    中，最近约 CHAT_SUMMARY_KEEP_TOKENS 的消息保持原文。之后的上下文只包含
+    摘要和摘要之后的消息，长会话每轮发送的token数基本保持不变。
+    """
+
+    def __init__(self, context_builder: ContextBuilder, llm: Optional[LLMService] = None):
+        self.context_builder = context_builder
+        self.llm = llm or LLMService()
+        self._running: Dict[int, asyncio.Task] = {}
+        self._pending: Set[int] = set()
+
+    def maybe_schedule(self, session_id: int) -> None:
+        """会话待摘要的内容超过阈值时在后台刷新摘要
+
+        Args:
+            session_id: 会话ID
+        """
+        if not settings.CHAT_SUMMARY_ENABLED:
+            return
+        if self.context_builder.pending_tokens(session_id) < settings.CHAT_SUMMARY_TRIGGER_TOKENS:
+            return
+        if session_id in self._running:
+            # 正在摘要，完成后再检查一次
+            self._pending.add(session_id)
+            return
+        task = asyncio.create_task(self._run(session_id))
+        self._running[session_id] = task
+
+    async def _run(self, session_id: int) -> None:
+        try:
+            while True:
+                self._pending.discard(session_id)
+                await self.refresh(session_id)
+                if session_id not in self._pending:
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"刷新会话摘要失败: session_id={session_id}, {str(e)}", exc_info=True)
+        finally:
+            self._running.pop(session_id, None)
+
+    async def refresh(self, session_id: int) -> bool:
+        """把最近消息之前、尚未摘要的消息合并进会话摘要
+
+        使用独立的数据库会话，可在请求结束后执行。
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            bool: 是否更新了摘要
+        """
+        async with AsyncSessionLocal() as db:
+            crud = AsyncChatCRUD(db)
+            session = await crud.get_session(session_id)
+            if not session:
+                return False
+            summary = (session.session_data or {}).get(SUMMARY_KEY) or {}
+            content = summary.get("content") or ""
+            until_id = summary.get("until_id")
+
+            # 从最新的消息往前保留 CHAT_SUMMARY_KEEP_TOKENS，其余的进行摘要
+            recent = await crud.get_recent_session_messages(
+                session_id, settings.CHAT_CONTEXT_MAX_MESSAGES, after_id=until_id
+            )
+            keep_tokens = 0
+            boundary_id = None
+            for message in recent:
+                keep_tokens += count_message_tokens(message.content)
+                if keep_tokens > settings.CHAT_SUMMARY_KEEP_TOKENS and boundary_id is not None:
+                    break
+                boundary_id = message.id
+            if boundary_id is None:
+                return False
+
+            updated = False
+            while True:
+                older = await crud.get_session_messages_between(
+                    session_id, until_id, boundary_id, settings.CHAT_SUMMARY_BATCH_MESSAGES
+                )
+                if not older:
+                    break
+                content = await self._summarize(content, older)
+                until_id = older[-1].id
+                updated = True
+                if len(older) < settings.CHAT_SUMMARY_BATCH_MESSAGES:
+                    break
+
+            if not updated:
+                return False
+            await crud.update_session_data(session_id, SUMMARY_KEY, {
+                "content": content,
+                "until_id": until_id,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            })
+
+        self.context_builder.set_summary(session_id, content, until_id)
+        logger.info(f"会话摘要已更新: session_id={session_id}, until_id={until_id}")
+        return True
+
+    async def _summarize(self, summary: str, messages: List[Message]) -> str:
+        """调用LLM把一批消息合并进已有摘要"""
+        transcript = "\n".join(
+            f"{_ROLE_NAMES.get(message.message_type, message.message_type)}: {message.content}"
+            for message in messages
+        )
+        prompt = f"已有摘要：\n{summary or '（无）'}\n\n新的对话：\n{transcript}"
+        return (await self.llm.get_completion(
+            [
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT.format(
+                    max_chars=settings.CHAT_SUMMARY_MAX_CHARS
+                )},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.3,
+            max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS
+        )).strip()
+
+    async def close(self) -> None:
+        """取消进行中的摘要任务（应用关闭时调用）"""
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._running.clear()
+        self._pending.clear()
+
+
+_summarizer: Optional[SessionSummarizer] = None
+
+
+def get_summarizer() -> SessionSummarizer:
+    """获取应用级共享的会话摘要器
+
+    Returns:
+        SessionSummarizer: 会话摘要器
+    """
+    global _summarizer
+    if _summarizer is None:
+        _summarizer = SessionSummarizer(get_context_builder())
+    return _summarizer
+
+
+async def close_summarizer() -> None:
+    """关闭会话摘要器（应用关闭时调用）"""
+    global _summarizer
+    if _summarizer is not None:
+        await _summarizer.close()
+    _summarizer = None
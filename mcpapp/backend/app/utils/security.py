@@ -1,12 +1,30 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
 from passlib.context import CryptContext
 from jose import jwt
 
 from app.core.config import settings
 
-# 密码加密上下文
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 密码加密上下文，min/max rounds 与默认值一致，使不同cost的旧哈希在登录时被重新计算
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt计算期间会释放GIL，使用专用线程池即可并行计算且不阻塞事件循环
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+_pending_hashes = 0
+
+
+class PasswordHasherBusy(Exception):
+    """等待计算的密码哈希任务超过上限"""
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码
@@ -31,6 +49,79 @@ def get_password_hash(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="password-hash"
+                )
+    return _hash_executor
+
+
+async def _run_hash_task(func, *args):
+    """在密码哈希线程池中执行任务
+
+    Raises:
+        PasswordHasherBusy: 排队和执行中的任务已达 PASSWORD_HASH_MAX_PENDING
+    """
+    global _pending_hashes
+    if _pending_hashes >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusy("密码校验请求过多，请稍后重试")
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _pending_hashes -= 1
+
+
+async def verify_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """在线程池中验证密码，并在哈希参数过期时返回新的哈希值
+    
+    Args:
+        plain_password: 明文密码
+        hashed_password: 加密后的密码
+
+    Returns:
+        Tuple[bool, Optional[str]]: (密码是否匹配, 需要更新时的新哈希值)
+
+    Raises:
+        PasswordHasherBusy: 线程池繁忙时抛出
+    """
+    return await _run_hash_task(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """在线程池中计算密码哈希值
+    
+    Args:
+        password: 明文密码
+
+    Returns:
+        str: 加密后的密码
+
+    Raises:
+        PasswordHasherBusy: 线程池繁忙时抛出
+    """
+    return await _run_hash_task(pwd_context.hash, password)
+
+
+def shutdown_password_hasher() -> None:
+    """关闭密码哈希线程池（应用关闭时调用）"""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False, cancel_futures=True)
+            _hash_executor = None
+
 def create_access_token(
     subject: Union[str, Any],
     expires_delta: timedelta = None
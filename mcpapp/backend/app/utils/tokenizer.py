@@ -0,0 +1,63 @@
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+# 每条消息在对话格式中的固定开销（角色、分隔符）
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_CJK_PATTERN = re.compile(r"[　-〿㐀-䶿一-鿿豈-﫿＀-￯]")
+
+_encoding: Optional[Any] = None
+_encoding_loaded = False
+
+
+def _get_encoding() -> Optional[Any]:
+    """加载tiktoken编码器（未安装时返回None，只加载一次）"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+        _encoding_loaded = True
+    return _encoding
+
+
+def _estimate_tokens(text: str) -> int:
+    """估算token数：中日韩字符按1个token计，其余按约4个字符1个token计"""
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """计算文本的token数
+
+    安装了tiktoken时使用cl100k_base编码精确计算，否则按字符估算。
+    结果按文本缓存，同一段内容只计算一次。
+
+    Args:
+        text: 文本内容
+
+    Returns:
+        int: token数
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return _estimate_tokens(text)
+
+
+def count_message_tokens(content: str) -> int:
+    """计算一条对话消息占用的token数（含消息格式开销）
+
+    Args:
+        content: 消息内容
+
+    Returns:
+        int: token数
+    """
+    return count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
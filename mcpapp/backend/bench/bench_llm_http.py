@@ -0,0 +1,140 @@
+"""LLM HTTP 连接池基准：共享连接池 vs 每次请求新建 aiohttp.ClientSession
+
+用法（在 backend 目录下）:
+    python bench/bench_llm_http.py --requests 500 --concurrency 10
+
+在本地启动一个 HTTPS 模拟补全服务（/chat/completions，自签名证书由 openssl 生成），
+分别用以下两种方式发送相同的补全请求，统计延迟、吞吐量和服务端接受的TCP连接数：
+    per-request  每次请求新建 ClientSession（原先的做法，每次都要TCP+TLS握手）
+    shared       app.core.http_client 的应用级连接池（keep-alive 复用连接）
+--handshake-delay 可模拟到API的网络往返（每个新连接额外等待），本机回环下握手几乎没有网络开销。
+"""
+import argparse
+import asyncio
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.http_client import close_http_client, init_http_client  # noqa: E402
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "pong"}, "finish_reason": "stop"}],
+}
+PAYLOAD = {"model": "deepseek-chat", "messages": [{"role": "user", "content": "ping"}]}
+
+
+def make_certificate(directory: Path):
+    """生成 localhost 的自签名证书"""
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+         "-keyout", str(key), "-out", str(cert)],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+async def start_mock_server(cert, key, port, handshake_delay):
+    """启动模拟补全服务，返回 (runner, 已接受的连接计数)"""
+    connections = {"count": 0}
+
+    async def completions(request):
+        await request.json()
+        return web.json_response(COMPLETION)
+
+    @web.middleware
+    async def count_connections(request, handler):
+        transport = request.transport
+        if transport is not None and not getattr(transport, "_bench_seen", False):
+            transport._bench_seen = True
+            connections["count"] += 1
+            if handshake_delay:
+                # 模拟新连接的网络往返（TCP + TLS 约 2-3 个 RTT）
+                await asyncio.sleep(handshake_delay)
+        return await handler(request)
+
+    app = web.Application(middlewares=[count_connections])
+    app.router.add_post("/chat/completions", completions)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    await web.TCPSite(runner, "127.0.0.1", port, ssl_context=context).start()
+    return runner, connections
+
+
+async def run(count, concurrency, send):
+    latencies = []
+    queue = iter(range(count))
+
+    async def worker():
+        for _ in queue:
+            begin = time.perf_counter()
+            await send()
+            latencies.append(time.perf_counter() - begin)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - begin
+
+
+def report(name, latencies, elapsed, connections):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{name:<12} {len(latencies) / elapsed:8.1f} req/s  p50={statistics.median(ordered) * 1000:6.1f} ms  "
+        f"p99={p99 * 1000:6.1f} ms  mean={statistics.fmean(ordered) * 1000:6.1f} ms  connections={connections}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--handshake-delay", type=float, default=0.0, help="每个新连接额外等待的秒数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(Path(directory))
+        client_context = ssl.create_default_context(cafile=str(cert))
+        url = f"https://localhost:{args.port}/chat/completions"
+        runner, connections = await start_mock_server(cert, key, args.port, args.handshake_delay)
+        try:
+            async def per_request():
+                # 原先的做法：每条消息新建会话，连接随会话关闭
+                async with aiohttp.ClientSession() as session:
+                    async with session.post(url, json=PAYLOAD, ssl=client_context) as response:
+                        await response.json()
+
+            shared_session = await init_http_client()
+
+            async def shared():
+                async with shared_session.post(url, json=PAYLOAD, ssl=client_context) as response:
+                    await response.json()
+
+            print(f"{args.requests} requests, concurrency {args.concurrency}, "
+                  f"handshake delay {args.handshake_delay * 1000:.0f} ms")
+            for name, send in (("per-request", per_request), ("shared", shared)):
+                connections["count"] = 0
+                latencies, elapsed = await run(args.requests, args.concurrency, send)
+                report(name, latencies, elapsed, connections["count"])
+        finally:
+            await close_http_client()
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""登录风暴期间的聊天延迟基准：在事件循环上直接校验 bcrypt 与使用密码哈希线程池的对比
+
+用法（在 backend 目录下）:
+    python bench/bench_login_storm.py --logins 64 --chats 20 --rounds 12
+
+--chats 个并发的模拟聊天流每 20ms 输出一个分片，记录每个分片比预期晚到的时间；
+同时发起 --logins 次登录的密码校验：
+    inline  在 async def 中直接调用 pwd_context.verify（改造前的做法）
+    pool    app.utils.security.verify_password_async（专用线程池，带排队上限）
+输出聊天分片延迟的 p50/p99/最大值、登录耗时和被拒绝（503）的登录数。
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+CHUNK_INTERVAL = 0.02
+
+
+async def chat_stream(delays, stop):
+    """模拟流式回复：按固定间隔输出分片，记录每个分片的额外延迟"""
+    while not stop.is_set():
+        expected = time.perf_counter() + CHUNK_INTERVAL
+        await asyncio.sleep(CHUNK_INTERVAL)
+        delays.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run(chats, logins, verify):
+    delays, results = [], []
+    stop = asyncio.Event()
+    streams = [asyncio.create_task(chat_stream(delays, stop)) for _ in range(chats)]
+    # 先让聊天流稳定运行
+    await asyncio.sleep(0.2)
+
+    async def login():
+        try:
+            results.append(await verify())
+        except Exception as e:
+            results.append(type(e).__name__)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - begin
+    stop.set()
+    await asyncio.gather(*streams)
+    return delays, results, elapsed
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name, delays, results, elapsed):
+    ok = sum(1 for result in results if result is True)
+    rejected = sum(1 for result in results if result == "PasswordHasherBusy")
+    print(
+        f"{name:<7} chat delay p50={statistics.median(delays) * 1000:7.1f} ms  "
+        f"p99={percentile(delays, 0.99) * 1000:7.1f} ms  max={max(delays) * 1000:7.1f} ms  |  "
+        f"logins ok={ok} rejected={rejected} in {elapsed:.2f} s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost（BCRYPT_ROUNDS）")
+    args = parser.parse_args()
+
+    # 配置在导入时读取
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    from app.utils.security import pwd_context, shutdown_password_hasher, verify_password_async
+
+    hashed = pwd_context.hash("correct horse")
+
+    async def inline():
+        return pwd_context.verify("correct horse", hashed)
+
+    async def pool():
+        valid, _ = await verify_password_async("correct horse", hashed)
+        return valid
+
+    print(f"{args.logins} logins, {args.chats} chat streams, bcrypt cost {args.rounds}")
+    try:
+        for name, verify in (("inline", inline), ("pool", pool)):
+            report(name, *await run(args.chats, args.logins, verify))
+    finally:
+        shutdown_password_hasher()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+"""数据库层负载测试：同步 ChatCRUD（阻塞事件循环）与 AsyncChatCRUD 的并发对比
+
+用法（在 backend 目录下，需要 aiosqlite）:
+    python bench/load_db.py --clients 50 --requests 10 --stall-ms 20
+
+以临时 SQLite 文件代替 MySQL，每条SQL在驱动执行线程中额外等待 --stall-ms 毫秒，模拟
+网络往返和慢查询。--clients 个并发请求各自调用 --requests 次会话列表查询：
+    sync   在 async def 中直接调用同步 ChatCRUD（异步改造前接口的做法）
+    async  AsyncChatCRUD + AsyncSession（aiosqlite，查询不占用事件循环）
+同时运行一个每 10ms 唤醒一次的心跳任务，代表同一 worker 上的其他请求（如流式回复），
+其唤醒延迟即事件循环被阻塞的时间。
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.base_class import Base  # noqa: E402
+from app.db.crud.chat import AsyncChatCRUD, ChatCRUD  # noqa: E402
+from app.db.models import Message, Session as ChatSession, User  # noqa: E402
+
+TABLES = [User.__table__, ChatSession.__table__, Message.__table__]
+
+
+def seed(url, users, sessions, messages):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=TABLES)
+    base = datetime(2024, 1, 1)
+    with sessionmaker(bind=engine)() as db:
+        for user_id in range(1, users + 1):
+            db.add(User(id=user_id, username=f"u{user_id}", email=f"u{user_id}@example.com", hashed_password="x"))
+            for i in range(sessions):
+                session = ChatSession(user_id=user_id, title=f"s{i}", updated_at=base + timedelta(minutes=i))
+                session.messages = [
+                    Message(message_type="user", content=f"m{j}", created_at=base + timedelta(seconds=j))
+                    for j in range(messages)
+                ]
+                db.add(session)
+        db.commit()
+    engine.dispose()
+
+
+def install_stall(engine, stall):
+    """每条SQL在执行它的线程中等待 stall 秒（同步引擎为调用线程，aiosqlite 为其工作线程）"""
+    pending = {}
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, record):
+        key = id(dbapi_connection)
+
+        def handler():
+            if pending.pop(key, False):
+                time.sleep(stall)
+            return 0
+
+        driver = getattr(dbapi_connection, "_connection", None)
+        if driver is not None and hasattr(dbapi_connection, "await_"):
+            dbapi_connection.await_(driver.set_progress_handler(handler, 100))
+        else:
+            dbapi_connection.set_progress_handler(handler, 100)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        pending[id(conn.connection.dbapi_connection)] = True
+
+
+async def heartbeat(lags, stop, interval=0.01):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run(clients, requests, users, list_sessions):
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(heartbeat(lags, stop))
+
+    async def client(index):
+        user_id = index % users + 1
+        for _ in range(requests):
+            begin = time.perf_counter()
+            rows = await list_sessions(user_id)
+            assert rows, "empty page"
+            latencies.append(time.perf_counter() - begin)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(clients)))
+    elapsed = time.perf_counter() - begin
+    stop.set()
+    await ticker
+    return latencies, lags, elapsed
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name, latencies, lags, elapsed):
+    print(
+        f"{name:<6} {len(latencies) / elapsed:7.1f} req/s  p50={statistics.median(latencies) * 1000:7.1f} ms  "
+        f"p99={percentile(latencies, 0.99) * 1000:7.1f} ms  "
+        f"loop lag p99={percentile(lags, 0.99) * 1000:6.1f} ms max={max(lags) * 1000:6.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--stall-ms", type=float, default=20)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--messages", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "bench.db"
+        seed(f"sqlite:///{path}", args.users, args.sessions, args.messages)
+        sync_engine = create_engine(f"sqlite:///{path}", pool_size=args.clients)
+        install_stall(sync_engine, args.stall_ms / 1000)
+        sync_factory = sessionmaker(bind=sync_engine)
+
+        async def sync_list(user_id):
+            # 异步改造前：在 async def 中直接执行同步查询
+            with sync_factory() as db:
+                return ChatCRUD(db).get_user_sessions_with_stats(user_id)
+
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool, pool_size=args.clients
+        )
+        install_stall(async_engine.sync_engine, args.stall_ms / 1000)
+        async_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+        async def async_list(user_id):
+            async with async_factory() as db:
+                return await AsyncChatCRUD(db).get_user_sessions_with_stats(user_id)
+
+        print(f"{args.clients} clients x {args.requests} requests, {args.stall_ms:.0f} ms per query")
+        try:
+            for name, list_sessions in (("sync", sync_list), ("async", async_list)):
+                report(name, *await run(args.clients, args.requests, args.users, list_sessions))
+        finally:
+            await async_engine.dispose()
+            sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,6 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.http_client import init_http_client, close_http_client
+from app.core.auth_cache import init_auth_cache, close_auth_cache
+from app.db.session import async_engine
+from app.utils.security import shutdown_password_hasher
+from app.services.summary import close_summarizer
+from app.services.response_cache import init_response_cache, close_response_cache
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,6 +24,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup_event():
+    """应用启动：创建共享的LLM HTTP连接池、认证缓存和LLM回复缓存"""
+    await init_http_client()
+    await init_auth_cache()
+    await init_response_cache()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭：停止后台摘要任务，释放LLM HTTP连接池、各类缓存、密码哈希线程池和数据库连接池"""
+    await close_summarizer()
+    await close_http_client()
+    await close_auth_cache()
+    await close_response_cache()
+    shutdown_password_hasher()
+    await async_engine.dispose()
+
 # 添加路由
 app.include_router(api_router, prefix="/api/v1")
 
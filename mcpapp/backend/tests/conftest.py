@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 后端以 backend 为工作目录运行，模块按 app 包导入
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.db.crud.chat import ChatCRUD, AsyncChatCRUD
+from app.db.models import User, Message, Session as ChatSession
+
+SESSIONS = 25
+PAGE_SIZE = 10
+
+
+def seed(db):
+    """25 个会话，第 i 个会话有 i 条消息；另有一个已删除会话和一个其他用户的会话"""
+    base = datetime(2024, 1, 1)
+    db.add_all([
+        User(id=1, username="alice", email="alice@example.com", hashed_password="x"),
+        User(id=2, username="bob", email="bob@example.com", hashed_password="x"),
+    ])
+    for i in range(SESSIONS):
+        session = ChatSession(id=i + 1, user_id=1, title=f"s{i}", updated_at=base + timedelta(hours=i))
+        session.messages = [
+            Message(message_type="user", content=f"s{i}-m{j}", created_at=base + timedelta(minutes=j))
+            for j in range(i)
+        ]
+        db.add(session)
+    db.add(ChatSession(id=100, user_id=1, title="deleted", is_active=False, updated_at=base + timedelta(days=9)))
+    db.add(ChatSession(id=101, user_id=2, title="other", updated_at=base + timedelta(days=9)))
+    db.commit()
+
+
+def count_selects(engine):
+    """用 before_cursor_execute 统计发往数据库的 SELECT"""
+    selects = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    return selects
+
+
+def expected_page(page):
+    # 按 updated_at 倒序：第一页是 s24..s15
+    indexes = range(SESSIONS - 1 - page * PAGE_SIZE, max(SESSIONS - 1 - (page + 1) * PAGE_SIZE, -1), -1)
+    return [(f"s{i}", i, f"s{i}-m{i - 1}" if i else None) for i in indexes]
+
+
+def summarize(rows):
+    return [(session.title, count, content) for session, count, content in rows]
+
+
+@pytest.fixture
+def sync_db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[User.__table__, ChatSession.__table__, Message.__table__])
+    db = sessionmaker(bind=engine)()
+    seed(db)
+    yield engine, db
+    db.close()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("page", [0, 1, 2])
+def test_sessions_with_stats_is_one_select_per_page(sync_db, page):
+    engine, db = sync_db
+    selects = count_selects(engine)
+
+    rows = ChatCRUD(db).get_user_sessions_with_stats(1, skip=page * PAGE_SIZE, limit=PAGE_SIZE)
+
+    assert summarize(rows) == expected_page(page)
+    assert len(selects) == 1
+
+
+def test_async_sessions_with_stats_is_one_select_per_page():
+    pytest.importorskip("aiosqlite")
+
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                Base.metadata.create_all,
+                tables=[User.__table__, ChatSession.__table__, Message.__table__],
+            )
+            await conn.run_sync(lambda sync_conn: seed(sessionmaker(bind=sync_conn)()))
+
+        selects = count_selects(engine.sync_engine)
+        pages = []
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            crud = AsyncChatCRUD(db)
+            for page in range(3):
+                pages.append(await crud.get_user_sessions_with_stats(1, skip=page * PAGE_SIZE, limit=PAGE_SIZE))
+        await engine.dispose()
+        return pages, selects
+
+    pages, selects = asyncio.run(run())
+    assert [summarize(rows) for rows in pages] == [expected_page(page) for page in range(3)]
+    assert len(selects) == 3